@@ -1,5 +1,14 @@
+import time
+
+PAGE_STARTED = time.perf_counter()  # antes dos demais imports: a execução a frio inclui o custo deles
+
 import streamlit as st
 
+from services.analysis import start_crewai_warmup
+from services.metrics import start_metrics_export
+from services.startup import shared_paint_timings
+from services.styles import page_style
+
 st.set_page_config(
     page_title="Recruitment AI",
     page_icon="🤖",
@@ -7,159 +16,7 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
-st.markdown(
-    """
-    <style>
-        body {
-            background: radial-gradient(circle at 0% 0%, rgba(67,97,238,0.08), transparent 55%),
-                        radial-gradient(circle at 100% 0%, rgba(114,9,183,0.06), transparent 45%),
-                        #f5f7fb;
-        }
-        main .block-container {
-            padding: 2.5rem 3rem 3.5rem;
-            max-width: 1200px;
-        }
-        .hero-card {
-            background: linear-gradient(135deg, rgba(67,97,238,0.16), rgba(114,9,183,0.12));
-            border: 1px solid rgba(67, 97, 238, 0.18);
-            border-radius: 22px;
-            padding: 2.8rem 3rem;
-            margin-bottom: 2.8rem;
-            box-shadow: 0 18px 45px rgba(67, 97, 238, 0.12);
-        }
-        .hero-card h1 {
-            margin-bottom: 0.5rem;
-            font-size: 2.8rem;
-        }
-        .hero-card p {
-            font-size: 1.08rem;
-            color: rgba(38, 39, 48, 0.78);
-            max-width: 760px;
-        }
-        .pill {
-            display: inline-flex;
-            align-items: center;
-            gap: 0.45rem;
-            background: rgba(67, 97, 238, 0.16);
-            color: #1f2a56;
-            padding: 0.4rem 1rem;
-            border-radius: 999px;
-            font-weight: 600;
-            font-size: 0.86rem;
-            letter-spacing: 0.02em;
-        }
-        .stats-row {
-            margin-bottom: 2.2rem;
-        }
-        .stats-row div[data-testid="stMetric"] {
-            background: #ffffff;
-            border-radius: 18px;
-            border: 1px solid rgba(67, 97, 238, 0.08);
-            box-shadow: 0 12px 36px rgba(15, 23, 42, 0.08);
-            padding: 1.4rem 1.6rem;
-            height: 100%;
-        }
-        .stats-row div[data-testid="stMetric"] label {
-            color: #1f2937;
-            font-weight: 600;
-        }
-        .stats-row div[data-testid="stMetric"] div[data-testid="stMetricValue"] {
-            color: #111827;
-            font-size: 2rem;
-        }
-        .stats-row div[data-testid="stMetric"] div[data-testid="stMetricDelta"] span {
-            background: rgba(16, 185, 129, 0.12);
-            border-radius: 12px;
-            padding: 0.2rem 0.55rem;
-            color: #047857;
-        }
-        .quick-card {
-            background: #ffffff;
-            border-radius: 18px;
-            padding: 1.35rem 1.5rem;
-            border: 1px solid rgba(15, 23, 42, 0.08);
-            box-shadow: 0 10px 30px rgba(15, 23, 42, 0.08);
-            display: flex;
-            flex-direction: column;
-            gap: 0.45rem;
-            height: 100%;
-        }
-        .quick-card .stLinkButton button,
-        .quick-card div[data-testid="stPageLink"] a {
-            width: 100%;
-            border-radius: 999px;
-            padding: 0.55rem 1rem;
-            font-weight: 600;
-            background: linear-gradient(135deg, rgba(67,97,238,0.16), rgba(114,9,183,0.2));
-            border: none;
-            color: #1f1f3d;
-            text-decoration: none;
-            display: inline-flex;
-            align-items: center;
-            justify-content: center;
-            gap: 0.5rem;
-            transition: transform 0.15s ease, box-shadow 0.15s ease;
-        }
-        .quick-card .stLinkButton button:hover,
-        .quick-card div[data-testid="stPageLink"] a:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 12px 28px rgba(67, 97, 238, 0.28);
-        }
-        .quick-card span.helper {
-            font-size: 0.85rem;
-            color: rgba(15, 23, 42, 0.66);
-        }
-        .card-highlight {
-            border-radius: 18px;
-            border: 1px solid rgba(142, 150, 175, 0.18);
-            background-color: rgba(255, 255, 255, 0.85);
-            padding: 1.65rem;
-            height: 100%;
-            box-shadow: 0 10px 28px rgba(15, 23, 42, 0.08);
-        }
-        .card-highlight h4 {
-            margin-bottom: 0.75rem;
-        }
-        .timeline {
-            border-left: 2px solid rgba(67, 97, 238, 0.2);
-            margin-top: 1.4rem;
-            padding-left: 1.2rem;
-        }
-        .timeline-step {
-            position: relative;
-            margin-bottom: 1.5rem;
-            padding-left: 0.3rem;
-        }
-        .timeline-step::before {
-            content: "";
-            position: absolute;
-            left: -1.62rem;
-            top: 0.4rem;
-            width: 0.75rem;
-            height: 0.75rem;
-            background: linear-gradient(135deg, #4361ee, #7209b7);
-            border-radius: 50%;
-            box-shadow: 0 0 0 4px rgba(67, 97, 238, 0.18);
-        }
-        .sidebar-box {
-            background: rgba(255, 255, 255, 0.08);
-            border-radius: 18px;
-            padding: 1.2rem;
-            margin-bottom: 1.5rem;
-            border: 1px solid rgba(255, 255, 255, 0.1);
-        }
-        @media (max-width: 992px) {
-            main .block-container {
-                padding: 1.8rem 1.5rem 2.5rem;
-            }
-            .hero-card {
-                padding: 2.2rem 2.4rem;
-            }
-        }
-    </style>
-    """,
-    unsafe_allow_html=True,
-)
+st.markdown(page_style("home"), unsafe_allow_html=True)
 
 page_link = getattr(st, "page_link", None)
 
@@ -168,10 +25,12 @@ with st.sidebar:
         page_link("app.py", label="Home", icon="🏠")
         page_link("pages/1_analise_de_curriculos.py", label="Análise de Currículos", icon="🧠")
         page_link("pages/2_audio_studio.py", label="Estúdio de Áudio", icon="🎧")
+        page_link("pages/3_metricas.py", label="Métricas de Desempenho", icon="📈")
     else:
         st.markdown("[🏠 Home](app.py)")
         st.markdown("[🧠 Análise de Currículos](pages/1_analise_de_curriculos.py)")
         st.markdown("[🎧 Estúdio de Áudio](pages/2_audio_studio.py)")
+        st.markdown("[📈 Métricas de Desempenho](pages/3_metricas.py)")
 
 st.markdown(
     """<div class="hero-card">
@@ -181,6 +40,7 @@ st.markdown(
     </div>""",
     unsafe_allow_html=True,
 )
+first_paint = shared_paint_timings().record("Home", PAGE_STARTED)
 
 stat_columns = st.columns(3)
 for column, metric_args, description in zip(
@@ -275,3 +135,12 @@ with info_col2:
 st.info(
     "Pronto para expandir? Adicione novas páginas à barra lateral para testar fluxos como entrevistas automáticas, feedback de gestores e muito mais.",
 )
+
+# A página inicial costuma ser a primeira aberta após o servidor subir: a CrewAI começa a carregar
+# aqui, em segundo plano, e já está pronta quando alguém chega à análise de currículos.
+start_crewai_warmup()
+start_metrics_export()
+st.caption(
+    f"Primeira renderização em {first_paint.last_ms:.0f} ms "
+    f"({first_paint.cold_ms:.0f} ms na primeira abertura desde o início do servidor)"
+)
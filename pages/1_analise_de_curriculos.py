@@ -1,179 +1,63 @@
-import base64
-import importlib.util
+import time
+
+PAGE_STARTED = time.perf_counter()  # antes dos demais imports: a execução a frio inclui o custo deles
+
+import dataclasses
+import functools
 from pathlib import Path
-from typing import Iterable, List
+from typing import Dict, List
 
 import streamlit as st
 
-st.set_page_config(page_title="Análise de Currículos", page_icon="🧠", layout="wide")
-
-CREW_AVAILABLE = importlib.util.find_spec("crewai") is not None
+from services.analysis import (
+    CREW_AVAILABLE,
+    DEFAULT_CHUNK_TOKENS,
+    DEFAULT_MAX_CONCURRENCY,
+    SINGLE_PASS_MAX_CHARS,
+    FileAnalysis,
+    ResumeInput,
+    analysis_cache_key,
+    analysis_parameters_key,
+    analyst_pool,
+    analyze_concurrently,
+    analyze_resume,
+    build_tasks,
+    crewai_warmup_status,
+    run_crew,
+    split_results,
+    start_crewai_warmup,
+)
+from services.analysis_cache import shared_cache
+from services.dedup import group_near_duplicates, minhash_signature, shared_dedup_index, similarity
+from services.embeddings import shared_index
+from services.extraction import DEFAULT_MAX_CHARS, DEFAULT_MAX_PAGES
+from services.fragments import FRAGMENTS_AVAILABLE, isolated, record_full_run, render_rerun_timings
+from services.jobs import JobStatus, job_queue
+from services.leaderboard import (
+    DEFAULT_PAGE_SIZE,
+    DISPLAY_COLUMNS,
+    DISPLAY_LABELS,
+    PAGE_SIZES,
+    SORT_COLUMNS,
+    competency_options,
+    filter_and_sort,
+    page_count,
+    page_slice,
+    results_frame,
+)
+from services.metrics import start_metrics_export
+from services.ranking import normalize_scores, rank_resumes, top_k_indices
+from services.results import ResumeAnalysis, restore_analysis
+from services.startup import shared_paint_timings
+from services.styles import page_style
+from services.uploads import StoredUpload, deep_sizeof, spool_upload
 
-if CREW_AVAILABLE:
-    from crewai import Agent, Crew, Process, Task  # type: ignore
+st.set_page_config(page_title="Análise de Currículos", page_icon="🧠", layout="wide")
 
-DEFAULT_PROMPT = (
-    "Resuma as principais competências, experiências relevantes e o nível de senioridade "
-    "do candidato. Gere também um score de aderência à vaga de 0 a 100 e recomende "
-    "próximos passos para a pessoa recrutadora."
-)
-DEFAULT_TEMPERATURE = 0.2
-DEFAULT_PROCESS = "sequential"
+PAGE_NAME = "Análise de Currículos"
+_isolated = functools.partial(isolated, PAGE_NAME)
 
-st.markdown(
-    """
-    <style>
-        :root {
-            --crew-page-background: linear-gradient(120deg, rgba(91,141,239,0.08), rgba(37,99,235,0.04));
-            --crew-card-surface: #ffffff;
-            --crew-card-border: #d6dcf5;
-            --crew-card-shadow: rgba(15, 23, 42, 0.08);
-            --crew-step-border: #e3e8f0;
-            --crew-step-shadow: rgba(15, 23, 42, 0.08);
-            --crew-hero-background: linear-gradient(135deg, #1f3b65, #5b8def);
-            --crew-hero-shadow: rgba(31, 59, 101, 0.35);
-            --crew-text-strong: #1e293b;
-            --crew-text-muted: #475569;
-            --crew-file-list-bg: #f8fafc;
-            --crew-file-list-border: #e2e8f0;
-        }
-        html[data-theme="dark"] {
-            --crew-page-background: linear-gradient(135deg, rgba(15,23,42,0.92), rgba(30,64,175,0.35));
-            --crew-card-surface: rgba(15, 23, 42, 0.72);
-            --crew-card-border: rgba(148, 163, 184, 0.28);
-            --crew-card-shadow: rgba(2, 6, 23, 0.6);
-            --crew-step-border: rgba(148, 163, 184, 0.25);
-            --crew-step-shadow: rgba(8, 12, 34, 0.65);
-            --crew-hero-background: linear-gradient(135deg, rgba(37,99,235,0.75), rgba(15,23,42,0.85));
-            --crew-hero-shadow: rgba(8, 12, 34, 0.7);
-            --crew-text-strong: #e2e8f0;
-            --crew-text-muted: rgba(226, 232, 240, 0.75);
-            --crew-file-list-bg: rgba(30, 41, 59, 0.65);
-            --crew-file-list-border: rgba(148, 163, 184, 0.35);
-        }
-        body {
-            background: var(--crew-page-background);
-        }
-        main .block-container {
-            padding: 2.4rem 3rem 3rem;
-            max-width: 1180px;
-        }
-        .crew-hero {
-            background: var(--crew-hero-background);
-            padding: 2.8rem;
-            border-radius: 1.5rem;
-            color: #ffffff;
-            margin-bottom: 2rem;
-            box-shadow: 0 18px 45px var(--crew-hero-shadow);
-        }
-        .crew-hero h1 {
-            font-size: 2.2rem;
-            margin-bottom: 0.6rem;
-        }
-        .crew-hero p {
-            font-size: 1.05rem;
-            opacity: 0.85;
-        }
-        .crew-form {
-            background: var(--crew-card-surface);
-            border-radius: 1.2rem;
-            padding: 1.6rem;
-            border: 1px solid var(--crew-card-border);
-            box-shadow: 0 16px 40px var(--crew-card-shadow);
-            margin-bottom: 2rem;
-        }
-        .crew-form, .crew-step-card, .result-card, .file-list {
-            color: var(--crew-text-strong);
-        }
-        .crew-step-card {
-            background-color: var(--crew-card-surface);
-            border-radius: 1rem;
-            padding: 1.2rem;
-            border: 1px solid var(--crew-step-border);
-            box-shadow: 0 8px 22px var(--crew-step-shadow);
-            height: 100%;
-        }
-        .crew-step-card h3 {
-            font-size: 1.1rem;
-            margin-top: 0.75rem;
-            margin-bottom: 0.4rem;
-            color: var(--crew-text-strong);
-        }
-        .crew-step-card p {
-            font-size: 0.95rem;
-            color: var(--crew-text-muted);
-        }
-        .crew-step-icon {
-            font-size: 1.7rem;
-        }
-        .crew-section-title {
-            font-size: 1.4rem;
-            margin-bottom: 0.6rem;
-            color: var(--crew-text-strong);
-        }
-        .crew-action-row {
-            display: flex;
-            gap: 1rem;
-            flex-wrap: wrap;
-            margin-top: 1rem;
-        }
-        .crew-action-row .stButton button {
-            width: 100%;
-            border-radius: 999px;
-            padding: 0.65rem 1.2rem;
-            font-weight: 600;
-            background: linear-gradient(135deg, rgba(37,99,235,0.88), rgba(30,64,175,0.92));
-            border: none;
-            box-shadow: 0 12px 24px rgba(37, 99, 235, 0.25);
-        }
-        html[data-theme="dark"] .crew-action-row .stButton button {
-            box-shadow: 0 12px 24px rgba(37, 99, 235, 0.35);
-        }
-        .crew-action-row .stButton button:hover {
-            transform: translateY(-1px);
-        }
-        .crew-action-row .stButton:nth-child(2) button {
-            background: transparent;
-            border: 1px solid rgba(37,99,235,0.4);
-            color: #1d4ed8;
-            box-shadow: none;
-        }
-        html[data-theme="dark"] .crew-action-row .stButton:nth-child(2) button {
-            color: rgba(191, 219, 254, 0.9);
-            border-color: rgba(96, 165, 250, 0.55);
-        }
-        .result-card {
-            background-color: var(--crew-card-surface);
-            border-radius: 1.1rem;
-            padding: 1.6rem;
-            border: 1px solid var(--crew-card-border);
-            box-shadow: 0 12px 24px var(--crew-card-shadow);
-            margin-bottom: 1.3rem;
-        }
-        .result-card h4 {
-            margin-top: 0;
-            margin-bottom: 0.8rem;
-            color: var(--crew-text-strong);
-        }
-        .result-card pre {
-            white-space: pre-wrap;
-        }
-        .file-list {
-            background-color: var(--crew-file-list-bg);
-            border-radius: 1rem;
-            padding: 1.2rem;
-            border: 1px solid var(--crew-file-list-border);
-        }
-        .file-list li {
-            margin-bottom: 0.35rem;
-        }
-        .file-list strong {
-            color: var(--crew-text-strong);
-        }
-    </style>
-    """,
-    unsafe_allow_html=True,
-)
+st.markdown(page_style("analise_de_curriculos"), unsafe_allow_html=True)
 
 st.markdown(
     """
@@ -188,6 +72,7 @@ st.markdown(
     """,
     unsafe_allow_html=True,
 )
+first_paint = shared_paint_timings().record(PAGE_NAME, PAGE_STARTED)
 
 st.markdown("<div class='crew-section-title'>Como funciona</div>", unsafe_allow_html=True)
 col1, col2, col3 = st.columns(3)
@@ -229,19 +114,75 @@ st.markdown("<div class='crew-section-title'>Envie os currículos para análise<
 st.caption("Aceitamos múltiplos arquivos de uma só vez. Limite máximo: 10 MB por arquivo.")
 
 st.markdown("<div class='crew-form'>", unsafe_allow_html=True)
-uploaded_files = st.file_uploader(
+incoming_files = st.file_uploader(
     "Arraste e solte ou clique para selecionar currículos",
     type=["pdf", "docx", "txt"],
     accept_multiple_files=True,
-    key="curriculos",
+    key=f"curriculos_{st.session_state.get('uploader_generation', 0)}",
+)
+uploaded_files: List[StoredUpload] = st.session_state.setdefault("uploads", [])
+if incoming_files:
+    # Cada arquivo é copiado para o disco (com o hash calculado na cópia) e extraído dela; depois o
+    # uploader ganha uma chave nova, o que descarta os `UploadedFile` (e seus bytes) da sessão.
+    with st.spinner("Lendo os arquivos enviados..."):
+        for file in incoming_files:
+            uploaded_files.append(spool_upload(file))
+    st.session_state["uploader_generation"] = st.session_state.get("uploader_generation", 0) + 1
+    st.rerun()
+
+mode_col, concurrency_col = st.columns([2, 1])
+parallel_mode = mode_col.toggle(
+    "Analisar currículos em paralelo",
+    value=True,
+    help="Cada currículo roda em uma crew própria; uma falha não interrompe o restante do lote.",
+)
+background_mode = mode_col.toggle(
+    "Executar em segundo plano",
+    value=False,
+    disabled=not parallel_mode,
+    help="O lote continua rodando mesmo se a página for recarregada; acompanhe o andamento abaixo.",
+)
+max_concurrency = concurrency_col.number_input(
+    "Análises simultâneas",
+    min_value=1,
+    max_value=32,
+    value=DEFAULT_MAX_CONCURRENCY,
+    disabled=not parallel_mode,
+)
+chunk_tokens = concurrency_col.number_input(
+    "Tokens por bloco",
+    min_value=200,
+    max_value=8_000,
+    value=DEFAULT_CHUNK_TOKENS,
+    step=100,
+    help="Currículos maiores que este orçamento são divididos por seção e resumidos antes da análise final.",
+)
+
+job_description = st.text_area(
+    "Descrição da vaga (opcional)",
+    placeholder="Cole aqui a descrição da vaga para pré-ranquear os currículos antes da CrewAI.",
+    height=120,
+)
+top_k = st.number_input(
+    "Enviar à CrewAI apenas os K currículos mais aderentes (0 = todos)",
+    min_value=0,
+    value=0,
+    step=5,
+    disabled=not job_description.strip(),
+    help="O ranking lexical (BM25) roda localmente e não consome tokens.",
 )
 
 st.markdown("<div class='crew-action-row'>", unsafe_allow_html=True)
 col_run, col_reset = st.columns([2, 1])
 run_analysis = col_run.button("🚀 Analisar com CrewAI", use_container_width=True)
 if col_reset.button("Limpar envios", use_container_width=True):
-    st.session_state.pop("curriculos", None)
+    st.session_state.pop("uploads", None)
     st.session_state.pop("analysis_results", None)
+    st.session_state.pop("leaderboard", None)
+    st.session_state.pop("cache_stats", None)
+    st.session_state.pop("setup_stats", None)
+    st.session_state.pop("analysis_job", None)
+    st.query_params.pop("job", None)
     st.rerun()
 st.markdown("</div>", unsafe_allow_html=True)
 
@@ -258,98 +199,480 @@ if not CREW_AVAILABLE:
     )
 
 
-def _fake_analysis(file_name: str, preview: str) -> str:
-    """Retorna um texto de exemplo quando CrewAI não está disponível."""
-    return (
-        f"**Arquivo:** {file_name}\n\n"
-        f"Resumo simulado: {preview[:400]}...\n\n"
-        f"Pontuação estimada: 75/100 (temperatura {DEFAULT_TEMPERATURE:.2f})\n"
-        "Próximo passo sugerido: convidar o candidato para uma entrevista inicial."
+def _index_candidates(files: List[StoredUpload], payloads: Dict[int, ResumeAnalysis]) -> int:
+    """Guarda no índice semântico os currículos analisados com sucesso neste lote."""
+    indexed = [
+        (index, files[index])
+        for index, payload in payloads.items()
+        if index < len(files) and not payload.failed and not payload.duplicate_of
+    ]
+    return shared_index().add(
+        [file.text for _, file in indexed],
+        [
+            {
+                "sha256": file.sha256,
+                "file_name": file.name,
+                "summary": payloads[index].content[:400],
+                "score": payloads[index].score,
+                "seniority": payloads[index].seniority,
+            }
+            for index, file in indexed
+        ],
     )
 
 
-def _read_file_preview(file) -> str:
-    data = file.getvalue()
-    try:
-        return data.decode("utf-8")
-    except UnicodeDecodeError:
-        return base64.b64encode(data).decode("ascii")
-
-
-def _build_tasks(files: Iterable) -> List["Task"]:
-    tasks: List["Task"] = []
-    for file in files:
-        preview = _read_file_preview(file)
-        tasks.append(
-            Task(
-                description=f"Analise o currículo `{file.name}` e produza um resumo estruturado.",
-                expected_output="Resumo, principais competências, score de aderência e próximos passos",
-                agent=Agent(
-                    role="Analista de Currículos",
-                    goal="Classificar rapidamente candidatos em uma triagem inicial.",
-                    backstory=(
-                        "Especialista em recrutamento técnico com experiência em triagens de alto volume."
-                    ),
-                    verbose=True,
-                    allow_delegation=False,
-                ),
-                input_data={
-                    "file_name": file.name,
-                    "preview": preview,
-                    "prompt": DEFAULT_PROMPT,
-                    "temperature": DEFAULT_TEMPERATURE,
-                },
-            )
+def _resume_input(file: StoredUpload) -> ResumeInput:
+    return ResumeInput(file_name=file.name, preview=file.text)
+
+
+def _run_single_crew(resumes: List[ResumeInput]) -> List[FileAnalysis]:
+    """Modo original: todas as tarefas em uma única crew sequencial, sem map-reduce."""
+    cut = [resume.file_name for resume in resumes if len(resume.preview) > SINGLE_PASS_MAX_CHARS]
+    if cut:
+        st.warning(
+            f"{len(cut)} currículo(s) passam de {SINGLE_PASS_MAX_CHARS:,} caracteres e foram cortados na crew "
+            "única: ative a análise em paralelo para resumi-los por blocos. " + ", ".join(cut)
+        )
+    resumes = [dataclasses.replace(resume, preview=resume.preview[:SINGLE_PASS_MAX_CHARS]) for resume in resumes]
+    with analyst_pool().lease() as agent:
+        tasks = build_tasks(resumes, agent)
+        raw_results = run_crew(tasks)
+    results = split_results(raw_results, tasks)
+    if len(results) != len(resumes):
+        return [FileAnalysis(file_name="Resultado da análise", content=str(raw_results), elapsed_ms=0.0)]
+    return [
+        FileAnalysis(file_name=resume.file_name, content=str(result), elapsed_ms=0.0)
+        for resume, result in zip(resumes, results)
+    ]
+
+
+def _render_result_card(result: ResumeAnalysis) -> None:
+    st.markdown("<div class='result-card'>", unsafe_allow_html=True)
+    st.markdown(f"#### {result.file_name}")
+    if result.lexical_score is not None:
+        st.caption(f"Aderência lexical à vaga: {result.lexical_score:.0f}/100")
+    if result.duplicate_of:
+        st.caption(f"🔁 Quase duplicado de {result.duplicate_of} — análise reaproveitada")
+    elif result.cached:
+        st.caption("Reaproveitado do cache")
+    elif result.elapsed_ms:
+        details = f"Analisado em {result.elapsed_ms / 1000:.1f} s"
+        if result.tokens_in or result.tokens_out:
+            details += f" · {result.tokens_in:,} tokens de entrada / {result.tokens_out:,} de saída"
+        if result.chunks > 1:
+            details += f" · {result.chunks} blocos resumidos (map-reduce)"
+        st.caption(details)
+    structured = result.score is not None or result.seniority or result.competencies or result.next_steps
+    if structured and not result.failed:
+        score_col, seniority_col = st.columns(2)
+        score_col.metric("Score de aderência", f"{result.score}/100" if result.score is not None else "—")
+        seniority_col.metric("Senioridade", result.seniority or "—")
+        if result.competencies:
+            st.markdown("**Competências:** " + ", ".join(result.competencies))
+        if result.next_steps:
+            st.markdown("**Próximos passos:**\n" + "\n".join(f"- {step}" for step in result.next_steps))
+        with st.expander("Análise completa"):
+            st.markdown(result.content)
+    else:
+        st.markdown(result.content)
+    st.markdown("</div>", unsafe_allow_html=True)
+
+
+def _leaderboard_data(results: List[ResumeAnalysis], key: str):
+    """DataFrame e opções de filtro montados uma vez por lote e reaproveitados nos reruns."""
+    cached = st.session_state.get(key)
+    if cached is None or cached[0] is not results:
+        cached = (results, results_frame(results), competency_options(results))
+        st.session_state[key] = cached
+    return cached[1], cached[2]
+
+
+def _leaderboard(results: List[ResumeAnalysis], key: str = "leaderboard") -> None:
+    """Tabela ordenável e filtrável; só a página visível é enviada ao navegador.
+
+    `key` separa os widgets e o DataFrame em cache de cada tabela exibida na página.
+    """
+    frame, options = _leaderboard_data(results, key)
+    sort_col, order_col, filter_col = st.columns([1, 1, 2])
+    sort_by = sort_col.selectbox("Ordenar por", list(SORT_COLUMNS), key=f"{key}-sort")
+    descending = order_col.selectbox("Ordem", ["Decrescente", "Crescente"], key=f"{key}-order") == "Decrescente"
+    required = filter_col.multiselect(
+        "Filtrar por competências",
+        options,
+        help="Mostra apenas quem tem todas as competências selecionadas.",
+        key=f"{key}-filter",
+    )
+    filtered = filter_and_sort(frame, required, sort_by, descending)
+
+    size_col, page_col = st.columns([1, 1])
+    page_size = size_col.selectbox(
+        "Candidatos por página", PAGE_SIZES, index=PAGE_SIZES.index(DEFAULT_PAGE_SIZE), key=f"{key}-size"
+    )
+    pages = page_count(len(filtered), page_size)
+    page = page_col.number_input(f"Página (de {pages})", min_value=1, max_value=pages, value=1, key=f"{key}-page")
+    visible = page_slice(filtered, int(page), page_size)
+
+    st.caption(f"{len(filtered):,} de {len(frame):,} candidato(s) · página {int(page)} de {pages}")
+    st.dataframe(
+        visible[DISPLAY_COLUMNS].rename(columns=DISPLAY_LABELS),
+        hide_index=True,
+        use_container_width=True,
+    )
+    if not visible.empty:
+        selected = st.selectbox(
+            "Ver análise completa",
+            list(visible.index),
+            format_func=lambda index: results[index].file_name,
+            key=f"{key}-selected",
+        )
+        _render_result_card(results[selected])
+
+
+_render_leaderboard = _isolated("classificação")(_leaderboard)
+
+
+def _resolve_duplicates(batch: dict) -> List[int]:
+    """Copia para cada quase duplicado do lote a análise do seu representante, quando ela já existe."""
+    files, payloads, signatures = batch["files"], batch["payloads"], batch["signatures"]
+    resolved = []
+    for index, root in batch["duplicates"].items():
+        if index in payloads or root not in payloads:
+            continue
+        score = similarity(signatures[index], signatures[root])
+        payloads[index] = dataclasses.replace(
+            payloads[root],
+            file_name=files[index].name,
+            tokens_in=0,
+            tokens_out=0,
+            lexical_score=batch["lexical_scores"].get(index),
+            duplicate_of=f"`{files[root].name}` neste lote (similaridade {score:.2f})",
+        )
+        resolved.append(index)
+    return resolved
+
+
+def _publish_batch(batch: dict) -> None:
+    """Leva o lote à classificação e registra as análises reais nos índices de duplicados e de busca."""
+    files, payloads, signatures = batch["files"], batch["payloads"], batch["signatures"]
+    st.session_state["analysis_results"] = [payloads[index] for index in sorted(payloads)]
+    # Análises simuladas não entram nos índices persistentes: seriam reaproveitadas por quase
+    # duplicados e devolvidas pela busca em execuções futuras, como se fossem candidatos reais.
+    if not CREW_AVAILABLE:
+        return
+    dedup_index = shared_dedup_index()
+    for index, payload in payloads.items():
+        if signatures.get(index) is None or payload.failed or payload.duplicate_of:
+            continue
+        dedup_index.add(
+            files[index].sha256, files[index].name, signatures[index], payload.to_json(), batch["parameters_key"]
+        )
+    _index_candidates(files, payloads)
+
+
+def _collect_job(batch: dict, job: JobStatus) -> None:
+    """Incorpora ao lote os resultados do job em segundo plano e publica o lote completo."""
+    for item in job.items:
+        index = batch["job_indexes"][item.position]
+        result = item.result or ResumeAnalysis(
+            file_name=item.file_name, content=job.error or "Análise não concluída.", failed=True
         )
-    return tasks
+        batch["payloads"][index] = dataclasses.replace(result, lexical_score=batch["lexical_scores"].get(index))
+    _resolve_duplicates(batch)
+    _publish_batch(batch)
+    cache_stats = st.session_state.get("cache_stats")
+    if cache_stats is not None:
+        cache_stats["tokens"] = sum(payload.tokens_in + payload.tokens_out for payload in batch["payloads"].values())
+    st.session_state["published_job"] = job.id
+
+
+def _progress_text(done: int, total: int, started: float) -> str:
+    elapsed = time.perf_counter() - started
+    text = f"{done}/{total} currículos analisados · {elapsed:.0f} s decorridos"
+    if 0 < done < total:
+        eta = elapsed / done * (total - done)
+        text += f" · ETA {eta:.0f} s"
+    return text
 
 
 analysis_ran = False
+submitted_job = None
 if run_analysis and uploaded_files:
-    with st.spinner("Executando CrewAI..."):
-        results_payload = []
-        if CREW_AVAILABLE:
-            tasks = _build_tasks(uploaded_files)
-            crew = Crew(
-                agents=[task.agent for task in tasks],
-                tasks=tasks,
-                process=Process.sequential if DEFAULT_PROCESS == "sequential" else Process.hierarchical,
-                verbose=True,
+    setup_started = time.perf_counter()
+    cache = shared_cache() if CREW_AVAILABLE else None
+    payloads: Dict[int, ResumeAnalysis] = {}
+    pending_keys: Dict[int, str] = {}
+
+    st.markdown("---")
+    st.markdown("<div class='crew-section-title'>Resultados gerados</div>", unsafe_allow_html=True)
+    progress = st.progress(0.0, text="Preparando o lote...")
+
+    # Arquivos ilegíveis não disputam o top-K nem vão à CrewAI; aparecem no lote como falhas.
+    unreadable = {index for index, file in enumerate(uploaded_files) if file.extraction.failed}
+    # Quase duplicados são agrupados antes do top-K: uma cópia do melhor currículo não ocupa uma vaga.
+    signatures = {index: minhash_signature(file.text) for index, file in enumerate(uploaded_files)}
+    groups = group_near_duplicates([signatures[index] for index in range(len(uploaded_files))])
+    representatives = [index for index, root in enumerate(groups) if root == index and index not in unreadable]
+
+    lexical_scores: Dict[int, float] = {}
+    chosen = representatives
+    if job_description.strip():
+        texts = [file.text for file in uploaded_files]
+        scores = normalize_scores(rank_resumes(job_description, texts))
+        lexical_scores = {index: float(score) for index, score in enumerate(scores)}
+        ranked = [representatives[position] for position in top_k_indices(scores[representatives], 0)]
+        chosen = ranked[: int(top_k)] if top_k > 0 else ranked
+        skipped = ranked[len(chosen) :]
+        if skipped:
+            with st.expander(f"{len(skipped)} currículo(s) ficaram fora do top-{int(top_k)} e não foram enviados"):
+                for index in skipped:
+                    st.markdown(f"- {uploaded_files[index].name} — {scores[index]:.0f}/100")
+
+    chosen_roots = set(chosen)
+    selected_indexes = [
+        index for index, root in enumerate(groups) if root in chosen_roots or index in unreadable
+    ]
+    batch_duplicates = {index: groups[index] for index in selected_indexes if groups[index] != index}
+    dedup_index = shared_dedup_index()
+    # A crew única não passa pelo map-reduce: suas análises ficam sob `chunk_tokens=0` no cache.
+    key_chunk_tokens = int(chunk_tokens) if parallel_mode else 0
+    parameters_key = analysis_parameters_key(key_chunk_tokens)
+    cache_hits = dedup_reuses = 0
+    batch = {
+        "files": list(uploaded_files),
+        "payloads": payloads,
+        "signatures": signatures,
+        "duplicates": batch_duplicates,
+        "lexical_scores": lexical_scores,
+        "parameters_key": parameters_key,
+    }
+    live_results = st.container()
+
+    for index in selected_indexes:
+        if index in batch_duplicates:
+            continue
+        file = uploaded_files[index]
+        if index in unreadable:
+            payloads[index] = FileAnalysis(
+                file_name=file.name, content="", elapsed_ms=file.extraction.elapsed_ms, error=file.extraction.error
+            ).to_result()
+            with live_results:
+                _render_result_card(payloads[index])
+            continue
+        signature = signatures[index]
+        match = dedup_index.find(signature, parameters_key, file.sha256) if signature is not None else None
+        if match is not None and match.analysis:
+            payloads[index] = restore_analysis(
+                file.name,
+                match.analysis,
+                lexical_score=lexical_scores.get(index),
+                duplicate_of=f"`{match.file_name}`, analisado anteriormente (similaridade {match.similarity:.2f})",
+                tokens_in=0,
+                tokens_out=0,
             )
-            raw_results = crew.kickoff()
+            dedup_reuses += 1
+            with live_results:
+                _render_result_card(payloads[index])
+            continue
+        key = analysis_cache_key(file.sha256, key_chunk_tokens) if cache is not None else ""
+        cached = cache.get(key) if cache is not None else None
+        if cached is None:
+            pending_keys[index] = key
+            continue
+        cache_hits += 1
+        payloads[index] = restore_analysis(
+            file.name, cached, cached=True, lexical_score=lexical_scores.get(index), tokens_in=0, tokens_out=0
+        )
+        with live_results:
+            _render_result_card(payloads[index])
+
+    pending_indexes = list(pending_keys)
+    pending_resumes = [_resume_input(uploaded_files[index]) for index in pending_indexes]
+    setup_ms = (time.perf_counter() - setup_started) * 1000
 
-            if isinstance(raw_results, list):
-                for file, result in zip(uploaded_files, raw_results):
-                    results_payload.append({"title": file.name, "content": str(result)})
-            else:
-                results_payload.append({"title": "Resultado da análise", "content": str(raw_results)})
+    total = len(selected_indexes)
+    run_started = time.perf_counter()
+    progress.progress(len(payloads) / total, text=_progress_text(len(payloads), total, run_started))
+
+    if background_mode and parallel_mode and pending_resumes:
+        submitted_job = job_queue().submit(
+            pending_resumes,
+            [pending_keys[index] for index in pending_indexes],
+            int(max_concurrency),
+            int(chunk_tokens),
+        )
+        st.session_state["analysis_job"] = submitted_job
+        st.query_params["job"] = submitted_job
+        batch["job_id"] = submitted_job
+        batch["job_indexes"] = pending_indexes
+        completed = iter(())
+    elif parallel_mode or not CREW_AVAILABLE:
+        completed = analyze_concurrently(
+            pending_resumes,
+            int(max_concurrency) if parallel_mode else 1,
+            functools.partial(analyze_resume, chunk_tokens=int(chunk_tokens)),
+        )
+    else:
+        with st.spinner("Executando CrewAI..."):
+            fresh = _run_single_crew(pending_resumes) if pending_resumes else []
+        if len(fresh) == len(pending_indexes):
+            completed = iter(enumerate(fresh))
         else:
-            for file in uploaded_files:
-                preview = _read_file_preview(file)
-                results_payload.append(
-                    {"title": file.name, "content": _fake_analysis(file.name, preview)}
-                )
-        st.session_state["analysis_results"] = results_payload
-        analysis_ran = True
+            completed = iter(())
+            payloads[len(uploaded_files)] = fresh[0].to_result()
+            with live_results:
+                _render_result_card(payloads[len(uploaded_files)])
+
+    for position, analysis in completed:
+        index = pending_indexes[position]
+        payloads[index] = analysis.to_result(lexical_score=lexical_scores.get(index))
+        if cache is not None and analysis.ok:
+            cache.put(pending_keys[index], payloads[index].to_json())
+        with live_results:
+            _render_result_card(payloads[index])
+        done = min(len(payloads), total)
+        progress.progress(done / total, text=_progress_text(done, total, run_started))
+
+    for index in _resolve_duplicates(batch):
+        with live_results:
+            _render_result_card(payloads[index])
+
+    if submitted_job is None:
+        progress.progress(1.0, text=_progress_text(total, total, run_started))
+
+    if cache is not None:
+        st.session_state["cache_stats"] = {
+            "hits": cache_hits,
+            "duplicates": len(batch_duplicates) + dedup_reuses,
+            "misses": len(pending_keys),
+            "tokens": sum(
+                payload.tokens_in + payload.tokens_out for payload in payloads.values()
+            ),
+        }
+        pool = analyst_pool()
+        st.session_state["setup_stats"] = {
+            "setup_ms": setup_ms,
+            "agents_created": pool.created,
+            "agents_build_ms": pool.build_ms,
+        }
+    if submitted_job is None:
+        _publish_batch(batch)
+        st.session_state.pop("pending_batch", None)
+    else:
+        # Os quase duplicados de itens em segundo plano são resolvidos quando o job terminar.
+        st.session_state["pending_batch"] = batch
+        st.session_state["analysis_results"] = [payloads[index] for index in sorted(payloads)]
+    analysis_ran = True
 elif run_analysis and not uploaded_files:
     st.warning("Envie pelo menos um currículo antes de iniciar a análise.")
 
-if analysis_ran:
-    st.success("Análises concluídas! Confira os resultados abaixo.")
+if submitted_job:
+    st.info(f"Lote `{submitted_job}` enviado para processamento em segundo plano. Acompanhe abaixo.")
+elif analysis_ran:
+    st.success("Análises concluídas! Confira os resultados acima.")
+
+cache_stats = st.session_state.get("cache_stats")
+if cache_stats:
+    hits_col, duplicates_col, misses_col, tokens_col = st.columns(4)
+    hits_col.metric("Reaproveitadas do cache", cache_stats["hits"])
+    duplicates_col.metric("Quase duplicados reaproveitados", cache_stats.get("duplicates", 0))
+    misses_col.metric("Analisadas pela CrewAI", cache_stats["misses"])
+    tokens_col.metric("Tokens consumidos", f"{cache_stats.get('tokens', 0):,}")
+
+setup_stats = st.session_state.get("setup_stats")
+if setup_stats:
+    st.caption(
+        f"Preparação do lote: {setup_stats['setup_ms']:.0f} ms · "
+        f"agentes instanciados neste processo: {setup_stats['agents_created']} "
+        f"({setup_stats['agents_build_ms']:.0f} ms no total, reaproveitados entre execuções)"
+    )
+
+pending_batch = st.session_state.get("pending_batch")
+if pending_batch is not None:
+    pending_job = job_queue().status(pending_batch["job_id"])
+    if pending_job is None or pending_job.finished:
+        if pending_job is not None:
+            _collect_job(pending_batch, pending_job)
+        del st.session_state["pending_batch"]
 
 analysis_results = st.session_state.get("analysis_results", [])
 if analysis_results:
     st.markdown("---")
-    st.markdown("<div class='crew-section-title'>Resultados gerados</div>", unsafe_allow_html=True)
-    for result in analysis_results:
-        st.markdown("<div class='result-card'>", unsafe_allow_html=True)
-        st.markdown(f"#### {result['title']}")
-        st.markdown(result["content"])
-        st.markdown("</div>", unsafe_allow_html=True)
-elif uploaded_files:
-    st.caption("Tudo pronto! Clique em \"Analisar com CrewAI\" para começar.")
-else:
-    st.caption("Nenhum arquivo enviado até o momento.")
+    st.markdown("<div class='crew-section-title'>Classificação dos candidatos</div>", unsafe_allow_html=True)
+    _render_leaderboard(analysis_results)
+elif not analysis_ran:
+    if uploaded_files:
+        st.caption("Tudo pronto! Clique em \"Analisar com CrewAI\" para começar.")
+    else:
+        st.caption("Nenhum arquivo enviado até o momento.")
+
+
+def _render_job_panel(job_id: str) -> None:
+    job = job_queue().status(job_id)
+    if job is None:
+        st.warning(f"Lote `{job_id}` não encontrado.")
+        return
+    progress_text = f"Lote `{job.id}`: {job.done}/{job.total} currículos processados"
+    if job.failed:
+        progress_text += f" · {job.failed} com falha"
+    st.progress(job.done / max(job.total, 1), text=progress_text)
+    if job.error:
+        st.error(f"O lote foi interrompido: {job.error}")
+    if job.id == st.session_state.get("published_job"):
+        st.caption("Resultados incluídos na classificação dos candidatos acima.")
+        return
+    results = [item.result for item in job.items if item.result is not None]
+    if results:
+        _leaderboard(results, key=f"job-{job.id}")
+
+
+@_isolated("andamento do lote", run_every=2)
+def _poll_job_panel(job_id: str) -> None:
+    _render_job_panel(job_id)
+    job = job_queue().status(job_id)
+    if job is not None and job.finished:
+        st.rerun()
+
+
+active_job = st.session_state.get("analysis_job") or st.query_params.get("job")
+recent_jobs = job_queue().recent_jobs()
+if active_job or recent_jobs:
+    st.markdown("---")
+    st.markdown("<div class='crew-section-title'>Lotes em segundo plano</div>", unsafe_allow_html=True)
+    options = list(dict.fromkeys([active_job, *recent_jobs] if active_job else recent_jobs))
+    selected_job = st.selectbox("Lote", options, index=0, help="Lotes recentes deste servidor.")
+    job = job_queue().status(selected_job)
+    if job is not None and not job.finished:
+        _poll_job_panel(selected_job)
+        if not FRAGMENTS_AVAILABLE:
+            st.button("Atualizar andamento")
+    else:
+        _render_job_panel(selected_job)
+
+
+@_isolated("busca de candidatos")
+def _render_candidate_search() -> None:
+    candidate_index = shared_index()
+    search_col, k_col = st.columns([4, 1])
+    search_query = search_col.text_input(
+        "Descreva o perfil ou cole o trecho de um currículo",
+        placeholder="Ex.: engenheira de dados com Spark e experiência em varejo",
+        disabled=len(candidate_index) == 0,
+    )
+    search_k = k_col.number_input("Resultados", min_value=1, max_value=50, value=5)
+    st.caption(f"{len(candidate_index):,} currículo(s) indexado(s) neste servidor.")
+    if search_query.strip():
+        search_started = time.perf_counter()
+        hits = candidate_index.search(search_query, int(search_k))
+        st.caption(f"Busca concluída em {(time.perf_counter() - search_started) * 1000:.0f} ms.")
+        for hit in hits:
+            added_at = time.strftime("%d/%m/%Y", time.localtime(hit.metadata.get("added_at", 0)))
+            with st.expander(f"{hit.metadata.get('file_name', '?')} — similaridade {hit.score:.2f} · {added_at}"):
+                st.markdown(hit.metadata.get("summary", ""))
+
+
+st.markdown("---")
+st.markdown("<div class='crew-section-title'>Buscar candidatos anteriores</div>", unsafe_allow_html=True)
+_render_candidate_search()
 
 if uploaded_files:
     st.markdown("---")
@@ -357,8 +680,49 @@ if uploaded_files:
     st.markdown("<ul class='file-list'>", unsafe_allow_html=True)
     for file in uploaded_files:
         file_path = Path(file.name)
+        extraction = file.extraction
+        if extraction.failed:
+            details = f"{extraction.error} · não será analisado"
+        else:
+            details = f"{extraction.output_chars:,} caracteres extraídos em {extraction.elapsed_ms:.0f} ms"
+        if extraction.pages:
+            details += f" · {extraction.pages} página(s)"
+        if extraction.truncated:
+            details += (
+                f" · <strong>texto truncado</strong> no limite de {DEFAULT_MAX_CHARS:,} caracteres ou "
+                f"{DEFAULT_MAX_PAGES} páginas; o restante não entra na análise"
+            )
         st.markdown(
-            f"<li><strong>{file_path.name}</strong> — {file.size / 1024:.1f} KB</li>",
+            f"<li><strong>{file_path.name}</strong> — {file.size / 1024:.1f} KB · {details}</li>",
             unsafe_allow_html=True,
         )
     st.markdown("</ul>", unsafe_allow_html=True)
+    received = sum(file.size for file in uploaded_files)
+    kept = sum(len(file.text.encode("utf-8")) for file in uploaded_files)
+    session_bytes = sum(deep_sizeof(st.session_state[key]) for key in list(st.session_state.keys()))
+    st.caption(
+        f"Memória desta sessão: ~{session_bytes / 1024:,.0f} KB · {received / 1024:,.0f} KB recebidos, "
+        f"dos quais apenas o texto extraído ({kept / 1024:,.0f} KB) permanece; os bytes originais já "
+        "foram descartados."
+    )
+
+start_crewai_warmup()
+start_metrics_export()
+warmup = crewai_warmup_status()
+startup_note = (
+    f"Primeira renderização em {first_paint.last_ms:.0f} ms "
+    f"({first_paint.cold_ms:.0f} ms na primeira abertura desde o início do servidor)"
+)
+if warmup.state == "ready":
+    startup_note += (
+        f" · CrewAI pré-carregada em segundo plano: {warmup.import_ms:.0f} ms de importação, "
+        f"{warmup.agent_ms:.0f} ms para o primeiro agente"
+    )
+elif warmup.state == "loading":
+    startup_note += " · CrewAI carregando em segundo plano"
+elif warmup.state == "failed":
+    startup_note += f" · não foi possível pré-carregar a CrewAI: {warmup.error}"
+st.caption(startup_note)
+
+record_full_run(PAGE_NAME, (time.perf_counter() - PAGE_STARTED) * 1000)
+render_rerun_timings(PAGE_NAME)
@@ -1,37 +1,102 @@
-import base64
-import binascii
-import json
+import time
+
+PAGE_STARTED = time.perf_counter()  # antes dos demais imports: a execução a frio inclui o custo deles
+
+import functools
+import importlib.util
+import io
+import uuid
 from datetime import datetime
-from typing import Optional, Tuple
+from typing import BinaryIO, Optional
 
 import streamlit as st
 import streamlit.components.v1 as components
 
+from services.analysis import start_crewai_warmup
+from services.analysis_cache import hash_stream
+from services.audio import AudioDecodeError, load_pcm, shared_pcm_cache, wav_size, write_wav
+from services.blobs import BlobQuotaError, shared_blob_store
+from services.fragments import FRAGMENTS_AVAILABLE, isolated, record_full_run, render_rerun_timings
+from services.jitter import JitterBuffer
+from services.metrics import start_metrics_export
+from services.metering import LevelMeter, MeterReading
+from services.preferences import AudioPreferences, load_audio_preferences, save_audio_preferences
+from services.recording import (
+    MAGIC,
+    RECORDING_ID_BYTES,
+    REDUNDANCY_WINDOW,
+    TIMESLICE_MS,
+    IncompleteRecordingError,
+    RecordingMessage,
+    RecordingUpload,
+    decode_message,
+)
+from services.startup import shared_paint_timings
+from services.styles import page_style
+from services.transcription import DEFAULT_BACKEND, shared_transcript_cache, transcribe
+from services.vad import detect_speech, speech_blocks
+from services.waveform import shared_peak_cache, waveform_svg
+
+WEBRTC_AVAILABLE = importlib.util.find_spec("streamlit_webrtc") is not None
+
+if WEBRTC_AVAILABLE:
+    from streamlit_webrtc import WebRtcMode, webrtc_streamer  # type: ignore
+
+METER_REFRESH_SECONDS = 0.25
+EXPORT_BLOCK_SAMPLES = 1 << 20
+WAVEFORM_WIDTH = 900
+DEFAULT_ZOOM_SECONDS = 30.0
+
 st.set_page_config(page_title="Estúdio de Áudio", page_icon="🎧", layout="wide")
+PAGE_NAME = "Estúdio de Áudio"
+
+
+def _accepts_deferred_downloads() -> bool:
+    """Versões recentes aceitam uma função em `data`, executada só quando o botão é clicado.
+
+    As anteriores (a 1.33 do requirements inclusive) recusam a função com "Invalid binary data
+    format"; o tipo aceito por `data` é a única indicação confiável, já que a docstring sempre cita
+    `callable` por causa do `on_click`.
+    """
+    try:
+        from streamlit.elements.widgets.button import DownloadButtonDataType
+    except ImportError:
+        return False
+    return "Callable" in str(DownloadButtonDataType)
+
+
+_DEFERRED_DOWNLOADS = _accepts_deferred_downloads()
+_isolated = functools.partial(isolated, PAGE_NAME)
 
 
-def _browser_audio_recorder(element_id: str = "browser-recorder") -> Optional[Tuple[bytes, str]]:
-    """Renderiza um componente HTML que grava áudio pelo navegador."""
+@functools.lru_cache(maxsize=None)
+def _recorder_markup(element_id: str) -> str:
+    """HTML/JS do gravador, montado uma vez por processo.
 
-    component_value = components.html(
-        f"""
+    O conteúdo idêntico entre execuções também evita que o navegador recrie o iframe a cada rerun.
+    """
+    return f"""
         <div id="{element_id}-container" style="padding:0.75rem;border:1px solid var(--secondary-background-color,#d6d6d6);border-radius:0.5rem;">
             <div style="display:flex;gap:0.5rem;flex-wrap:wrap;align-items:center;">
                 <button id="{element_id}-start" style="padding:0.4rem 1rem;border:none;border-radius:999px;background-color:#f63366;color:white;font-weight:600;cursor:pointer;">Iniciar gravação</button>
                 <button id="{element_id}-stop" style="padding:0.4rem 1rem;border-radius:999px;border:1px solid #f63366;background-color:white;color:#f63366;font-weight:600;cursor:pointer;" disabled>Parar</button>
                 <span id="{element_id}-status" style="font-size:0.9rem;color:#6c757d;">Pronto para gravar.</span>
             </div>
-            <audio id="{element_id}-player" controls style="margin-top:0.75rem;width:100%;display:none;"></audio>
         </div>
         <script>
         (function() {{
             const startBtn = document.getElementById("{element_id}-start");
             const stopBtn = document.getElementById("{element_id}-stop");
             const statusLabel = document.getElementById("{element_id}-status");
-            const player = document.getElementById("{element_id}-player");
+            const encoder = new TextEncoder();
             let mediaStream = null;
             let recorder = null;
-            let chunks = [];
+            let recordingId = "";
+            let mimeType = "";
+            let seq = 0;
+            let sentBytes = 0;
+            let recent = [];
+            let sending = Promise.resolve();
 
             if (!navigator.mediaDevices || !navigator.mediaDevices.getUserMedia) {{
                 statusLabel.textContent = "Seu navegador não suporta captura de áudio.";
@@ -40,14 +105,67 @@ def _browser_audio_recorder(element_id: str = "browser-recorder") -> Optional[Tu
                 return;
             }}
 
-            function postValue(value) {{
+            function postBytes(bytes) {{
                 window.parent.postMessage({{
                     isStreamlitMessage: true,
                     type: "streamlit:setComponentValue",
-                    value: value
+                    value: bytes,
+                    dataType: "bytes"
                 }}, "*");
             }}
 
+            function newRecordingId() {{
+                const random = crypto.getRandomValues(new Uint8Array({RECORDING_ID_BYTES // 2}));
+                return Array.from(random, (value) => value.toString(16).padStart(2, "0")).join("");
+            }}
+
+            function encodeMessage(chunks) {{
+                const id = encoder.encode(recordingId);
+                const mime = encoder.encode(mimeType).slice(0, 255);
+                let total = 4 + id.length + 1 + mime.length + 2;
+                chunks.forEach((chunk) => {{ total += 9 + chunk.bytes.length; }});
+                const message = new Uint8Array(total);
+                const view = new DataView(message.buffer);
+                let offset = 0;
+                message.set(encoder.encode("{MAGIC.decode()}"), offset);
+                offset += 4;
+                message.set(id, offset);
+                offset += id.length;
+                message[offset++] = mime.length;
+                message.set(mime, offset);
+                offset += mime.length;
+                view.setUint16(offset, chunks.length);
+                offset += 2;
+                chunks.forEach((chunk) => {{
+                    view.setUint32(offset, chunk.seq);
+                    offset += 4;
+                    message[offset++] = chunk.final ? 1 : 0;
+                    view.setUint32(offset, chunk.bytes.length);
+                    offset += 4;
+                    message.set(chunk.bytes, offset);
+                    offset += chunk.bytes.length;
+                }});
+                return message;
+            }}
+
+            function sendChunk(blob, final) {{
+                // Encadeado para manter a ordem: `arrayBuffer()` é assíncrono.
+                sending = sending.then(async () => {{
+                    const bytes = new Uint8Array(await blob.arrayBuffer());
+                    recent.push({{ seq: seq++, final: final, bytes: bytes }});
+                    if (recent.length > {REDUNDANCY_WINDOW}) {{
+                        recent.shift();
+                    }}
+                    sentBytes += bytes.length;
+                    postBytes(encodeMessage(recent));
+                    if (final) {{
+                        statusLabel.textContent = "Gravação enviada (" + Math.round(sentBytes / 1024) + " KB).";
+                    }} else {{
+                        statusLabel.textContent = "Gravando... " + Math.round(sentBytes / 1024) + " KB enviados.";
+                    }}
+                }});
+            }}
+
             async function ensureStream() {{
                 if (mediaStream) {{
                     return mediaStream;
@@ -72,7 +190,6 @@ def _browser_audio_recorder(element_id: str = "browser-recorder") -> Optional[Tu
                     recorder.stop();
                 }}
 
-                chunks = [];
                 try {{
                     recorder = new MediaRecorder(stream);
                 }} catch (err) {{
@@ -81,36 +198,23 @@ def _browser_audio_recorder(element_id: str = "browser-recorder") -> Optional[Tu
                     return;
                 }}
 
+                recordingId = newRecordingId();
+                mimeType = recorder.mimeType || "audio/webm";
+                seq = 0;
+                sentBytes = 0;
+                recent = [];
+
                 recorder.ondataavailable = (event) => {{
                     if (event.data && event.data.size > 0) {{
-                        chunks.push(event.data);
+                        sendChunk(event.data, false);
                     }}
                 }};
 
                 recorder.onstop = () => {{
-                    const blob = new Blob(chunks, {{ type: recorder.mimeType }});
-                    if (player.src) {{
-                        URL.revokeObjectURL(player.src);
-                    }}
-                    player.src = URL.createObjectURL(blob);
-                    player.style.display = "block";
-
-                    const reader = new FileReader();
-                    reader.onloadend = () => {{
-                        const base64 = reader.result.split(",")[1];
-                        const payload = JSON.stringify({{
-                            data: base64,
-                            mimeType: blob.type
-                        }});
-                        postValue(payload);
-                    }};
-                    reader.readAsDataURL(blob);
-
-                    statusLabel.textContent = "Gravação pronta para reprodução.";
+                    sendChunk(new Blob([]), true);
                 }};
 
-                postValue(null);
-                recorder.start();
+                recorder.start({TIMESLICE_MS});
                 statusLabel.textContent = "Gravando... clique em Parar para finalizar.";
                 startBtn.disabled = true;
                 stopBtn.disabled = false;
@@ -125,126 +229,346 @@ def _browser_audio_recorder(element_id: str = "browser-recorder") -> Optional[Tu
             }});
         }})();
         </script>
-        """,
-        height=240,
+        """
+
+
+def _browser_audio_recorder(element_id: str = "browser-recorder") -> Optional[RecordingMessage]:
+    """Renderiza um componente HTML que grava áudio pelo navegador.
+
+    O `MediaRecorder` entrega um trecho a cada `TIMESLICE_MS`; cada trecho é enviado ao servidor como
+    binário assim que fica pronto, junto com os últimos já enviados (veja `services.recording`).
+    """
+
+    component_value = components.html(_recorder_markup(element_id), height=90)
+
+    if isinstance(component_value, (bytes, bytearray, memoryview)):
+        return decode_message(bytes(component_value))
+    return None
+
+
+def _clock(seconds: float) -> str:
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+
+def _speech_wav(speech) -> bytes:
+    output = io.BytesIO()
+    write_wav(
+        (speech[start : start + EXPORT_BLOCK_SAMPLES] for start in range(0, speech.size, EXPORT_BLOCK_SAMPLES)),
+        output,
+    )
+    return output.getvalue()
+
+
+def _render_silence_trimming(stream: BinaryIO, audio_sha256: str, original_size: int):
+    """Detecta a fala e, se ativado, devolve o PCM só com os trechos falados para as etapas seguintes."""
+    if not st.toggle(
+        "✂️ Remover silêncios",
+        key=f"vad-{audio_sha256}",
+        help="Detecta os trechos com fala e descarta as pausas longas antes de exportar ou transcrever.",
+    ):
+        return None
+    try:
+        samples = load_pcm(audio_sha256, stream)
+    except AudioDecodeError as error:
+        st.warning(str(error))
+        return None
+    detections = st.session_state.setdefault("speech_detection", {})
+    if audio_sha256 not in detections:
+        detections[audio_sha256] = detect_speech(samples)
+    result = detections[audio_sha256]
+    speech = shared_pcm_cache().load_derived(f"{audio_sha256}-speech", lambda: speech_blocks(samples, result))
+
+    st.caption(
+        f"{len(result.segments)} trechos de fala · duração {_clock(result.total_seconds)} → "
+        f"{_clock(result.speech_seconds)} ({result.removed_ratio:.0%} a menos) · WAV 16 kHz "
+        f"{wav_size(result.total_samples) / 1024 / 1024:.1f} MB → {wav_size(result.speech_samples) / 1024 / 1024:.1f} MB "
+        f"(arquivo original: {original_size / 1024 / 1024:.1f} MB)"
     )
+    with st.expander("Trechos de fala detectados"):
+        st.dataframe(
+            [
+                {
+                    "Início": _clock(segment.start / result.sample_rate),
+                    "Fim": _clock(segment.end / result.sample_rate),
+                    "Duração (s)": round((segment.end - segment.start) / result.sample_rate, 1),
+                }
+                for segment in result.segments
+            ],
+            hide_index=True,
+        )
+    st.download_button(
+        "Baixar áudio sem silêncios (WAV)",
+        data=(lambda: _speech_wav(speech)) if _DEFERRED_DOWNLOADS else _speech_wav(speech),
+        file_name=f"fala_{audio_sha256[:8]}.wav",
+        mime="audio/wav",
+        key=f"speech-download-{audio_sha256}",
+    )
+    return speech
 
-    if component_value:
-        if not isinstance(component_value, str):
-            return None
-        try:
-            payload = json.loads(component_value)
-        except (json.JSONDecodeError, TypeError):
-            return None
 
-        if not payload or not isinstance(payload, dict):
-            return None
+def _render_transcription(stream: BinaryIO, audio_sha256: str, speech=None) -> None:
+    """Botão de transcrição com texto parcial atualizado à medida que os blocos terminam.
+
+    Com `speech` (saída de `_render_silence_trimming`), só os trechos falados são transcritos.
+    """
+    transcripts = st.session_state.setdefault("transcripts", {})
+    key = audio_sha256 if speech is None else f"{audio_sha256}-speech"
+    if st.button("📝 Transcrever", key=f"transcribe-{key}"):
+        try:
+            samples = load_pcm(audio_sha256, stream) if speech is None else speech
+        except AudioDecodeError as error:
+            st.warning(str(error))
+            return
+        progress = st.progress(0.0, text="Preparando a transcrição...")
+        live_text = st.empty()
+        for partial in transcribe(samples, key, cache=shared_transcript_cache()):
+            progress.progress(
+                partial.chunks_done / partial.chunks_total,
+                text=f"{partial.chunks_done}/{partial.chunks_total} blocos transcritos",
+            )
+            live_text.markdown(partial.text or "_(sem fala detectada até aqui)_")
+        transcripts[key] = partial
+    elif key in transcripts:
+        st.markdown(transcripts[key].text or "_(sem fala detectada)_")
+    else:
+        return
+    partial = transcripts[key]
+    origin = "reaproveitada do cache" if partial.cached else f"backend `{DEFAULT_BACKEND}`"
+    st.caption(
+        f"{partial.audio_seconds:.0f} s de áudio em {partial.elapsed_seconds:.1f} s · "
+        f"fator de tempo real {partial.real_time_factor:.2f} · {origin}"
+    )
 
-        data_b64 = payload.get("data")
-        if not data_b64:
-            return None
 
-        mime_type = payload.get("mimeType", "audio/webm")
+def _render_waveform(stream: BinaryIO, audio_sha256: str) -> None:
+    """Visão geral e trecho ampliado, desenhados a partir da pirâmide de picos (sem reler o áudio)."""
+    pyramids = st.session_state.setdefault("waveforms", {})
+    if audio_sha256 not in pyramids:
         try:
-            audio_bytes = base64.b64decode(data_b64)
-        except (binascii.Error, ValueError):
-            return None
+            samples = load_pcm(audio_sha256, stream)
+        except AudioDecodeError as error:
+            st.caption(f"Forma de onda indisponível: {error}")
+            return
+        pyramids[audio_sha256] = shared_peak_cache().load(audio_sha256, samples)
+    pyramid = pyramids[audio_sha256]
+    duration = pyramid.duration_seconds
+    if duration <= 0:
+        return
+
+    started = time.perf_counter()
+    times, peaks = pyramid.view(0.0, duration, WAVEFORM_WIDTH)
+    st.markdown(waveform_svg(times, peaks, 0.0, duration, WAVEFORM_WIDTH), unsafe_allow_html=True)
+    zoom_start, zoom_end = st.slider(
+        "Trecho ampliado (segundos)",
+        min_value=0.0,
+        max_value=float(duration),
+        value=(0.0, float(min(duration, DEFAULT_ZOOM_SECONDS))),
+        step=0.1,
+        key=f"zoom-{audio_sha256}",
+    )
+    if zoom_end > zoom_start:
+        times, peaks = pyramid.view(zoom_start, zoom_end, WAVEFORM_WIDTH)
+        st.markdown(waveform_svg(times, peaks, zoom_start, zoom_end, WAVEFORM_WIDTH), unsafe_allow_html=True)
+    st.caption(
+        f"{_clock(zoom_start)} – {_clock(zoom_end)} de {_clock(duration)} · formas de onda desenhadas em "
+        f"{(time.perf_counter() - started) * 1000:.1f} ms a partir de {len(pyramid.levels)} níveis de picos"
+    )
 
-        return audio_bytes, mime_type
 
-    return None
+@_isolated("latência do retorno", run_every=METER_REFRESH_SECONDS)
+def _render_buffer_telemetry(buffer: JitterBuffer) -> None:
+    """Latência e underruns do retorno de áudio; atualizado junto com o medidor de níveis."""
+    stats = buffer.snapshot()
+    if stats is None:
+        st.caption("Latência do retorno: aguardando áudio do microfone.")
+        return
+    st.markdown(
+        f"<div class='status-card'>Latência {stats.latency_p50_ms:.0f} ms (p95 {stats.latency_p95_ms:.0f} ms, "
+        f"limite {stats.max_latency_ms:.0f} ms) · {stats.underruns} underruns</div>",
+        unsafe_allow_html=True,
+    )
+    st.caption(
+        f"Buffer alvo {stats.target_ms:.0f} ms, atual {stats.depth_ms:.0f} ms · jitter {stats.jitter_ms:.1f} ms · "
+        f"{stats.compressed} quadros silenciosos comprimidos, {stats.dropped} descartados por excesso"
+    )
 
-st.markdown(
-    """
-    <style>
-        :root {
-            --audio-page-background: radial-gradient(circle at 15% 20%, rgba(246,51,102,0.08), transparent 50%),
-                                    radial-gradient(circle at 80% 0%, rgba(63,81,181,0.08), transparent 52%),
-                                    #f7f8fc;
-            --audio-surface: rgba(255, 255, 255, 0.92);
-            --audio-surface-strong: #ffffff;
-            --audio-surface-border: rgba(148, 163, 184, 0.25);
-            --audio-surface-shadow: rgba(15, 23, 42, 0.08);
-            --audio-status-bg: linear-gradient(135deg, rgba(246,51,102,0.08), rgba(246,51,102,0.02));
-            --audio-status-border: rgba(246,51,102,0.15);
-            --audio-text-strong: #1f2937;
-            --audio-text-muted: #6c757d;
-        }
-        html[data-theme="dark"] {
-            --audio-page-background: radial-gradient(circle at 10% 15%, rgba(236,72,153,0.08), transparent 45%),
-                                    radial-gradient(circle at 90% 5%, rgba(59,130,246,0.08), transparent 48%),
-                                    rgba(15,23,42,0.98);
-            --audio-surface: rgba(17, 24, 39, 0.78);
-            --audio-surface-strong: rgba(17, 24, 39, 0.92);
-            --audio-surface-border: rgba(148, 163, 184, 0.25);
-            --audio-surface-shadow: rgba(2, 6, 23, 0.6);
-            --audio-status-bg: linear-gradient(135deg, rgba(236,72,153,0.16), rgba(236,72,153,0.08));
-            --audio-status-border: rgba(236,72,153,0.35);
-            --audio-text-strong: #e2e8f0;
-            --audio-text-muted: rgba(226, 232, 240, 0.75);
-        }
-        body {
-            background: var(--audio-page-background);
-        }
-        main .block-container {
-            padding: 2.4rem 3rem 3rem;
-            max-width: 1180px;
-            color: var(--audio-text-strong);
-        }
-        .audio-section {
-            padding: 1.5rem;
-            border: 1px solid rgba(99,102,241,0.14);
-            border-radius: 1rem;
-            background: var(--audio-surface);
-            box-shadow: 0 18px 40px var(--audio-surface-shadow);
-            margin-bottom: 1.6rem;
-            color: var(--audio-text-strong);
-        }
-        html[data-theme="dark"] .audio-section {
-            border-color: rgba(99,102,241,0.25);
-        }
-        .audio-section h4 {
-            margin-top: 0;
-            margin-bottom: 0.5rem;
-            color: var(--audio-text-strong);
-        }
-        .audio-config-card {
-            background: var(--audio-surface-strong);
-            border-radius: 1rem;
-            padding: 1.4rem 1.6rem;
-            border: 1px solid var(--audio-surface-border);
-            box-shadow: 0 16px 36px var(--audio-surface-shadow);
-            margin-bottom: 1.6rem;
-            color: var(--audio-text-strong);
-        }
-        .status-card {
-            border-radius: 0.75rem;
-            padding: 1rem;
-            background: var(--audio-status-bg);
-            border: 1px solid var(--audio-status-border);
-            font-weight: 500;
-            color: var(--audio-text-strong);
-        }
-        .status-row {
-            display: flex;
-            align-items: center;
-            gap: 1rem;
-            flex-wrap: wrap;
-            margin-bottom: 1.2rem;
-        }
-        .timestamp {
-            color: var(--audio-text-muted);
-            text-align: right;
-        }
-        .stToggle, .stCheckbox, .stRadio {
-            padding-bottom: 0.35rem;
+
+@_isolated("medidor de nível", run_every=METER_REFRESH_SECONDS)
+def _render_level_meter(meter: LevelMeter) -> None:
+    """Desenha a última leitura do medidor; fragmento com atualização limitada."""
+    reading = meter.snapshot()
+    if reading is None:
+        st.caption("Aguardando áudio do microfone... clique em START para liberar o acesso.")
+        return
+    st.progress(MeterReading.level(reading.rms_db), text=f"RMS: {reading.rms_db:.1f} dBFS")
+    st.progress(
+        MeterReading.level(reading.peak_hold_db),
+        text=f"Pico: {reading.peak_db:.1f} dBFS (máximo recente {reading.peak_hold_db:.1f} dBFS)",
+    )
+    if reading.clipped_samples:
+        st.warning(f"Clipping detectado: {reading.clipped_samples:,} amostras saturadas. Reduza o ganho.")
+    st.caption(
+        f"Processamento por quadro: {reading.process_ms_avg:.3f} ms em média, "
+        f"{reading.process_ms_max:.3f} ms no pior caso · orçamento de {reading.frame_budget_ms:.1f} ms por quadro "
+        f"· {reading.frames:,} quadros medidos"
+    )
+
+
+@_isolated("gravação")
+def _render_recording_section() -> None:
+    """Gravador, recepção dos trechos e ferramentas da gravação; cliques aqui só reexecutam esta seção."""
+    st.subheader("Gravação rápida pelo navegador")
+    st.write(
+        "Utilize os botões abaixo para gravar diretamente no navegador e gerar um arquivo para download."
+    )
+
+    blob_store = shared_blob_store()
+    blob_session = st.session_state.setdefault("blob_session", uuid.uuid4().hex)
+    if "recorded_audio" not in st.session_state:
+        st.session_state.recorded_audio = None
+
+    message = _browser_audio_recorder()
+    if message is not None and message.recording_id == st.session_state.get("discarded_recording"):
+        message = None  # o componente continua devolvendo a última mensagem da gravação descartada
+    upload: Optional[RecordingUpload] = st.session_state.get("recording_upload")
+    if message is not None and message.chunks:
+        if upload is None or upload.recording_id != message.recording_id:
+            if upload is not None and not upload.finished:
+                upload.writer.abort()
+            upload = RecordingUpload.start(blob_store, blob_session, message)
+            st.session_state.recording_upload = upload
+        try:
+            handle = upload.apply(message)
+        except (BlobQuotaError, IncompleteRecordingError) as error:
+            st.error(str(error))
+        else:
+            if handle is not None:
+                previous = st.session_state.recorded_audio
+                if previous is not None and previous.sha256 != handle.sha256:
+                    # A nova gravação substitui a anterior: a sessão deixa de ocupar cota com ela.
+                    blob_store.release(blob_session, [previous])
+                st.session_state.recorded_audio = handle
+    if upload is not None and not upload.finished and not upload.writer.closed:
+        st.caption(f"Gravando: {upload.writer.size / 1024:,.0f} KB recebidos até agora.")
+
+    recording = st.session_state.recorded_audio
+    if recording is not None and not blob_store.touch(recording):
+        st.warning("A gravação anterior expirou e foi removida do servidor.")
+        st.session_state.recorded_audio = recording = None
+    if recording is not None and st.button(
+        "🗑️ Descartar gravação", help="Remove a gravação do servidor e libera o espaço desta sessão."
+    ):
+        blob_store.release(blob_session, [recording])
+        st.session_state.recorded_audio = recording = None
+        if upload is not None:
+            st.session_state.discarded_recording = upload.recording_id
+            st.session_state.pop("recording_upload", None)
+
+    if recording is not None:
+        st.success("Gravação finalizada! Ouça ou baixe o arquivo abaixo.")
+        st.audio(str(blob_store.path(recording)), format=recording.mime_type)
+
+        extension_map = {
+            "audio/webm": "webm",
+            "audio/ogg": "ogg",
+            "audio/wav": "wav",
+            "audio/mp3": "mp3",
+            "audio/mpeg": "mp3",
+            "audio/mp4": "m4a",
         }
-    </style>
-    """,
-    unsafe_allow_html=True,
-)
+        file_extension = extension_map.get(recording.mime_type.split(";")[0], "webm")
+
+        st.download_button(
+            "Baixar gravação",
+            data=(lambda: blob_store.read_bytes(recording)) if _DEFERRED_DOWNLOADS else blob_store.read_bytes(recording),
+            file_name=f"gravacao_{datetime.now().strftime('%H%M%S')}.{file_extension}",
+            mime=recording.mime_type,
+        )
+        st.caption(
+            f"{recording.size / 1024 / 1024:.1f} MB · esta sessão ocupa "
+            f"{blob_store.session_usage(blob_session) / 1024 / 1024:.1f} MB no servidor "
+            f"(limite de {blob_store.session_quota_bytes / 1024 / 1024:.0f} MB)"
+        )
+        with blob_store.open(recording) as recording_stream:
+            speech = _render_silence_trimming(recording_stream, recording.sha256, recording.size)
+            _render_transcription(recording_stream, recording.sha256, speech)
+    else:
+        st.caption("Nenhuma gravação disponível ainda.")
+
+
+@_isolated("upload e reprodução")
+def _render_upload_section() -> None:
+    uploaded_audio = st.file_uploader(
+        "Faça upload de um arquivo de áudio (MP3, WAV, M4A)",
+        type=["mp3", "wav", "m4a", "ogg"],
+    )
+
+    if uploaded_audio is not None:
+        audio_hashes = st.session_state.setdefault("audio_hashes", {})
+        if uploaded_audio.file_id not in audio_hashes:
+            audio_hashes[uploaded_audio.file_id] = hash_stream(uploaded_audio)
+        audio_sha256 = audio_hashes[uploaded_audio.file_id]
+        st.audio(uploaded_audio, format=f"audio/{uploaded_audio.type.split('/')[-1]}")
+        _render_waveform(uploaded_audio, audio_sha256)
+
+        st.write("Configurações de reprodução")
+        playback_speed = st.select_slider(
+            "Velocidade",
+            options=["0.5x", "0.75x", "1x", "1.25x", "1.5x"],
+            value="1x",
+        )
+        loop_audio = st.checkbox("Repetir áudio em loop", value=False)
+
+        st.success(
+            f"Reproduzindo {uploaded_audio.name} na velocidade {playback_speed}"
+            + (" com loop ativado." if loop_audio else ".")
+        )
+        speech = _render_silence_trimming(uploaded_audio, audio_sha256, uploaded_audio.size)
+        _render_transcription(uploaded_audio, audio_sha256, speech)
+    else:
+        st.info("Nenhum arquivo de áudio enviado. Faça upload para iniciar a reprodução.")
+
+
+@_isolated("nível manual")
+def _render_manual_level(label: str, default: int, caption: str, help: Optional[str] = None) -> None:
+    level = st.slider(label, 0, 100, default, help=help)
+    st.progress(level / 100, text=caption)
+
+
+@_isolated("preferências")
+def _render_preferences(buffer: JitterBuffer) -> None:
+    audio_preferences: AudioPreferences = st.session_state.audio_preferences
+    latency: Optional[int] = st.number_input(
+        "Latência máxima permitida (ms)",
+        min_value=10,
+        max_value=500,
+        value=audio_preferences.max_latency_ms,
+        step=10,
+        help="Limite para o buffer do retorno de áudio; ideal para ajustar buffers ao trabalhar com softwares externos.",
+        key="max_latency_ms",
+    )
+
+    st.write(
+        """
+        Ajuste a latência de acordo com a infraestrutura da sua equipe. Valores menores reduzem o
+        atraso, mas exigem conexões estáveis. Valores maiores priorizam estabilidade em chamadas.
+        """
+    )
+
+    if st.button("Salvar preferências", type="primary"):
+        audio_preferences = AudioPreferences(max_latency_ms=int(latency))
+        save_audio_preferences(audio_preferences)
+        st.session_state.audio_preferences = audio_preferences
+        st.success("Preferências salvas: valem como padrão para as próximas sessões.")
+    buffer.set_max_latency(int(latency))
+
+
+st.markdown(page_style("audio_studio"), unsafe_allow_html=True)
 
 st.title("🎧 Estúdio de Áudio")
+first_paint = shared_paint_timings().record(PAGE_NAME, PAGE_STARTED)
 st.write(
     """
     Controle as fontes de áudio do seu computador durante entrevistas remotas. Escolha se
@@ -280,8 +604,14 @@ with st.container():
 
 st.markdown("---")
 
+audio_preferences: AudioPreferences = st.session_state.setdefault("audio_preferences", load_audio_preferences())
+# O campo fica no fim da página; o valor da execução anterior já está no session_state.
+max_latency_ms = int(st.session_state.get("max_latency_ms", audio_preferences.max_latency_ms))
+jitter_buffer: JitterBuffer = st.session_state.setdefault("jitter_buffer", JitterBuffer(max_latency_ms))
+jitter_buffer.set_max_latency(max_latency_ms)
+
 st.markdown("<div class='status-row'>", unsafe_allow_html=True)
-status_column, timestamp_column = st.columns([3, 1])
+status_column, telemetry_column, timestamp_column = st.columns([2, 2, 1])
 with status_column:
     if monitor_input and monitor_output:
         status_message = "Monitorando entrada e saída de áudio."
@@ -294,6 +624,15 @@ with status_column:
 
     st.markdown(f"<div class='status-card'>{status_message}</div>", unsafe_allow_html=True)
 
+with telemetry_column:
+    if WEBRTC_AVAILABLE and audio_mode == "Tempo real" and monitor_input:
+        _render_buffer_telemetry(jitter_buffer)
+    else:
+        st.caption(
+            f"Latência máxima do retorno: {max_latency_ms} ms. A medição aparece no modo Tempo real "
+            "com o microfone monitorado."
+        )
+
 with timestamp_column:
     st.caption(f"Última atualização: {datetime.now().strftime('%H:%M:%S')}")
 st.markdown("</div>", unsafe_allow_html=True)
@@ -311,107 +650,56 @@ if audio_mode == "Tempo real":
 
     levels_col1, levels_col2 = st.columns(2)
     with levels_col1:
-        volume_input = st.slider(
-            "Nível do microfone",
-            0,
-            100,
-            65,
-            help="Ajuste conforme sua mesa de som",
-        )
-        st.progress(volume_input / 100, text="Nível atual da entrada")
+        if WEBRTC_AVAILABLE and monitor_input:
+            st.markdown("**Nível do microfone**")
+            meter: LevelMeter = st.session_state.setdefault("level_meter", LevelMeter())
+
+            def _on_audio_frame(frame):
+                # Roda na thread de áudio do WebRTC: mede e passa pelo buffer, nunca toca na interface.
+                meter.process_frame(frame)
+                return jitter_buffer.process_frame(frame)
+
+            webrtc_streamer(
+                key="audio-level-meter",
+                mode=WebRtcMode.SENDRECV,
+                audio_frame_callback=_on_audio_frame,
+                media_stream_constraints={"audio": True, "video": False},
+                sendback_audio=monitor_output,
+            )
+            _render_level_meter(meter)
+            if not FRAGMENTS_AVAILABLE:
+                st.button("Atualizar níveis")
+        else:
+            _render_manual_level(
+                "Nível do microfone", 65, "Nível atual da entrada", help="Ajuste conforme sua mesa de som"
+            )
+            if not WEBRTC_AVAILABLE:
+                st.caption("Instale `streamlit-webrtc` para medir o nível real do microfone.")
 
     with levels_col2:
-        volume_output = st.slider("Nível dos alto-falantes", 0, 100, 55)
-        st.progress(volume_output / 100, text="Nível atual da saída")
+        _render_manual_level("Nível dos alto-falantes", 55, "Nível atual da saída")
 
     st.markdown("---")
-
-    st.subheader("Gravação rápida pelo navegador")
-    st.write(
-        "Utilize os botões abaixo para gravar diretamente no navegador e gerar um arquivo para download."
-    )
-
-    if "recorded_audio" not in st.session_state:
-        st.session_state.recorded_audio = None
-    if "recorded_mime" not in st.session_state:
-        st.session_state.recorded_mime = "audio/webm"
-
-    recorded_payload = _browser_audio_recorder()
-    if recorded_payload:
-        audio_bytes, mime_type = recorded_payload
-        st.session_state.recorded_audio = audio_bytes
-        st.session_state.recorded_mime = mime_type
-
-    if st.session_state.recorded_audio:
-        st.success("Gravação finalizada! Ouça ou baixe o arquivo abaixo.")
-        st.audio(st.session_state.recorded_audio, format=st.session_state.recorded_mime)
-
-        extension_map = {
-            "audio/webm": "webm",
-            "audio/ogg": "ogg",
-            "audio/wav": "wav",
-            "audio/mp3": "mp3",
-            "audio/mpeg": "mp3",
-            "audio/mp4": "m4a",
-        }
-        file_extension = extension_map.get(st.session_state.recorded_mime, "webm")
-
-        st.download_button(
-            "Baixar gravação",
-            data=st.session_state.recorded_audio,
-            file_name=f"gravacao_{datetime.now().strftime('%H%M%S')}.{file_extension}",
-            mime=st.session_state.recorded_mime,
-        )
-    else:
-        st.caption("Nenhuma gravação disponível ainda.")
+    _render_recording_section()
     st.markdown("</div>", unsafe_allow_html=True)
 else:
     st.markdown("<div class='audio-section'>", unsafe_allow_html=True)
     st.subheader("Upload e reprodução")
-    uploaded_audio = st.file_uploader(
-        "Faça upload de um arquivo de áudio (MP3, WAV, M4A)",
-        type=["mp3", "wav", "m4a", "ogg"],
-    )
-
-    if uploaded_audio is not None:
-        st.audio(uploaded_audio, format=f"audio/{uploaded_audio.type.split('/')[-1]}")
-
-        st.write("Configurações de reprodução")
-        playback_speed = st.select_slider(
-            "Velocidade",
-            options=["0.5x", "0.75x", "1x", "1.25x", "1.5x"],
-            value="1x",
-        )
-        loop_audio = st.checkbox("Repetir áudio em loop", value=False)
-
-        st.success(
-            f"Reproduzindo {uploaded_audio.name} na velocidade {playback_speed}"
-            + (" com loop ativado." if loop_audio else ".")
-        )
-    else:
-        st.info("Nenhum arquivo de áudio enviado. Faça upload para iniciar a reprodução.")
-
+    _render_upload_section()
     st.markdown("</div>", unsafe_allow_html=True)
 
 st.markdown("---")
 
 st.markdown("<div class='audio-section'>", unsafe_allow_html=True)
 st.subheader("Preferências avançadas")
-latency: Optional[int] = st.number_input(
-    "Latência máxima permitida (ms)",
-    min_value=10,
-    max_value=500,
-    value=120,
-    step=10,
-    help="Ideal para ajustar buffers ao trabalhar com softwares externos.",
-)
+_render_preferences(jitter_buffer)
+st.markdown("</div>", unsafe_allow_html=True)
 
-st.write(
-    """
-    Ajuste a latência de acordo com a infraestrutura da sua equipe. Valores menores reduzem o
-    atraso, mas exigem conexões estáveis. Valores maiores priorizam estabilidade em chamadas.
-    """
+start_crewai_warmup()
+start_metrics_export()
+st.caption(
+    f"Primeira renderização em {first_paint.last_ms:.0f} ms "
+    f"({first_paint.cold_ms:.0f} ms na primeira abertura desde o início do servidor)"
 )
-
-st.button("Salvar preferências", type="primary")
-st.markdown("</div>", unsafe_allow_html=True)
+record_full_run(PAGE_NAME, (time.perf_counter() - PAGE_STARTED) * 1000)
+render_rerun_timings(PAGE_NAME)
@@ -0,0 +1,175 @@
+import time
+
+PAGE_STARTED = time.perf_counter()  # antes dos demais imports: a execução a frio inclui o custo deles
+
+import functools
+from typing import Dict, List, Tuple
+
+import streamlit as st
+
+from services.analysis import CREW_AVAILABLE, start_crewai_warmup
+from services.config import METRICS_HOST, METRICS_PORT
+from services.fragments import isolated, record_full_run
+from services.metrics import (
+    DEFAULT_METRICS_PATH,
+    EXPORT_INTERVAL_SECONDS,
+    LLM_CALLS,
+    LLM_REQUEST,
+    LLM_TOKENS,
+    STAGE,
+    bucket_counts,
+    shared_metrics,
+    start_metrics_export,
+)
+from services.reruns import shared_rerun_timings
+from services.startup import shared_paint_timings
+
+st.set_page_config(page_title="Métricas de Desempenho", page_icon="📈", layout="wide")
+
+PAGE_NAME = "Métricas de Desempenho"
+REFRESH_SECONDS = 5
+_isolated = functools.partial(isolated, PAGE_NAME)
+
+st.title("📈 Métricas de desempenho")
+st.caption(
+    "Tempo gasto em cada etapa, chamadas ao LLM e renderização das páginas, somando todas as sessões "
+    "deste processo do servidor desde que ele subiu."
+)
+first_paint = shared_paint_timings().record(PAGE_NAME, PAGE_STARTED)
+exporter = start_metrics_export()
+
+
+def _label_text(labels: Dict[str, str]) -> str:
+    return ", ".join(f"{key}={value}" for key, value in labels.items() if key != "stage") or "—"
+
+
+def _histogram_chart(samples: Tuple[float, ...]) -> None:
+    """Barras na ordem dos buckets (a ordenação alfabética padrão embaralharia as faixas)."""
+    st.vega_lite_chart(
+        {
+            "data": {"values": [{"Duração": label, "Medidas": count} for label, count in bucket_counts(samples)]},
+            "mark": "bar",
+            "encoding": {
+                "x": {"field": "Duração", "type": "nominal", "sort": None, "axis": {"labelAngle": -45}},
+                "y": {"field": "Medidas", "type": "quantitative"},
+            },
+        },
+        use_container_width=True,
+    )
+
+
+def _llm_rows() -> List[Dict[str, object]]:
+    metrics = shared_metrics()
+    counters = {(item.name, item.labels.get("model"), item.labels.get("direction")): item.value for item in metrics.counters()}
+    return [
+        {
+            "Modelo": series.labels["model"],
+            "Kickoffs": series.count,
+            "Chamadas ao LLM": int(counters.get((LLM_CALLS, series.labels["model"], None), 0)),
+            "Tokens de entrada": int(counters.get((LLM_TOKENS, series.labels["model"], "in"), 0)),
+            "Tokens de saída": int(counters.get((LLM_TOKENS, series.labels["model"], "out"), 0)),
+            "p50 (ms)": round(series.p50_ms),
+            "p95 (ms)": round(series.p95_ms),
+            "p99 (ms)": round(series.p99_ms),
+        }
+        for series in metrics.histograms(LLM_REQUEST)
+    ]
+
+
+@_isolated("painel", run_every=REFRESH_SECONDS)
+def _render_dashboard() -> None:
+    stages = shared_metrics().histograms(STAGE)
+    st.subheader("Etapas")
+    if not stages:
+        st.info("Nenhuma etapa medida ainda: envie currículos ou áudios nas outras páginas.")
+    else:
+        st.dataframe(
+            [
+                {
+                    "Etapa": series.labels["stage"],
+                    "Detalhes": _label_text(series.labels),
+                    "Medidas": series.count,
+                    "Total (s)": round(series.total_ms / 1000, 2),
+                    "p50 (ms)": round(series.p50_ms, 1),
+                    "p95 (ms)": round(series.p95_ms, 1),
+                    "p99 (ms)": round(series.p99_ms, 1),
+                    "Máximo (ms)": round(series.max_ms, 1),
+                }
+                for series in stages
+            ],
+            hide_index=True,
+            use_container_width=True,
+        )
+        options = {f"{series.labels['stage']} · {_label_text(series.labels)}": series for series in stages}
+        series = options[st.selectbox("Histograma da etapa", list(options), key="metrics-series")]
+        st.caption(f"Distribuição das últimas {len(series.recent):,} medidas de {series.count:,} desde o início.")
+        _histogram_chart(series.recent)
+
+    st.subheader("LLM por modelo")
+    llm_rows = _llm_rows()
+    if llm_rows:
+        st.dataframe(llm_rows, hide_index=True, use_container_width=True)
+    elif CREW_AVAILABLE:
+        st.info("Nenhuma chamada ao LLM desde que o servidor subiu.")
+    else:
+        st.info("A CrewAI não está instalada: as análises são simuladas e não chamam nenhum modelo.")
+
+    st.subheader("Páginas")
+    paint_col, rerun_col = st.columns(2)
+    with paint_col:
+        st.caption("Primeira renderização")
+        st.dataframe(
+            [
+                {
+                    "Página": timing.page,
+                    "A frio (ms)": round(timing.cold_ms),
+                    "Última (ms)": round(timing.last_ms),
+                    "Execuções": timing.runs,
+                }
+                for timing in shared_paint_timings().all()
+            ],
+            hide_index=True,
+            use_container_width=True,
+        )
+    with rerun_col:
+        st.caption("Execuções por seção")
+        st.dataframe(
+            [
+                {
+                    "Página": summary.page,
+                    "Seção": summary.scope,
+                    "Execuções": summary.count,
+                    "p50 (ms)": round(summary.p50_ms, 1),
+                    "p95 (ms)": round(summary.p95_ms, 1),
+                }
+                for summary in shared_rerun_timings().summary()
+            ],
+            hide_index=True,
+            use_container_width=True,
+        )
+
+    exposition = shared_metrics().prometheus_text()
+    st.download_button("Baixar exposição Prometheus", exposition, file_name="metrics.prom", mime="text/plain")
+    with st.expander("Exposição Prometheus"):
+        st.code(exposition, language="text")
+    st.caption(f"Atualizado às {time.strftime('%H:%M:%S')}, a cada {REFRESH_SECONDS} s.")
+
+
+_render_dashboard()
+
+if exporter is not None:
+    endpoint = f"servida em `http://{METRICS_HOST}:{METRICS_PORT}/metrics`"
+elif METRICS_PORT:
+    endpoint = f"endpoint HTTP inativo: não foi possível escutar em `{METRICS_HOST}:{METRICS_PORT}`"
+else:
+    endpoint = "defina `RECRUITMENT_AI_METRICS_PORT` para servi-la também em `/metrics`"
+st.caption(
+    f"A exposição é gravada a cada {EXPORT_INTERVAL_SECONDS} s em `{DEFAULT_METRICS_PATH}` · {endpoint}."
+)
+
+start_crewai_warmup()
+st.caption(
+    f"Primeira renderização em {first_paint.last_ms:.0f} ms "
+    f"({first_paint.cold_ms:.0f} ms na primeira abertura desde o início do servidor)"
+)
+record_full_run(PAGE_NAME, (time.perf_counter() - PAGE_STARTED) * 1000)
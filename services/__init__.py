@@ -0,0 +1 @@
+"""Serviços compartilhados entre as páginas do Recruitment AI."""
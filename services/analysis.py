@@ -0,0 +1,490 @@
+"""Montagem e execução das análises de currículos com CrewAI.
+
+A CrewAI (e o cliente de LLM que ela carrega) só é importada quando uma análise precisa dela ou
+pelo aquecimento em segundo plano iniciado com `start_crewai_warmup`, nunca ao abrir a página.
+"""
+
+import contextvars
+import dataclasses
+import functools
+import importlib
+import importlib.util
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from dataclasses import dataclass
+from types import ModuleType
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from services.analysis_cache import analysis_key
+from services.chunking import DEFAULT_CHUNK_TOKENS, chunk_text, estimate_tokens
+from services.extraction import DEFAULT_MAX_CHARS, DEFAULT_MAX_PAGES
+from services.metrics import STAGE, shared_metrics
+from services.results import RESULT_SCHEMA_VERSION, ResumeAnalysis, parse_analysis
+
+CREW_AVAILABLE = importlib.util.find_spec("crewai") is not None
+
+if TYPE_CHECKING:
+    from crewai import Agent, Crew, Task  # type: ignore
+
+DEFAULT_PROMPT = (
+    "Resuma as principais competências, experiências relevantes e o nível de senioridade "
+    "do candidato. Gere também um score de aderência à vaga de 0 a 100 e recomende "
+    "próximos passos para a pessoa recrutadora."
+)
+EXPECTED_OUTPUT = (
+    "Resumo em um parágrafo seguido das linhas rotuladas `Score: N/100`, `Senioridade: <nível>`, "
+    "`Competências: <lista separada por vírgulas>` e `Próximos passos:` com um item por linha"
+)
+DEFAULT_TEMPERATURE = 0.2
+DEFAULT_PROCESS = "sequential"
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_MAP_CONCURRENCY = 4
+CHUNK_PROMPT = (
+    "Resuma esta parte do currículo em tópicos curtos, preservando cargos, períodos, "
+    "tecnologias, formação e resultados mensuráveis."
+)
+SUMMARY_FALLBACK_CHARS = 600
+SINGLE_PASS_MAX_CHARS = 12_000
+ANALYST_PROFILE = {
+    "role": "Analista de Currículos",
+    "goal": "Classificar rapidamente candidatos em uma triagem inicial.",
+    "backstory": "Especialista em recrutamento técnico com experiência em triagens de alto volume.",
+}
+
+
+@dataclass(frozen=True)
+class ResumeInput:
+    """Currículo já extraído, pronto para virar uma tarefa."""
+
+    file_name: str
+    preview: str
+
+
+@dataclass(frozen=True)
+class TokenUsage:
+    """Tokens de entrada (prompt) e saída (completion) gastos em uma análise."""
+
+    prompt: int = 0
+    completion: int = 0
+
+    @property
+    def total(self) -> int:
+        return self.prompt + self.completion
+
+    def __add__(self, other: "TokenUsage") -> "TokenUsage":
+        return TokenUsage(self.prompt + other.prompt, self.completion + other.completion)
+
+
+@dataclass(frozen=True)
+class AnalysisOutput:
+    """O que uma função de análise devolve antes de ser cronometrada."""
+
+    content: str
+    tokens: TokenUsage = TokenUsage()
+    chunks: int = 1
+
+
+@dataclass(frozen=True)
+class FileAnalysis:
+    """Resultado (ou falha) da análise de um único currículo."""
+
+    file_name: str
+    content: str
+    elapsed_ms: float
+    error: Optional[str] = None
+    tokens: TokenUsage = TokenUsage()
+    chunks: int = 1
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def to_result(self, **metadata) -> ResumeAnalysis:
+        """Converte a resposta bruta no resultado tipado; só é chamado uma vez, quando ela chega."""
+        metadata = {
+            "elapsed_ms": self.elapsed_ms,
+            "tokens_in": self.tokens.prompt,
+            "tokens_out": self.tokens.completion,
+            "chunks": self.chunks,
+            **metadata,
+        }
+        if not self.ok:
+            return ResumeAnalysis(
+                file_name=self.file_name,
+                content=f"⚠️ A análise deste currículo falhou: `{self.error}`",
+                failed=True,
+                **metadata,
+            )
+        return parse_analysis(self.file_name, self.content, **metadata)
+
+
+def _analysis_parameters(chunk_tokens: int, max_chars: int, max_pages: int) -> dict:
+    return {
+        "prompt": DEFAULT_PROMPT,
+        "temperature": DEFAULT_TEMPERATURE,
+        "agent": ANALYST_PROFILE,
+        "schema": RESULT_SCHEMA_VERSION,
+        "chunk_tokens": chunk_tokens,
+        "max_chars": max_chars,
+        "max_pages": max_pages,
+    }
+
+
+def analysis_cache_key(
+    content_hash: str,
+    chunk_tokens: int = DEFAULT_CHUNK_TOKENS,
+    max_chars: int = DEFAULT_MAX_CHARS,
+    max_pages: int = DEFAULT_MAX_PAGES,
+) -> str:
+    """Chave de cache de um arquivo para o prompt, temperatura e perfil de agente atuais.
+
+    Entram também o tamanho dos blocos do map-reduce (0 na crew única, que não divide o texto) e os
+    limites de extração: com outros valores, o modelo teria visto um texto diferente.
+    """
+    return analysis_key(content_hash, **_analysis_parameters(chunk_tokens, max_chars, max_pages))
+
+
+def analysis_parameters_key(
+    chunk_tokens: int = DEFAULT_CHUNK_TOKENS,
+    max_chars: int = DEFAULT_MAX_CHARS,
+    max_pages: int = DEFAULT_MAX_PAGES,
+) -> str:
+    """Como `analysis_cache_key`, mas sem o arquivo: identifica os parâmetros da análise entre arquivos diferentes."""
+    return analysis_key("", **_analysis_parameters(chunk_tokens, max_chars, max_pages))
+
+
+def fake_analysis(file_name: str, preview: str) -> str:
+    """Retorna um texto de exemplo quando CrewAI não está disponível."""
+    return (
+        f"**Arquivo:** {file_name}\n\n"
+        f"Resumo simulado: {preview[:400]}...\n\n"
+        f"Pontuação estimada: 75/100 (temperatura {DEFAULT_TEMPERATURE:.2f})\n"
+        "Próximo passo sugerido: convidar o candidato para uma entrevista inicial."
+    )
+
+
+@dataclass
+class WarmupStatus:
+    """Andamento do carregamento da CrewAI neste processo."""
+
+    state: str = "idle"
+    import_ms: float = 0.0
+    agent_ms: float = 0.0
+    error: Optional[str] = None
+
+
+_WARMUP = WarmupStatus()
+
+
+@functools.lru_cache(maxsize=None)
+def crewai_module() -> ModuleType:
+    """Importa a CrewAI uma vez por processo; chamadas concorrentes esperam a mesma importação."""
+    started = time.perf_counter()
+    module = importlib.import_module("crewai")
+    _WARMUP.import_ms = _WARMUP.import_ms or (time.perf_counter() - started) * 1000
+    return module
+
+
+def _warm_up() -> None:
+    _WARMUP.state = "loading"
+    try:
+        crewai_module()
+        started = time.perf_counter()
+        # Constrói o primeiro analista (e o cliente de LLM); ele fica ocioso no pool para a primeira análise.
+        with analyst_pool().lease():
+            pass
+        _WARMUP.agent_ms = (time.perf_counter() - started) * 1000
+    except Exception as error:  # noqa: BLE001 - a análise de verdade repete a importação e mostra o erro
+        _WARMUP.state = "failed"
+        _WARMUP.error = f"{type(error).__name__}: {error}"
+    else:
+        _WARMUP.state = "ready"
+
+
+@functools.lru_cache(maxsize=None)
+def start_crewai_warmup() -> Optional[threading.Thread]:
+    """Dispara o aquecimento em uma thread daemon, no máximo uma vez por processo."""
+    if not CREW_AVAILABLE:
+        return None
+    thread = threading.Thread(target=_warm_up, name="crewai-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def crewai_warmup_status() -> WarmupStatus:
+    return dataclasses.replace(_WARMUP)
+
+
+# Limite de agentes em uso pelo lote atual; `analyze_concurrently` o define nas threads que cria
+# e `_reduce_resume` o repassa às threads da fase map, para que os resumos de blocos disputem as
+# mesmas vagas das análises em vez de multiplicá-las.
+_LEASE_LIMIT: "contextvars.ContextVar[Optional[threading.BoundedSemaphore]]" = contextvars.ContextVar(
+    "lease_limit", default=None
+)
+
+
+class AgentPool:
+    """Reaproveita agentes já construídos; cria um novo apenas quando todos estão em uso.
+
+    Dentro de um lote, `lease` espera uma vaga do limite do lote, então o pool nunca passa de
+    `max_concurrency` agentes por lote, mesmo com a fase map de currículos longos.
+    """
+
+    def __init__(self, factory: Callable[[], "Agent"]) -> None:
+        self._factory = factory
+        self._idle: "queue.LifoQueue[Agent]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.build_ms = 0.0
+
+    def _build(self) -> "Agent":
+        started = time.perf_counter()
+        agent = self._factory()
+        with self._lock:
+            self.created += 1
+            self.build_ms += (time.perf_counter() - started) * 1000
+        return agent
+
+    @contextmanager
+    def lease(self) -> Iterator["Agent"]:
+        limit = _LEASE_LIMIT.get()
+        if limit is not None:
+            limit.acquire()
+        try:
+            try:
+                agent = self._idle.get_nowait()
+            except queue.Empty:
+                agent = self._build()
+            try:
+                yield agent
+            finally:
+                self._idle.put(agent)
+        finally:
+            if limit is not None:
+                limit.release()
+
+
+def _new_analyst() -> "Agent":
+    return crewai_module().Agent(**ANALYST_PROFILE, verbose=True, allow_delegation=False)
+
+
+@functools.lru_cache(maxsize=None)
+def analyst_pool() -> AgentPool:
+    """Pool de analistas compartilhado por todo o processo (reruns e sessões)."""
+    return AgentPool(_new_analyst)
+
+
+def build_tasks(resumes: Iterable[ResumeInput], agent: "Agent") -> List["Task"]:
+    Task = crewai_module().Task
+    tasks: List["Task"] = []
+    with shared_metrics().stage("build_tasks"):
+        for resume in resumes:
+            tasks.append(
+                Task(
+                    description=f"Analise o currículo `{resume.file_name}` e produza um resumo estruturado.",
+                    expected_output=EXPECTED_OUTPUT,
+                    agent=agent,
+                    input_data={
+                        "file_name": resume.file_name,
+                        "preview": resume.preview,
+                        "prompt": DEFAULT_PROMPT,
+                        "temperature": DEFAULT_TEMPERATURE,
+                    },
+                )
+            )
+    return tasks
+
+
+def build_chunk_task(file_name: str, chunk: str, position: int, total: int, agent: "Agent") -> "Task":
+    return crewai_module().Task(
+        description=f"Resuma a parte {position + 1} de {total} do currículo `{file_name}`.",
+        expected_output="Tópicos curtos com cargos, períodos, tecnologias e resultados",
+        agent=agent,
+        input_data={
+            "file_name": file_name,
+            "preview": chunk,
+            "prompt": CHUNK_PROMPT,
+            "temperature": DEFAULT_TEMPERATURE,
+        },
+    )
+
+
+def build_crew(tasks: List["Task"]) -> "Crew":
+    crewai = crewai_module()
+    agents = list({id(task.agent): task.agent for task in tasks}.values())
+    return crewai.Crew(
+        agents=agents,
+        tasks=tasks,
+        process=crewai.Process.sequential if DEFAULT_PROCESS == "sequential" else crewai.Process.hierarchical,
+        verbose=True,
+    )
+
+
+def split_results(raw_results, tasks: Sequence["Task"] = ()) -> List:
+    """Normaliza o retorno de `crew.kickoff()` em uma saída por tarefa.
+
+    Quando o retorno não traz a lista de saídas, recorre ao `output` que cada tarefa guarda
+    após executar, para que cada arquivo continue com o seu próprio resultado.
+    """
+    if isinstance(raw_results, list):
+        return raw_results
+    tasks_output = getattr(raw_results, "tasks_output", None)
+    if isinstance(tasks_output, list):
+        return tasks_output
+    outputs = [getattr(task, "output", None) for task in tasks]
+    if outputs and all(output is not None for output in outputs):
+        return outputs
+    return []
+
+
+def _token_usage(raw_results, prompt_text: str, output_text: str) -> TokenUsage:
+    """Usa as métricas reportadas pela CrewAI e recorre a uma estimativa quando não existem."""
+    usage = getattr(raw_results, "token_usage", None)
+    prompt = getattr(usage, "prompt_tokens", 0) or 0
+    completion = getattr(usage, "completion_tokens", 0) or 0
+    if prompt or completion:
+        return TokenUsage(prompt, completion)
+    return TokenUsage(estimate_tokens(prompt_text), estimate_tokens(output_text))
+
+
+def _model_name(agent: "Agent") -> str:
+    llm = getattr(agent, "llm", None)
+    return str(getattr(llm, "model", None) or getattr(llm, "model_name", None) or llm or "padrão")
+
+
+def run_crew(tasks: List["Task"]):
+    """`crew.kickoff()` cronometrado, com chamadas ao LLM e tokens registrados nas métricas do modelo."""
+    crew = build_crew(tasks)
+    started = time.perf_counter()
+    try:
+        raw_results = crew.kickoff()
+    finally:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        shared_metrics().observe(STAGE, elapsed_ms, stage="crew_kickoff")
+    prompt_text = "".join(
+        str(getattr(task, "input_data", {}).get(field, "")) for task in tasks for field in ("prompt", "preview")
+    )
+    usage = _token_usage(raw_results, prompt_text, str(raw_results))
+    requests = getattr(getattr(raw_results, "token_usage", None), "successful_requests", 0) or len(tasks)
+    shared_metrics().record_llm_call(_model_name(tasks[0].agent), elapsed_ms, usage.prompt, usage.completion, requests)
+    return raw_results
+
+
+def _kickoff_single(task_builder: Callable[["Agent"], "Task"], prompt_text: str) -> Tuple[str, TokenUsage]:
+    with analyst_pool().lease() as agent:
+        raw_results = run_crew([task_builder(agent)])
+    results = split_results(raw_results)
+    content = str(results[0] if results else raw_results)
+    return content, _token_usage(raw_results, prompt_text, content)
+
+
+def _summarize_chunk(file_name: str, chunk: str, position: int, total: int) -> Tuple[str, TokenUsage]:
+    if not CREW_AVAILABLE:
+        summary = chunk[:SUMMARY_FALLBACK_CHARS]
+        return summary, TokenUsage(estimate_tokens(CHUNK_PROMPT + chunk), estimate_tokens(summary))
+    return _kickoff_single(
+        lambda agent: build_chunk_task(file_name, chunk, position, total, agent),
+        CHUNK_PROMPT + chunk,
+    )
+
+
+def _reduce_resume(resume: ResumeInput, chunk_tokens: int) -> Tuple[ResumeInput, TokenUsage, int]:
+    """Fase map: resume cada bloco em paralelo e devolve o currículo condensado para a fase reduce."""
+    chunks = chunk_text(resume.preview, chunk_tokens)
+    if len(chunks) <= 1:
+        return resume, TokenUsage(), 1
+    workers = min(DEFAULT_MAP_CONCURRENCY, len(chunks))
+    with ThreadPoolExecutor(
+        max_workers=workers,
+        thread_name_prefix="resume-chunk",
+        initializer=_LEASE_LIMIT.set,
+        initargs=(_LEASE_LIMIT.get(),),
+    ) as executor:
+        summaries = list(
+            executor.map(
+                lambda item: _summarize_chunk(resume.file_name, item[1], item[0], len(chunks)),
+                enumerate(chunks),
+            )
+        )
+    usage = TokenUsage()
+    for _, chunk_usage in summaries:
+        usage = usage + chunk_usage
+    condensed = "\n\n".join(summary for summary, _ in summaries)
+    return ResumeInput(file_name=resume.file_name, preview=condensed), usage, len(chunks)
+
+
+def analyze_resume(resume: ResumeInput, chunk_tokens: int = DEFAULT_CHUNK_TOKENS) -> AnalysisOutput:
+    """Analisa um único currículo em uma crew própria (ou simula sem CrewAI).
+
+    Currículos acima de `chunk_tokens` passam antes por um map-reduce: cada seção é resumida
+    separadamente e somente os resumos entram na análise final.
+    """
+    condensed, usage, chunks = _reduce_resume(resume, chunk_tokens)
+    if not CREW_AVAILABLE:
+        content = fake_analysis(condensed.file_name, condensed.preview)
+        final_usage = TokenUsage(estimate_tokens(DEFAULT_PROMPT + condensed.preview), estimate_tokens(content))
+    else:
+        content, final_usage = _kickoff_single(
+            lambda agent: build_tasks([condensed], agent)[0],
+            DEFAULT_PROMPT + condensed.preview,
+        )
+    return AnalysisOutput(content=content, tokens=usage + final_usage, chunks=chunks)
+
+
+def _timed_analysis(
+    analyze: Callable[[ResumeInput], Union[str, AnalysisOutput]], resume: ResumeInput
+) -> FileAnalysis:
+    started = time.perf_counter()
+    try:
+        output = analyze(resume)
+    except Exception as error:  # noqa: BLE001 - uma falha não pode derrubar o lote inteiro
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        shared_metrics().observe(STAGE, elapsed_ms, stage="resume_analysis", outcome="error")
+        return FileAnalysis(
+            file_name=resume.file_name,
+            content="",
+            elapsed_ms=elapsed_ms,
+            error=f"{type(error).__name__}: {error}",
+        )
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    shared_metrics().observe(STAGE, elapsed_ms, stage="resume_analysis", outcome="ok")
+    if isinstance(output, str):
+        output = AnalysisOutput(content=output)
+    return FileAnalysis(
+        file_name=resume.file_name,
+        content=output.content,
+        elapsed_ms=elapsed_ms,
+        tokens=output.tokens,
+        chunks=output.chunks,
+    )
+
+
+def analyze_concurrently(
+    resumes: Sequence[ResumeInput],
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    analyze: Callable[[ResumeInput], Union[str, AnalysisOutput]] = analyze_resume,
+) -> Iterator[Tuple[int, FileAnalysis]]:
+    """Executa as análises em um pool limitado e gera `(índice, resultado)` à medida que terminam."""
+    if not resumes:
+        return
+    workers = max(1, min(max_concurrency, len(resumes)))
+    executor = ThreadPoolExecutor(
+        max_workers=workers,
+        thread_name_prefix="resume-analysis",
+        initializer=_LEASE_LIMIT.set,
+        initargs=(threading.BoundedSemaphore(workers),),
+    )
+    try:
+        futures = {
+            executor.submit(_timed_analysis, analyze, resume): index
+            for index, resume in enumerate(resumes)
+        }
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+    finally:
+        # Sem `with`: o `__exit__` esperaria o lote inteiro. Quando um rerun do Streamlit abandona o
+        # gerador, as análises na fila são descartadas e as que já rodam terminam sem prender o script.
+        executor.shutdown(wait=False, cancel_futures=True)
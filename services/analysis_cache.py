@@ -0,0 +1,124 @@
+"""Cache persistente (SQLite) de análises de currículos endereçado por conteúdo."""
+
+import functools
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, BinaryIO, Optional
+
+from services.config import DATA_DIR
+
+DEFAULT_CACHE_PATH = DATA_DIR / "analysis_cache.sqlite3"
+DEFAULT_MAX_ENTRIES = 5_000
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+DEFAULT_MAX_AGE_SECONDS = 30 * 24 * 3600
+HASH_BLOCK_SIZE = 64 * 1024
+
+
+def hash_stream(stream: BinaryIO) -> str:
+    """Calcula o SHA-256 do conteúdo de `stream` em blocos, sem copiá-lo por inteiro."""
+    digest = hashlib.sha256()
+    stream.seek(0)
+    for block in iter(lambda: stream.read(HASH_BLOCK_SIZE), b""):
+        digest.update(block)
+    stream.seek(0)
+    return digest.hexdigest()
+
+
+def analysis_key(content_hash: str, **parameters: Any) -> str:
+    """Combina o hash do arquivo com os parâmetros que influenciam a análise."""
+    encoded = json.dumps(parameters, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(f"{content_hash}\n{encoded}".encode("utf-8")).hexdigest()
+
+
+class AnalysisCache:
+    """Guarda resultados em disco e remove os menos usados ao exceder limites de tamanho ou idade."""
+
+    def __init__(
+        self,
+        path: Path = DEFAULT_CACHE_PATH,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_age_seconds: float = DEFAULT_MAX_AGE_SECONDS,
+    ) -> None:
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS analyses (
+                key TEXT PRIMARY KEY,
+                content TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS idx_accessed ON analyses (accessed_at)")
+        self._connection.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT content, created_at FROM analyses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.max_age_seconds:
+                self.misses += 1
+                return None
+            self._connection.execute("UPDATE analyses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._connection.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, content: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO analyses (key, content, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, content, len(content.encode("utf-8")), now, now),
+            )
+            self._evict(now)
+            self._connection.commit()
+
+    def _evict(self, now: float) -> None:
+        self._connection.execute(
+            "DELETE FROM analyses WHERE created_at < ?", (now - self.max_age_seconds,)
+        )
+        count, total = self._connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM analyses"
+        ).fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        rows = self._connection.execute(
+            "SELECT key, size FROM analyses ORDER BY accessed_at ASC"
+        ).fetchall()
+        stale = []
+        for key, size in rows:
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            stale.append((key,))
+            count -= 1
+            total -= size
+        self._connection.executemany("DELETE FROM analyses WHERE key = ?", stale)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
+
+
+@functools.lru_cache(maxsize=None)
+def shared_cache() -> AnalysisCache:
+    """Instância única por processo, compartilhada entre sessões e filas de execução."""
+    return AnalysisCache()
@@ -0,0 +1,234 @@
+"""Decodificação de áudio para processamento: PCM mono float32 a 16 kHz, em blocos e com cache em disco.
+
+WAV é lido com o módulo `wave`; os demais formatos (MP3, M4A, OGG, WebM do gravador) passam pelo
+`ffmpeg` em um subprocesso, quando ele está instalado. Em ambos os casos o áudio é processado em
+blocos de tamanho fixo, sem carregar o arquivo inteiro na memória.
+"""
+
+import functools
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import wave
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterable, Iterator, Optional
+
+import numpy as np
+
+from services.config import DATA_DIR
+from services.metrics import shared_metrics
+
+FFMPEG_AVAILABLE = shutil.which("ffmpeg") is not None
+
+TARGET_SAMPLE_RATE = 16_000
+BLOCK_SECONDS = 4
+DEFAULT_PCM_DIR = DATA_DIR / "pcm"
+DEFAULT_PCM_MAX_BYTES = 4 * 1024 * 1024 * 1024
+PIPE_BLOCK_SIZE = 1 << 16
+
+
+class AudioDecodeError(ValueError):
+    """O arquivo não pôde ser convertido para PCM."""
+
+
+class StreamingResampler:
+    """Reamostragem linear bloco a bloco, contínua nas fronteiras entre blocos."""
+
+    def __init__(self, source_rate: int, target_rate: int = TARGET_SAMPLE_RATE) -> None:
+        self.step = source_rate / target_rate
+        self._position = 0.0
+        self._carry = np.zeros(0, dtype=np.float32)
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        if self.step == 1.0:
+            return block.astype(np.float32, copy=False)
+        buffer = np.concatenate([self._carry, block.astype(np.float32, copy=False)])
+        if buffer.size < 2:
+            self._carry = buffer
+            return np.zeros(0, dtype=np.float32)
+        positions = np.arange(self._position, buffer.size - 1, self.step)
+        output = np.interp(positions, np.arange(buffer.size), buffer).astype(np.float32)
+        # A próxima saída continua de onde esta parou; o último sample fica para interpolar a fronteira.
+        next_position = (positions[-1] + self.step) if positions.size else self._position
+        self._position = next_position - (buffer.size - 1)
+        self._carry = buffer[-1:]
+        return output
+
+
+def resample(samples: np.ndarray, source_rate: int, target_rate: int = TARGET_SAMPLE_RATE) -> np.ndarray:
+    """Reamostra um buffer inteiro de uma vez."""
+    return StreamingResampler(source_rate, target_rate).process(samples)
+
+
+def _is_wav(stream: BinaryIO) -> bool:
+    stream.seek(0)
+    header = stream.read(12)
+    stream.seek(0)
+    return header[:4] == b"RIFF" and header[8:12] == b"WAVE"
+
+
+def _wav_blocks(stream: BinaryIO) -> Iterator[np.ndarray]:
+    """WAV PCM de 8, 16 ou 32 bits pelo módulo `wave`; as variantes que ele não lê (24 bits, ponto
+    flutuante, WAVE_FORMAT_EXTENSIBLE), comuns em gravadores de campo e DAWs, vão para o ffmpeg."""
+    try:
+        reader = wave.open(stream, "rb")
+    except (wave.Error, EOFError):
+        yield from _ffmpeg_blocks(stream)
+        return
+    with reader:
+        channels = reader.getnchannels()
+        width = reader.getsampwidth()
+        if width not in (1, 2, 4):
+            yield from _ffmpeg_blocks(stream)
+            return
+        resampler = StreamingResampler(reader.getframerate())
+        frames_per_block = reader.getframerate() * BLOCK_SECONDS
+        while True:
+            frames = reader.readframes(frames_per_block)
+            if not frames:
+                break
+            if width == 1:
+                samples = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+            else:
+                dtype = np.int16 if width == 2 else np.int32
+                samples = np.frombuffer(frames, dtype=dtype).astype(np.float32) / float(np.iinfo(dtype).max)
+            if channels > 1:
+                samples = samples[: samples.size - samples.size % channels].reshape(-1, channels).mean(axis=1)
+            yield resampler.process(samples)
+
+
+def _ffmpeg_blocks(stream: BinaryIO) -> Iterator[np.ndarray]:
+    """Decodifica com `ffmpeg`, que já entrega s16le mono em 16 kHz; lê a saída em blocos."""
+    if not FFMPEG_AVAILABLE:
+        raise AudioDecodeError(
+            "Instale o `ffmpeg` para processar áudio em formatos além de WAV PCM de 8, 16 ou 32 bits."
+        )
+    process = subprocess.Popen(
+        ["ffmpeg", "-nostdin", "-loglevel", "error", "-i", "pipe:0", "-f", "s16le", "-ac", "1",
+         "-ar", str(TARGET_SAMPLE_RATE), "pipe:1"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+
+    def feed() -> None:
+        try:
+            stream.seek(0)
+            for block in iter(lambda: stream.read(PIPE_BLOCK_SIZE), b""):
+                process.stdin.write(block)
+        except BrokenPipeError:
+            pass
+        finally:
+            process.stdin.close()
+
+    feeder = threading.Thread(target=feed, name="ffmpeg-feed", daemon=True)
+    feeder.start()
+    block_bytes = TARGET_SAMPLE_RATE * BLOCK_SECONDS * 2
+    pending = b""
+    try:
+        for data in iter(lambda: process.stdout.read(block_bytes), b""):
+            data = pending + data
+            usable = len(data) - len(data) % 2
+            pending = data[usable:]
+            yield np.frombuffer(data[:usable], dtype=np.int16).astype(np.float32) / 32767.0
+    finally:
+        process.stdout.close()
+        feeder.join()
+        errors = process.stderr.read().decode("utf-8", "replace").strip()
+        process.stderr.close()
+        if process.wait() != 0:
+            raise AudioDecodeError(f"O ffmpeg não conseguiu decodificar o arquivo: {errors[-300:]}")
+
+
+def decode_blocks(stream: BinaryIO) -> Iterator[np.ndarray]:
+    """Gera o áudio como blocos de PCM mono float32 em `TARGET_SAMPLE_RATE`."""
+    return _wav_blocks(stream) if _is_wav(stream) else _ffmpeg_blocks(stream)
+
+
+class PcmCache:
+    """PCM decodificado em `<sha256>.f32` (float32 cru), lido de volta com `np.memmap`.
+
+    Decodificar uma entrevista longa custa segundos; medir, recortar e transcrever o mesmo arquivo
+    reaproveitam esta cópia. Os arquivos menos usados saem quando o total passa de `max_bytes`.
+    """
+
+    def __init__(self, directory: Path = DEFAULT_PCM_DIR, max_bytes: int = DEFAULT_PCM_MAX_BYTES) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def path(self, key: str) -> Path:
+        return self.directory / f"{key}.f32"
+
+    def load(self, audio_sha256: str, stream: BinaryIO) -> np.ndarray:
+        """PCM do áudio, decodificando apenas na primeira vez que o hash aparece."""
+        cached = "true" if self.path(audio_sha256).exists() else "false"
+        with shared_metrics().stage("audio_decode", cached=cached):
+            return self.load_derived(audio_sha256, lambda: decode_blocks(stream))
+
+    def load_derived(self, key: str, make_blocks: Callable[[], Iterable[np.ndarray]]) -> np.ndarray:
+        """Como `load`, para sinais derivados (ex.: só os trechos de fala) identificados por `key`."""
+        path = self.path(key)
+        if not path.exists():
+            self._write(path, make_blocks())
+            self._evict(keep=path)
+        os.utime(path)
+        if path.stat().st_size == 0:
+            return np.zeros(0, dtype=np.float32)
+        return np.memmap(path, dtype=np.float32, mode="r")
+
+    def _write(self, path: Path, blocks: Iterable[np.ndarray]) -> None:
+        with tempfile.NamedTemporaryFile(dir=self.directory, suffix=".part", delete=False) as output:
+            try:
+                for block in blocks:
+                    output.write(np.asarray(block, dtype=np.float32).tobytes())
+            except BaseException:
+                output.close()
+                Path(output.name).unlink(missing_ok=True)
+                raise
+        os.replace(output.name, path)
+
+    def _evict(self, keep: Path) -> None:
+        with self._lock:
+            files = sorted(self.directory.glob("*.f32"), key=lambda item: item.stat().st_mtime)
+            total = sum(item.stat().st_size for item in files)
+            for item in files:
+                if total <= self.max_bytes:
+                    break
+                if item == keep:
+                    continue
+                total -= item.stat().st_size
+                item.unlink(missing_ok=True)
+
+
+@functools.lru_cache(maxsize=None)
+def shared_pcm_cache() -> PcmCache:
+    """Cache único por processo, compartilhado entre as sessões do Streamlit."""
+    return PcmCache()
+
+
+def load_pcm(audio_sha256: str, stream: BinaryIO, cache: Optional[PcmCache] = None) -> np.ndarray:
+    """Atalho para o cache compartilhado: PCM mono float32 a 16 kHz, mapeado do disco."""
+    return (cache or shared_pcm_cache()).load(audio_sha256, stream)
+
+
+def write_wav(blocks: Iterable[np.ndarray], output: BinaryIO, sample_rate: int = TARGET_SAMPLE_RATE) -> int:
+    """Grava blocos de PCM float32 como WAV mono de 16 bits; devolve o número de amostras gravadas."""
+    written = 0
+    with wave.open(output, "wb") as writer:
+        writer.setnchannels(1)
+        writer.setsampwidth(2)
+        writer.setframerate(sample_rate)
+        for block in blocks:
+            pcm = np.clip(np.asarray(block, dtype=np.float32), -1.0, 1.0) * 32767.0
+            writer.writeframes(pcm.astype(np.int16).tobytes())
+            written += pcm.size
+    return written
+
+
+def wav_size(samples: int) -> int:
+    """Tamanho em bytes de um WAV mono de 16 bits com `samples` amostras (cabeçalho incluso)."""
+    return 44 + 2 * samples
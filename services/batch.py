@@ -0,0 +1,251 @@
+"""Análise de currículos em lote pela linha de comando.
+
+Exemplo::
+
+    python -m services.batch curriculos/ "arquivo/**/*.pdf" --output resultados.jsonl
+
+Cada resultado é gravado no JSONL assim que termina. O próprio arquivo de saída funciona como
+checkpoint: ao rodar de novo com o mesmo `--output`, arquivos já concluídos são ignorados.
+"""
+
+import argparse
+import functools
+import glob
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Sequence, Set, TextIO, Tuple
+
+from services.analysis import (
+    CREW_AVAILABLE,
+    DEFAULT_CHUNK_TOKENS,
+    DEFAULT_MAX_CONCURRENCY,
+    FileAnalysis,
+    ResumeInput,
+    analysis_cache_key,
+    analyze_concurrently,
+    analyze_resume,
+)
+from services.analysis_cache import hash_stream, shared_cache
+from services.extraction import DEFAULT_MAX_CHARS, DEFAULT_MAX_PAGES, ExtractionResult, extract_text
+from services.metrics import shared_metrics
+from services.results import ResumeAnalysis, restore_analysis
+
+SUPPORTED_SUFFIXES = (".pdf", ".docx", ".txt")
+DEFAULT_BATCH_SIZE = 64
+
+
+def iter_resume_paths(patterns: Iterable[str]) -> Iterator[Path]:
+    """Expande diretórios (recursivamente) e padrões glob em arquivos suportados, sem repetições."""
+    seen: Set[Path] = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            candidates = sorted(Path(pattern).rglob("*"))
+        else:
+            candidates = sorted(Path(match) for match in glob.glob(pattern, recursive=True))
+        for candidate in candidates:
+            resolved = candidate.resolve()
+            if resolved in seen or not candidate.is_file():
+                continue
+            if candidate.suffix.lower() not in SUPPORTED_SUFFIXES:
+                continue
+            seen.add(resolved)
+            yield candidate
+
+
+def load_checkpoint(output: Path) -> Set[Tuple[str, str]]:
+    """Lê o JSONL existente e retorna os pares (caminho, sha256) já concluídos com sucesso."""
+    completed: Set[Tuple[str, str]] = set()
+    if not output.exists():
+        return completed
+    with output.open("r", encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # linha parcial deixada por uma interrupção
+            if record.get("status") == "done":
+                completed.add((record["path"], record["sha256"]))
+    return completed
+
+
+def _ends_with_partial_line(output: Path) -> bool:
+    if not output.exists() or output.stat().st_size == 0:
+        return False
+    with output.open("rb") as handle:
+        handle.seek(-1, os.SEEK_END)
+        return handle.read(1) != b"\n"
+
+
+def _chunks(items: Sequence, size: int) -> Iterator[Sequence]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+class _Progress:
+    def __init__(self, total: int, stream: TextIO) -> None:
+        self.total = total
+        self.stream = stream
+        self.done = 0
+        self.failed = 0
+        self.cached = 0
+        self.tokens = 0
+        self.started = time.perf_counter()
+
+    def update(self, path: Path, analysis: FileAnalysis, cached: bool) -> None:
+        self.done += 1
+        self.failed += 0 if analysis.ok else 1
+        self.cached += 1 if cached else 0
+        minutes = max(time.perf_counter() - self.started, 1e-9) / 60
+        outcome = "cache" if cached else ("ok" if analysis.ok else f"FALHA ({analysis.error})")
+        print(
+            f"[{self.done}/{self.total}] {path} — {outcome} · "
+            f"{self.done / minutes:.1f} arquivos/min · falhas: {self.failed}",
+            file=self.stream,
+            flush=True,
+        )
+
+    def summary(self) -> str:
+        minutes = max(time.perf_counter() - self.started, 1e-9) / 60
+        return (
+            f"Concluído: {self.done} arquivo(s) em {minutes * 60:.1f} s "
+            f"({self.done / minutes:.1f} arquivos/min) · cache: {self.cached} · falhas: {self.failed} · "
+            f"tokens: {self.tokens:,}"
+        )
+
+
+def _write_record(
+    output: TextIO, path: Path, sha256: str, result: ResumeAnalysis, error: Optional[str] = None
+) -> None:
+    record = {
+        "path": str(path),
+        "sha256": sha256,
+        "status": "failed" if result.failed else "done",
+        "error": error,
+        **result.to_dict(),
+        "elapsed_ms": round(result.elapsed_ms, 1),
+    }
+    output.write(json.dumps(record, ensure_ascii=False) + "\n")
+    output.flush()
+    os.fsync(output.fileno())
+
+
+def run_batch(
+    paths: Sequence[Path],
+    output: Path,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_chars: int = DEFAULT_MAX_CHARS,
+    max_pages: int = DEFAULT_MAX_PAGES,
+    chunk_tokens: int = DEFAULT_CHUNK_TOKENS,
+    use_cache: bool = True,
+    progress_stream: TextIO = sys.stderr,
+) -> _Progress:
+    completed = load_checkpoint(output)
+    cache = shared_cache() if use_cache and CREW_AVAILABLE else None
+    progress = _Progress(len(paths), progress_stream)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    analyze = functools.partial(analyze_resume, chunk_tokens=chunk_tokens)
+
+    if _ends_with_partial_line(output):
+        with output.open("a", encoding="utf-8") as sink:
+            sink.write("\n")  # isola a linha parcial deixada por uma interrupção
+
+    with output.open("a", encoding="utf-8") as sink:
+        for chunk in _chunks(paths, batch_size):
+            pending: List[Tuple[Path, str, str]] = []
+            resumes: List[ResumeInput] = []
+            for path in chunk:
+                sha256, key, cached = "", "", None
+                try:
+                    with path.open("rb") as handle:
+                        sha256 = hash_stream(handle)
+                        if (str(path), sha256) in completed:
+                            progress.total -= 1
+                            continue
+                        key = analysis_cache_key(sha256, chunk_tokens, max_chars, max_pages)
+                        cached = cache.get(key) if cache is not None else None
+                        if cached is None:
+                            extraction = extract_text(path.name, handle, max_chars=max_chars, max_pages=max_pages)
+                except Exception as error:  # noqa: BLE001 - um arquivo ilegível não pode derrubar o lote
+                    # Gravado como falha: sem isso, cada `--resume` pararia de novo no mesmo arquivo.
+                    cached = None
+                    extraction = ExtractionResult(
+                        text="",
+                        source_bytes=0,
+                        pages=0,
+                        truncated=False,
+                        elapsed_ms=0.0,
+                        error=f"Não foi possível ler o arquivo: {type(error).__name__}: {error}",
+                    )
+                if cached is not None:
+                    result = restore_analysis(path.name, cached, cached=True, tokens_in=0, tokens_out=0)
+                    analysis = FileAnalysis(file_name=path.name, content=result.content, elapsed_ms=0.0)
+                    _write_record(sink, path, sha256, result)
+                    progress.update(path, analysis, cached=True)
+                    continue
+                if extraction.failed:
+                    analysis = FileAnalysis(
+                        file_name=path.name, content="", elapsed_ms=extraction.elapsed_ms, error=extraction.error
+                    )
+                    _write_record(sink, path, sha256, analysis.to_result(), analysis.error)
+                    progress.update(path, analysis, cached=False)
+                    continue
+                if extraction.truncated:
+                    print(
+                        f"Aviso: {path} passou do limite de {max_chars:,} caracteres ou {max_pages} páginas; "
+                        "só o início será analisado.",
+                        file=progress_stream,
+                    )
+                pending.append((path, sha256, key))
+                resumes.append(ResumeInput(file_name=path.name, preview=extraction.text))
+
+            for position, analysis in analyze_concurrently(resumes, max_concurrency, analyze):
+                path, sha256, key = pending[position]
+                result = analysis.to_result()
+                if cache is not None and analysis.ok:
+                    cache.put(key, result.to_json())
+                _write_record(sink, path, sha256, result, analysis.error)
+                progress.update(path, analysis, cached=False)
+                progress.tokens += analysis.tokens.total
+    return progress
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Analisa currículos em lote e grava os resultados em JSONL.")
+    parser.add_argument("inputs", nargs="+", help="Diretórios ou padrões glob com currículos (PDF, DOCX, TXT).")
+    parser.add_argument("-o", "--output", type=Path, default=Path("resultados.jsonl"))
+    parser.add_argument("-c", "--concurrency", type=int, default=DEFAULT_MAX_CONCURRENCY)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--max-chars", type=int, default=DEFAULT_MAX_CHARS)
+    parser.add_argument("--max-pages", type=int, default=DEFAULT_MAX_PAGES)
+    parser.add_argument("--chunk-tokens", type=int, default=DEFAULT_CHUNK_TOKENS)
+    parser.add_argument("--no-cache", action="store_true", help="Ignora o cache de análises em disco.")
+    args = parser.parse_args(argv)
+
+    paths = list(iter_resume_paths(args.inputs))
+    if not paths:
+        print("Nenhum currículo encontrado.", file=sys.stderr)
+        return 1
+    if not CREW_AVAILABLE:
+        print("Aviso: `crewai` não instalado; os resultados serão simulados.", file=sys.stderr)
+
+    progress = run_batch(
+        paths,
+        args.output,
+        max_concurrency=args.concurrency,
+        batch_size=args.batch_size,
+        max_chars=args.max_chars,
+        max_pages=args.max_pages,
+        chunk_tokens=args.chunk_tokens,
+        use_cache=not args.no_cache,
+    )
+    print(progress.summary(), file=sys.stderr)
+    print(f"Métricas de desempenho em {shared_metrics().write_prometheus()}", file=sys.stderr)
+    return 0 if progress.failed == 0 else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,256 @@
+"""Armazenamento de gravações em disco, endereçado por conteúdo, com expiração e cotas."""
+
+import functools
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Iterable, List
+
+from services.config import DATA_DIR
+
+DEFAULT_BLOB_DIR = DATA_DIR / "blobs"
+DEFAULT_TTL_SECONDS = 24 * 3600
+DEFAULT_SESSION_QUOTA_BYTES = 512 * 1024 * 1024
+DEFAULT_GLOBAL_QUOTA_BYTES = 8 * 1024 * 1024 * 1024
+
+
+class BlobQuotaError(ValueError):
+    """O arquivo sozinho é maior do que a cota permitida."""
+
+
+@dataclass(frozen=True)
+class BlobHandle:
+    """Referência leve a um blob; é isto (e não os bytes) que fica no `st.session_state`."""
+
+    sha256: str
+    size: int
+    mime_type: str
+
+
+class BlobWriter:
+    """Blob em construção: cada trecho é gravado em disco e entra no hash assim que chega.
+
+    Ao final, `finish` só fecha o arquivo e o move para o endereço definitivo, em tempo constante
+    independentemente da duração da gravação.
+    """
+
+    def __init__(self, store: "BlobStore", session_id: str, mime_type: str) -> None:
+        self._store = store
+        self.session_id = session_id
+        self.mime_type = mime_type
+        self.size = 0
+        self._digest = hashlib.sha256()
+        self._file = tempfile.NamedTemporaryFile(dir=store.directory / "incoming", delete=False)
+
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+
+    def append(self, data: bytes) -> None:
+        limit = min(self._store.session_quota_bytes, self._store.global_quota_bytes)
+        if self.size + len(data) > limit:
+            self.abort()
+            raise BlobQuotaError(f"A gravação ultrapassou a cota de {limit:,} bytes e foi descartada.")
+        self._digest.update(data)
+        self._file.write(data)
+        self.size += len(data)
+
+    def finish(self) -> BlobHandle:
+        self._file.close()
+        return self._store._commit(
+            self.session_id, Path(self._file.name), self._digest.hexdigest(), self.size, self.mime_type
+        )
+
+    def abort(self) -> None:
+        self._file.close()
+        Path(self._file.name).unlink(missing_ok=True)
+
+
+class BlobStore:
+    """Blobs imutáveis em `objects/<ab>/<sha256>`, com metadados e referências por sessão em SQLite.
+
+    Um blob é removido quando nenhuma sessão o acessa há mais de `ttl_seconds` ou quando a cota global
+    estoura (os menos acessados saem primeiro). Cada sessão também tem uma cota própria: ao excedê-la,
+    suas gravações mais antigas deixam de ser referenciadas.
+    """
+
+    def __init__(
+        self,
+        directory: Path = DEFAULT_BLOB_DIR,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        session_quota_bytes: int = DEFAULT_SESSION_QUOTA_BYTES,
+        global_quota_bytes: int = DEFAULT_GLOBAL_QUOTA_BYTES,
+    ) -> None:
+        self.directory = Path(directory)
+        self.ttl_seconds = ttl_seconds
+        self.session_quota_bytes = session_quota_bytes
+        self.global_quota_bytes = global_quota_bytes
+        self._lock = threading.Lock()
+        (self.directory / "objects").mkdir(parents=True, exist_ok=True)
+        (self.directory / "incoming").mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(str(self.directory / "blobs.sqlite3"), check_same_thread=False)
+        self._connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS blobs (
+                sha256 TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mime_type TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS refs (
+                session_id TEXT NOT NULL,
+                sha256 TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (session_id, sha256)
+            );
+            """
+        )
+        self._connection.commit()
+
+    def path(self, handle: BlobHandle) -> Path:
+        return self.directory / "objects" / handle.sha256[:2] / handle.sha256
+
+    def touch(self, handle: BlobHandle) -> bool:
+        """Renova o prazo de expiração; retorna `False` se o blob já foi removido."""
+        with self._lock:
+            updated = self._connection.execute(
+                "UPDATE blobs SET accessed_at = ? WHERE sha256 = ?", (time.time(), handle.sha256)
+            ).rowcount
+            self._connection.commit()
+        return bool(updated) and self.path(handle).exists()
+
+    def open(self, handle: BlobHandle) -> BinaryIO:
+        self.touch(handle)
+        return self.path(handle).open("rb")
+
+    def read_bytes(self, handle: BlobHandle) -> bytes:
+        with self.open(handle) as stream:
+            return stream.read()
+
+    def open_writer(self, session_id: str, mime_type: str) -> BlobWriter:
+        """Começa um blob que será recebido aos poucos (por exemplo, durante uma gravação)."""
+        return BlobWriter(self, session_id, mime_type)
+
+    def _commit(self, session_id: str, spooled: Path, sha256: str, size: int, mime_type: str) -> BlobHandle:
+        """Move o arquivo temporário para o endereço do conteúdo e registra a referência da sessão."""
+        limit = min(self.session_quota_bytes, self.global_quota_bytes)
+        if size > limit:
+            spooled.unlink(missing_ok=True)
+            raise BlobQuotaError(f"A gravação tem {size:,} bytes e excede a cota de {limit:,} bytes.")
+        handle = BlobHandle(sha256=sha256, size=size, mime_type=mime_type)
+        target = self.path(handle)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        now = time.time()
+        with self._lock:
+            if target.exists():
+                spooled.unlink(missing_ok=True)
+            else:
+                os.replace(spooled, target)
+            self._connection.execute(
+                "INSERT INTO blobs (sha256, size, mime_type, created_at, accessed_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(sha256) DO UPDATE SET accessed_at = excluded.accessed_at",
+                (sha256, size, mime_type, now, now),
+            )
+            self._connection.execute(
+                "INSERT OR REPLACE INTO refs (session_id, sha256, created_at) VALUES (?, ?, ?)",
+                (session_id, sha256, now),
+            )
+            self._enforce_session_quota(session_id, keep=sha256)
+            self._evict(now, keep=sha256)
+            self._connection.commit()
+        return handle
+
+    def session_usage(self, session_id: str) -> int:
+        with self._lock:
+            return self._session_usage(session_id)
+
+    def total_usage(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+    def release(self, session_id: str, handles: Iterable[BlobHandle]) -> None:
+        """Remove as referências da sessão; o arquivo some quando nenhuma outra sessão o usa."""
+        with self._lock:
+            for handle in handles:
+                self._connection.execute(
+                    "DELETE FROM refs WHERE session_id = ? AND sha256 = ?", (session_id, handle.sha256)
+                )
+                self._drop_if_unreferenced(handle.sha256)
+            self._connection.commit()
+
+    def evict_expired(self) -> List[str]:
+        """Remove o que expirou enquanto nenhuma gravação nova chegava (ex.: com o servidor parado)."""
+        with self._lock:
+            removed = self._evict(time.time())
+            self._connection.commit()
+        return removed
+
+    def _session_usage(self, session_id: str) -> int:
+        return self._connection.execute(
+            "SELECT COALESCE(SUM(blobs.size), 0) FROM refs JOIN blobs USING (sha256) WHERE refs.session_id = ?",
+            (session_id,),
+        ).fetchone()[0]
+
+    def _enforce_session_quota(self, session_id: str, keep: str) -> None:
+        rows = self._connection.execute(
+            "SELECT refs.sha256 FROM refs JOIN blobs USING (sha256) "
+            "WHERE refs.session_id = ? AND refs.sha256 != ? ORDER BY refs.created_at",
+            (session_id, keep),
+        ).fetchall()
+        for (sha256,) in rows:
+            if self._session_usage(session_id) <= self.session_quota_bytes:
+                break
+            self._connection.execute("DELETE FROM refs WHERE session_id = ? AND sha256 = ?", (session_id, sha256))
+            self._drop_if_unreferenced(sha256)
+
+    def _evict(self, now: float, keep: str = "") -> List[str]:
+        """Remove blobs expirados e, se a cota global estourar, os acessados há mais tempo."""
+        expired = [
+            row[0]
+            for row in self._connection.execute(
+                "SELECT sha256 FROM blobs WHERE accessed_at < ? AND sha256 != ?", (now - self.ttl_seconds, keep)
+            )
+        ]
+        for sha256 in expired:
+            self._delete(sha256)
+        for leftover in (self.directory / "incoming").iterdir():
+            # Gravações abandonadas no meio (aba fechada, processo reiniciado).
+            if leftover.stat().st_mtime < now - self.ttl_seconds:
+                leftover.unlink(missing_ok=True)
+        total = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+        if total > self.global_quota_bytes:
+            for sha256, size in self._connection.execute(
+                "SELECT sha256, size FROM blobs WHERE sha256 != ? ORDER BY accessed_at", (keep,)
+            ).fetchall():
+                if total <= self.global_quota_bytes:
+                    break
+                self._delete(sha256)
+                expired.append(sha256)
+                total -= size
+        return expired
+
+    def _drop_if_unreferenced(self, sha256: str) -> None:
+        if self._connection.execute("SELECT 1 FROM refs WHERE sha256 = ? LIMIT 1", (sha256,)).fetchone() is None:
+            self._delete(sha256)
+
+    def _delete(self, sha256: str) -> None:
+        self._connection.execute("DELETE FROM refs WHERE sha256 = ?", (sha256,))
+        self._connection.execute("DELETE FROM blobs WHERE sha256 = ?", (sha256,))
+        (self.directory / "objects" / sha256[:2] / sha256).unlink(missing_ok=True)
+
+
+@functools.lru_cache(maxsize=None)
+def shared_blob_store() -> BlobStore:
+    """Armazenamento único por processo, compartilhado entre as sessões do Streamlit.
+
+    Fora daqui, a expiração roda a cada gravação concluída.
+    """
+    store = BlobStore()
+    store.evict_expired()
+    return store
@@ -0,0 +1,131 @@
+"""Divisão de currículos longos em blocos por seção, respeitando um orçamento de tokens."""
+
+import importlib.util
+import re
+from typing import List
+
+TIKTOKEN_AVAILABLE = importlib.util.find_spec("tiktoken") is not None
+
+if TIKTOKEN_AVAILABLE:
+    import tiktoken  # type: ignore
+
+DEFAULT_CHUNK_TOKENS = 1_500
+CHARS_PER_TOKEN = 4
+
+_SECTION_NAMES = (
+    "resumo",
+    "objetivo",
+    "perfil",
+    "experiência",
+    "experiencia",
+    "experiência profissional",
+    "histórico profissional",
+    "formação",
+    "formação acadêmica",
+    "educação",
+    "competências",
+    "habilidades",
+    "projetos",
+    "publicações",
+    "certificações",
+    "cursos",
+    "idiomas",
+    "prêmios",
+    "summary",
+    "experience",
+    "education",
+    "skills",
+    "projects",
+    "publications",
+    "certifications",
+    "languages",
+    "awards",
+)
+_HEADING_PATTERN = re.compile(
+    r"^\s*(?:#+\s*)?(?:" + "|".join(re.escape(name) for name in _SECTION_NAMES) + r")\b.{0,40}$",
+    re.IGNORECASE,
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Conta tokens com `tiktoken` quando disponível; caso contrário, estima por caracteres."""
+    if not text:
+        return 0
+    if TIKTOKEN_AVAILABLE:
+        return len(_encoding().encode(text))
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def _encoding():
+    return tiktoken.get_encoding("cl100k_base")
+
+
+def _is_heading(line: str) -> bool:
+    stripped = line.strip()
+    if not stripped or len(stripped) > 60:
+        return False
+    if _HEADING_PATTERN.match(stripped):
+        return True
+    letters = [char for char in stripped if char.isalpha()]
+    return len(letters) >= 4 and all(char.isupper() for char in letters)
+
+
+def split_sections(text: str) -> List[str]:
+    """Quebra o texto nas linhas que parecem títulos de seção (EXPERIÊNCIA, Formação, Skills...)."""
+    sections: List[str] = []
+    current: List[str] = []
+    for line in text.splitlines():
+        if _is_heading(line) and any(part.strip() for part in current):
+            sections.append("\n".join(current).strip())
+            current = []
+        current.append(line)
+    if any(part.strip() for part in current):
+        sections.append("\n".join(current).strip())
+    return sections
+
+
+def _split_oversized(section: str, max_tokens: int) -> List[str]:
+    pieces: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    for line in section.splitlines():
+        line_tokens = estimate_tokens(line)
+        if line_tokens > max_tokens:
+            max_chars = max_tokens * CHARS_PER_TOKEN
+            for start in range(0, len(line), max_chars):
+                if current:
+                    pieces.append("\n".join(current))
+                    current, current_tokens = [], 0
+                pieces.append(line[start : start + max_chars])
+            continue
+        if current and current_tokens + line_tokens > max_tokens:
+            pieces.append("\n".join(current))
+            current, current_tokens = [], 0
+        current.append(line)
+        current_tokens += line_tokens
+    if current:
+        pieces.append("\n".join(current))
+    return pieces
+
+
+def chunk_text(text: str, max_tokens: int = DEFAULT_CHUNK_TOKENS) -> List[str]:
+    """Agrupa seções consecutivas em blocos de até `max_tokens`; seções maiores são subdivididas."""
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    for section in split_sections(text):
+        section_tokens = estimate_tokens(section)
+        if section_tokens > max_tokens:
+            if current:
+                chunks.append("\n\n".join(current))
+                current, current_tokens = [], 0
+            chunks.extend(_split_oversized(section, max_tokens))
+            continue
+        if current and current_tokens + section_tokens > max_tokens:
+            chunks.append("\n\n".join(current))
+            current, current_tokens = [], 0
+        current.append(section)
+        current_tokens += section_tokens
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
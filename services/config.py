@@ -0,0 +1,8 @@
+"""Configurações compartilhadas pelos serviços."""
+
+import os
+from pathlib import Path
+
+DATA_DIR = Path(os.environ.get("RECRUITMENT_AI_DATA_DIR", ".recruitment_ai"))
+METRICS_PORT = int(os.environ.get("RECRUITMENT_AI_METRICS_PORT", "0") or 0)
+METRICS_HOST = os.environ.get("RECRUITMENT_AI_METRICS_HOST", "127.0.0.1") or "127.0.0.1"
@@ -0,0 +1,165 @@
+"""Detecção de currículos quase duplicados com MinHash + LSH, persistida entre lotes."""
+
+import functools
+import hashlib
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from services.config import DATA_DIR
+from services.ranking import tokenize
+
+DEFAULT_DEDUP_PATH = DATA_DIR / "dedup.sqlite3"
+NUM_PERMUTATIONS = 128
+LSH_BANDS = 32
+SHINGLE_SIZE = 3
+DEFAULT_THRESHOLD = 0.85
+
+_MERSENNE_PRIME = np.uint64((1 << 31) - 1)
+_RNG = np.random.default_rng(20240521)
+_COEFF_A = _RNG.integers(1, int(_MERSENNE_PRIME), size=NUM_PERMUTATIONS, dtype=np.uint64)
+_COEFF_B = _RNG.integers(0, int(_MERSENNE_PRIME), size=NUM_PERMUTATIONS, dtype=np.uint64)
+
+
+def minhash_signature(text: str) -> Optional[np.ndarray]:
+    """Assinatura MinHash dos 3-gramas de palavras; `None` para textos sem conteúdo comparável."""
+    tokens = tokenize(text)
+    if len(tokens) < SHINGLE_SIZE:
+        shingles = {" ".join(tokens)} if tokens else set()
+    else:
+        shingles = {" ".join(tokens[i : i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)}
+    if not shingles:
+        return None
+    hashed = np.fromiter((zlib.crc32(item.encode()) for item in shingles), dtype=np.uint64, count=len(shingles))
+    permuted = (_COEFF_A[:, None] * hashed[None, :] + _COEFF_B[:, None]) % _MERSENNE_PRIME
+    return permuted.min(axis=1).astype(np.uint32)
+
+
+def similarity(left: np.ndarray, right: np.ndarray) -> float:
+    """Estimativa da similaridade de Jaccard entre dois textos a partir das assinaturas."""
+    return float(np.mean(left == right))
+
+
+def _band_keys(signature: np.ndarray) -> List[str]:
+    rows = NUM_PERMUTATIONS // LSH_BANDS
+    return [
+        hashlib.blake2b(signature[band * rows : (band + 1) * rows].tobytes(), digest_size=8).hexdigest()
+        for band in range(LSH_BANDS)
+    ]
+
+
+def group_near_duplicates(
+    signatures: Sequence[Optional[np.ndarray]], threshold: float = DEFAULT_THRESHOLD
+) -> List[int]:
+    """Para cada item, o índice do primeiro item do mesmo grupo de quase duplicados (ele mesmo se único)."""
+    representative = list(range(len(signatures)))
+    buckets: Dict[tuple, List[int]] = {}
+    for index, signature in enumerate(signatures):
+        if signature is None:
+            continue
+        for band, key in enumerate(_band_keys(signature)):
+            for other in buckets.get((band, key), ()):
+                root = representative[other]
+                if root != representative[index] and similarity(signature, signatures[root]) >= threshold:
+                    representative[index] = min(root, representative[index])
+            buckets.setdefault((band, key), []).append(index)
+    return representative
+
+
+@dataclass(frozen=True)
+class DuplicateMatch:
+    sha256: str
+    file_name: str
+    similarity: float
+    analysis: Optional[str]
+
+
+class DedupIndex:
+    """Índice LSH em SQLite: cada banda da assinatura aponta para os currículos que a compartilham."""
+
+    def __init__(self, path: Path = DEFAULT_DEDUP_PATH, threshold: float = DEFAULT_THRESHOLD) -> None:
+        self.path = Path(path)
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS documents (
+                sha256 TEXT PRIMARY KEY,
+                file_name TEXT NOT NULL,
+                signature BLOB NOT NULL,
+                analysis TEXT,
+                added_at REAL NOT NULL,
+                analysis_key TEXT
+            );
+            CREATE TABLE IF NOT EXISTS bands (
+                band INTEGER NOT NULL,
+                bucket TEXT NOT NULL,
+                sha256 TEXT NOT NULL,
+                PRIMARY KEY (band, bucket, sha256)
+            );
+            """
+        )
+        # Bancos anteriores não tinham a coluna: as linhas antigas ficam sem chave e nunca são reaproveitadas.
+        existing = {row[1] for row in self._connection.execute("PRAGMA table_info(documents)")}
+        if "analysis_key" not in existing:
+            self._connection.execute("ALTER TABLE documents ADD COLUMN analysis_key TEXT")
+        self._connection.commit()
+
+    def add(
+        self, sha256: str, file_name: str, signature: np.ndarray, analysis: Optional[str], analysis_key: str
+    ) -> None:
+        """Registra um currículo com a análise feita sob `analysis_key` (prompt, temperatura, agente, esquema)."""
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO documents (sha256, file_name, signature, analysis, added_at, analysis_key) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (sha256, file_name, signature.astype(np.uint32).tobytes(), analysis, time.time(), analysis_key),
+            )
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO bands (band, bucket, sha256) VALUES (?, ?, ?)",
+                [(band, key, sha256) for band, key in enumerate(_band_keys(signature))],
+            )
+            self._connection.commit()
+
+    def find(self, signature: np.ndarray, analysis_key: str, exclude_sha256: str = "") -> Optional[DuplicateMatch]:
+        """Melhor correspondência histórica acima do limiar, consultando apenas os baldes LSH.
+
+        Só considera análises feitas com os mesmos parâmetros (`analysis_key`): quase duplicados
+        analisados com outro prompt, temperatura, agente ou esquema não são reaproveitados.
+        """
+        keys = _band_keys(signature)
+        with self._lock:
+            candidates = {
+                row[0]
+                for band, key in enumerate(keys)
+                for row in self._connection.execute(
+                    "SELECT sha256 FROM bands WHERE band = ? AND bucket = ?", (band, key)
+                )
+            }
+            candidates.discard(exclude_sha256)
+            best: Optional[DuplicateMatch] = None
+            for candidate in candidates:
+                row = self._connection.execute(
+                    "SELECT file_name, signature, analysis FROM documents WHERE sha256 = ? AND analysis_key = ?",
+                    (candidate, analysis_key),
+                ).fetchone()
+                if row is None:
+                    continue
+                score = similarity(signature, np.frombuffer(row[1], dtype=np.uint32))
+                if score >= self.threshold and (best is None or score > best.similarity):
+                    best = DuplicateMatch(sha256=candidate, file_name=row[0], similarity=score, analysis=row[2])
+        return best
+
+
+@functools.lru_cache(maxsize=None)
+def shared_dedup_index() -> DedupIndex:
+    """Índice único por processo, compartilhado entre as sessões do Streamlit."""
+    return DedupIndex()
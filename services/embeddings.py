@@ -0,0 +1,181 @@
+"""Índice vetorial persistente de currículos: matriz float32 append-only mapeada em memória."""
+
+import functools
+import hashlib
+import json
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from services.config import DATA_DIR
+from services.ranking import tokenize
+
+DEFAULT_INDEX_DIR = DATA_DIR / "embeddings"
+DEFAULT_DIM = 256
+SEARCH_BLOCK_ROWS = 65_536
+
+EmbeddingFunction = Callable[[Sequence[str]], np.ndarray]
+
+
+def hashing_embedding(texts: Sequence[str], dim: int = DEFAULT_DIM) -> np.ndarray:
+    """Embedding local e determinístico: termos e bigramas projetados por hashing (feature hashing).
+
+    Não captura sinônimos como um modelo neural, mas não depende de rede nem de GPU e pode ser
+    trocado por qualquer função `textos -> matriz (n, dim)` ao construir o `EmbeddingIndex`.
+    """
+    vectors = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        tokens = tokenize(text)
+        features = tokens + [f"{left} {right}" for left, right in zip(tokens, tokens[1:])]
+        if not features:
+            continue
+        digests = np.array(
+            [int.from_bytes(hashlib.blake2b(item.encode(), digest_size=8).digest(), "little") for item in features],
+            dtype=np.uint64,
+        )
+        buckets = (digests % np.uint64(dim)).astype(np.int64)
+        signs = np.where((digests >> np.uint64(63)) == 1, -1.0, 1.0).astype(np.float32)
+        np.add.at(vectors[row], buckets, signs)
+    return vectors
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return (vectors / np.where(norms == 0, 1.0, norms)).astype(np.float32)
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    row: int
+    score: float
+    metadata: Dict
+
+
+class EmbeddingIndex:
+    """Guarda vetores normalizados em `vectors.f32` e metadados em `metadata.jsonl`, ambos só com append."""
+
+    def __init__(
+        self,
+        directory: Path = DEFAULT_INDEX_DIR,
+        embed: EmbeddingFunction = hashing_embedding,
+        dim: int = DEFAULT_DIM,
+    ) -> None:
+        self.directory = Path(directory)
+        self.embed = embed
+        self.dim = dim
+        self._vectors_path = self.directory / "vectors.f32"
+        self._metadata_path = self.directory / "metadata.jsonl"
+        self._lock = threading.Lock()
+        self._matrix: Optional[np.memmap] = None
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._check_header()
+        self._metadata: List[Dict] = self._load_metadata()
+        self._hashes = {item.get("sha256") for item in self._metadata}
+
+    def _check_header(self) -> None:
+        header_path = self.directory / "index.json"
+        if header_path.exists():
+            header = json.loads(header_path.read_text(encoding="utf-8"))
+            if header.get("dim") != self.dim:
+                raise ValueError(
+                    f"O índice em {self.directory} usa dimensão {header.get('dim')}, não {self.dim}."
+                )
+        else:
+            header_path.write_text(json.dumps({"dim": self.dim, "dtype": "float32"}), encoding="utf-8")
+
+    def _load_metadata(self) -> List[Dict]:
+        if not self._metadata_path.exists():
+            return []
+        rows = self._vectors_path.stat().st_size // (4 * self.dim) if self._vectors_path.exists() else 0
+        metadata = []
+        with self._metadata_path.open("r", encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    metadata.append(json.loads(line))
+                except json.JSONDecodeError:
+                    break
+        # Uma escrita interrompida pode deixar vetores e metadados desalinhados; vale o menor.
+        return metadata[:rows]
+
+    def __len__(self) -> int:
+        return len(self._metadata)
+
+    def __contains__(self, sha256: str) -> bool:
+        return sha256 in self._hashes
+
+    def add(self, texts: Sequence[str], metadata: Sequence[Dict]) -> int:
+        """Adiciona documentos novos (ignora `sha256` já indexados) e retorna quantos entraram."""
+        fresh = [
+            (text, item)
+            for text, item in zip(texts, metadata)
+            if item.get("sha256") not in self._hashes
+        ]
+        if not fresh:
+            return 0
+        vectors = _normalize(np.asarray(self.embed([text for text, _ in fresh]), dtype=np.float32))
+        with self._lock:
+            expected_bytes = len(self._metadata) * self.dim * 4
+            with self._vectors_path.open("ab") as handle:
+                handle.truncate(expected_bytes)
+                handle.write(vectors.tobytes())
+            with self._metadata_path.open("a", encoding="utf-8") as handle:
+                for _, item in fresh:
+                    record = {"added_at": time.time(), **item}
+                    handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    self._metadata.append(record)
+                    self._hashes.add(item.get("sha256"))
+            self._matrix = None
+        return len(fresh)
+
+    def _mapped(self) -> Optional[np.memmap]:
+        with self._lock:
+            rows = len(self._metadata)
+            if rows == 0:
+                return None
+            if self._matrix is None or self._matrix.shape[0] != rows:
+                self._matrix = np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dim))
+            return self._matrix
+
+    def search_batch(self, queries: Sequence[str], k: int = 10) -> List[List[SearchHit]]:
+        """Top-k por similaridade de cosseno para várias consultas, percorrendo a matriz em blocos."""
+        matrix = self._mapped()
+        if matrix is None or not queries:
+            return [[] for _ in queries]
+        query_vectors = _normalize(np.asarray(self.embed(list(queries)), dtype=np.float32))
+        k = min(k, matrix.shape[0])
+        best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+        best_rows = np.zeros((len(queries), 0), dtype=np.int64)
+        for start in range(0, matrix.shape[0], SEARCH_BLOCK_ROWS):
+            block = np.asarray(matrix[start : start + SEARCH_BLOCK_ROWS])
+            scores = np.concatenate([best_scores, query_vectors @ block.T], axis=1)
+            rows = np.concatenate(
+                [best_rows, np.broadcast_to(np.arange(start, start + block.shape[0]), (len(queries), block.shape[0]))],
+                axis=1,
+            )
+            keep = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            best_scores = np.take_along_axis(scores, keep, axis=1)
+            best_rows = np.take_along_axis(rows, keep, axis=1)
+
+        order = np.argsort(-best_scores, axis=1)
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        best_rows = np.take_along_axis(best_rows, order, axis=1)
+        return [
+            [
+                SearchHit(row=int(row), score=float(score), metadata=self._metadata[int(row)])
+                for row, score in zip(rows, scores)
+            ]
+            for rows, scores in zip(best_rows, best_scores)
+        ]
+
+    def search(self, query: str, k: int = 10) -> List[SearchHit]:
+        return self.search_batch([query], k)[0]
+
+
+@functools.lru_cache(maxsize=None)
+def shared_index() -> EmbeddingIndex:
+    """Índice único por processo, compartilhado entre as sessões do Streamlit."""
+    return EmbeddingIndex()
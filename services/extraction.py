@@ -0,0 +1,192 @@
+"""Extração incremental de texto de currículos em PDF, DOCX e TXT."""
+
+import codecs
+import importlib.util
+import re
+import time
+import zipfile
+import zlib
+from dataclasses import dataclass
+from pathlib import PurePath
+from typing import BinaryIO, Iterator, Optional
+from xml.etree.ElementTree import ParseError, iterparse
+
+from services.metrics import STAGE, shared_metrics
+
+PYPDF_AVAILABLE = importlib.util.find_spec("pypdf") is not None
+
+if PYPDF_AVAILABLE:
+    from pypdf import PdfReader  # type: ignore
+    from pypdf.errors import PdfReadError  # type: ignore
+
+    _EXTRACTION_ERRORS = (zipfile.BadZipFile, zlib.error, ParseError, ValueError, OSError, KeyError, PdfReadError)
+else:
+    _EXTRACTION_ERRORS = (zipfile.BadZipFile, zlib.error, ParseError, ValueError, OSError, KeyError)
+
+# Orçamento do map-reduce de `analyze_resume`: um currículo acadêmico longo entra inteiro e é
+# resumido por blocos. A crew única, sem map-reduce, corta o texto em `SINGLE_PASS_MAX_CHARS`.
+DEFAULT_MAX_CHARS = 120_000
+DEFAULT_MAX_PAGES = 60
+READ_BLOCK_SIZE = 64 * 1024
+
+_WORD_NAMESPACE = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_DOCX_PARTS = ("word/document.xml",)
+_PDF_STREAM_PATTERN = re.compile(rb"stream\r?\n(.*?)\r?\nendstream", re.DOTALL)
+_PDF_TEXT_PATTERN = re.compile(rb"\((?:\\.|[^\\)])*\)\s*Tj|\[(?:[^\]]*)\]\s*TJ", re.DOTALL)
+_PDF_STRING_PATTERN = re.compile(rb"\(((?:\\.|[^\\)])*)\)", re.DOTALL)
+_PDF_ESCAPES = {b"n": b"\n", b"r": b"\r", b"t": b"\t", b"b": b"\b", b"f": b"\f"}
+
+
+@dataclass(frozen=True)
+class ExtractionResult:
+    """Texto extraído de um arquivo e as métricas da extração; `error` indica um arquivo ilegível."""
+
+    text: str
+    source_bytes: int
+    pages: int
+    truncated: bool
+    elapsed_ms: float
+    error: Optional[str] = None
+
+    @property
+    def output_chars(self) -> int:
+        return len(self.text)
+
+    @property
+    def failed(self) -> bool:
+        return self.error is not None
+
+
+def _iter_text_blocks(stream: BinaryIO) -> Iterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    while True:
+        block = stream.read(READ_BLOCK_SIZE)
+        if not block:
+            break
+        yield decoder.decode(block)
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+def _iter_docx_paragraphs(stream: BinaryIO) -> Iterator[str]:
+    with zipfile.ZipFile(stream) as archive:
+        names = set(archive.namelist())
+        for part in _DOCX_PARTS:
+            if part not in names:
+                continue
+            with archive.open(part) as xml_part:
+                pieces = []
+                for _, element in iterparse(xml_part, events=("end",)):
+                    if element.tag == f"{_WORD_NAMESPACE}t" and element.text:
+                        pieces.append(element.text)
+                    elif element.tag == f"{_WORD_NAMESPACE}tab":
+                        pieces.append("\t")
+                    elif element.tag == f"{_WORD_NAMESPACE}p":
+                        yield "".join(pieces) + "\n"
+                        pieces = []
+                        element.clear()
+
+
+def _unescape_pdf_string(raw: bytes) -> str:
+    output = bytearray()
+    index = 0
+    while index < len(raw):
+        char = raw[index : index + 1]
+        if char == b"\\" and index + 1 < len(raw):
+            following = raw[index + 1 : index + 2]
+            output += _PDF_ESCAPES.get(following, following)
+            index += 2
+            continue
+        output += char
+        index += 1
+    return output.decode("latin-1")
+
+
+def _iter_pdf_pages_fallback(stream: BinaryIO) -> Iterator[str]:
+    """Leitor mínimo usado quando `pypdf` não está instalado."""
+    data = stream.read()
+    for match in _PDF_STREAM_PATTERN.finditer(data):
+        content = match.group(1)
+        try:
+            content = zlib.decompress(content)
+        except zlib.error:
+            pass
+        fragments = []
+        for operator in _PDF_TEXT_PATTERN.finditer(content):
+            fragments.extend(
+                _unescape_pdf_string(piece) for piece in _PDF_STRING_PATTERN.findall(operator.group(0))
+            )
+        if fragments:
+            yield " ".join(fragments) + "\n"
+
+
+def _iter_pdf_pages(stream: BinaryIO) -> Iterator[str]:
+    if not PYPDF_AVAILABLE:
+        yield from _iter_pdf_pages_fallback(stream)
+        return
+    reader = PdfReader(stream)
+    for page in reader.pages:
+        yield (page.extract_text() or "") + "\n"
+
+
+def iter_document_text(file_name: str, stream: BinaryIO) -> Iterator[str]:
+    """Gera o texto do documento aos poucos: uma página (PDF), parágrafo (DOCX) ou bloco (TXT)."""
+    suffix = PurePath(file_name).suffix.lower()
+    if suffix == ".pdf":
+        return _iter_pdf_pages(stream)
+    if suffix == ".docx":
+        return _iter_docx_paragraphs(stream)
+    return _iter_text_blocks(stream)
+
+
+def extract_text(
+    file_name: str,
+    stream: BinaryIO,
+    max_chars: int = DEFAULT_MAX_CHARS,
+    max_pages: int = DEFAULT_MAX_PAGES,
+) -> ExtractionResult:
+    """Extrai o texto de `stream` respeitando os limites de caracteres e de páginas."""
+    started = time.perf_counter()
+    stream.seek(0, 2)
+    source_bytes = stream.tell()
+    stream.seek(0)
+
+    is_paged = PurePath(file_name).suffix.lower() == ".pdf"
+    pieces = []
+    collected = 0
+    pages = 0
+    truncated = False
+    error_text = None
+    try:
+        for piece in iter_document_text(file_name, stream):
+            if is_paged and pages >= max_pages:
+                truncated = True
+                break
+            pages += 1
+            remaining = max_chars - collected
+            if len(piece) > remaining:
+                pieces.append(piece[:remaining])
+                truncated = True
+                break
+            pieces.append(piece)
+            collected += len(piece)
+    except _EXTRACTION_ERRORS as error:
+        # O texto parcial não é usado: um currículo pela metade não deve ser analisado como se fosse inteiro.
+        pieces = []
+        error_text = f"Não foi possível extrair o texto: {type(error).__name__}: {error}"
+    finally:
+        stream.seek(0)
+
+    result = ExtractionResult(
+        text="".join(pieces).strip(),
+        source_bytes=source_bytes,
+        pages=pages if is_paged else 0,
+        truncated=truncated,
+        elapsed_ms=(time.perf_counter() - started) * 1000,
+        error=error_text,
+    )
+    shared_metrics().observe(
+        STAGE, result.elapsed_ms, stage="text_extraction", format=PurePath(file_name).suffix.lower() or "?"
+    )
+    return result
@@ -0,0 +1,75 @@
+"""Seções de página como fragmentos do Streamlit, com a duração de cada execução registrada.
+
+Uma interação dentro de um fragmento reexecuta só a função decorada, e não o script inteiro; em
+versões do Streamlit sem fragmentos, a função continua sendo cronometrada e roda com a página.
+"""
+
+import functools
+import time
+import uuid
+from typing import Optional
+
+import streamlit as st
+
+from services.metrics import STAGE, shared_metrics
+from services.reruns import FULL_PAGE, shared_rerun_timings
+
+_fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+FRAGMENTS_AVAILABLE = _fragment is not None
+
+
+def session_id() -> str:
+    return st.session_state.setdefault("session_id", uuid.uuid4().hex)
+
+
+def isolated(page: str, scope: str, run_every: Optional[float] = None):
+    """Decorador: executa a função como fragmento e registra o tempo de cada execução em `scope`.
+
+    Com `run_every`, o fragmento se reexecuta sozinho nesse intervalo (em segundos); sem fragmentos
+    (`FRAGMENTS_AVAILABLE` falso), a função roda uma vez com a página e cabe a ela oferecer um botão.
+    """
+
+    def decorate(func):
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _record_run(page, scope, (time.perf_counter() - started) * 1000)
+
+        if _fragment is None:
+            return timed
+        return _fragment(timed, run_every=run_every) if run_every else _fragment(timed)
+
+    return decorate
+
+
+def _record_run(page: str, scope: str, elapsed_ms: float) -> None:
+    shared_rerun_timings().record(page, scope, elapsed_ms, session_id())
+    shared_metrics().observe(STAGE, elapsed_ms, stage="render", page=page, scope=scope)
+
+
+def record_full_run(page: str, elapsed_ms: float) -> None:
+    _record_run(page, FULL_PAGE, elapsed_ms)
+
+
+def render_rerun_timings(page: str) -> None:
+    """Tempo de resposta por seção da página, somando todas as sessões abertas neste servidor."""
+    timings = shared_rerun_timings()
+    with st.expander("⏱️ Tempo de resposta das interações"):
+        st.dataframe(
+            [
+                {
+                    "Seção": summary.scope,
+                    "Execuções": summary.count,
+                    "p50 (ms)": round(summary.p50_ms, 1),
+                    "p95 (ms)": round(summary.p95_ms, 1),
+                    "Máximo (ms)": round(summary.max_ms, 1),
+                    "Sessões": summary.sessions,
+                }
+                for summary in timings.summary(page)
+            ],
+            hide_index=True,
+        )
+        st.caption(f"{timings.active_sessions()} sessão(ões) ativa(s) nos últimos 5 minutos, em todas as páginas.")
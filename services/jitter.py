@@ -0,0 +1,168 @@
+"""Buffer de jitter adaptativo para o retorno de áudio em tempo real, com telemetria de latência.
+
+A profundidade alvo acompanha a variação no intervalo de chegada dos quadros (estimativa do RFC 3550)
+e nunca passa da latência máxima configurada. Acima do alvo, quadros silenciosos são descartados
+primeiro ("compressão", inaudível); acima do limite, os quadros mais antigos saem. Um relógio de
+reprodução virtual indica quando o áudio guardado teria acabado antes do quadro seguinte (underrun).
+"""
+
+import collections
+import threading
+import time
+from dataclasses import dataclass
+from typing import Deque, Optional
+
+import numpy as np
+
+from services.metering import to_dbfs, to_float_samples
+
+MIN_TARGET_MS = 20.0
+JITTER_GAIN = 1 / 16
+JITTER_MULTIPLIER = 4.0
+QUIET_DB = -50.0
+TELEMETRY_WINDOW = 500
+
+
+@dataclass(frozen=True)
+class JitterStats:
+    """Fotografia do buffer para a interface."""
+
+    max_latency_ms: float
+    target_ms: float
+    depth_ms: float
+    jitter_ms: float
+    latency_p50_ms: float
+    latency_p95_ms: float
+    latency_max_ms: float
+    underruns: int
+    dropped: int
+    compressed: int
+    frames_in: int
+    frames_out: int
+
+
+@dataclass(frozen=True)
+class _BufferedFrame:
+    arrived_at: float
+    samples: np.ndarray
+    duration_ms: float
+    quiet: bool
+
+
+class JitterBuffer:
+    """Fila de quadros entre a chegada (thread do WebRTC) e o retorno; métodos seguros entre threads."""
+
+    def __init__(self, max_latency_ms: float) -> None:
+        self._lock = threading.Lock()
+        self._frames: Deque[_BufferedFrame] = collections.deque()
+        self._latencies: Deque[float] = collections.deque(maxlen=TELEMETRY_WINDOW)
+        self.max_latency_ms = float(max_latency_ms)
+        self._target_ms = MIN_TARGET_MS
+        self._jitter_ms = 0.0
+        self._depth_ms = 0.0
+        self._last_arrival: Optional[float] = None
+        self._last_duration_ms = 0.0
+        self._runs_out_at = 0.0
+        self._playing = False
+        self._underruns = 0
+        self._dropped = 0
+        self._compressed = 0
+        self._frames_in = 0
+        self._frames_out = 0
+
+    def set_max_latency(self, max_latency_ms: float) -> None:
+        with self._lock:
+            self.max_latency_ms = float(max_latency_ms)
+
+    def push(self, samples: np.ndarray, duration_ms: float, now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        quiet = to_dbfs(float(np.sqrt(np.mean(np.square(to_float_samples(samples), dtype=np.float64))))) < QUIET_DB
+        with self._lock:
+            if self._last_arrival is not None:
+                deviation = abs((now - self._last_arrival) * 1000 - self._last_duration_ms)
+                self._jitter_ms += (deviation - self._jitter_ms) * JITTER_GAIN
+            self._last_arrival = now
+            self._last_duration_ms = duration_ms
+            if self._playing and now > self._runs_out_at:
+                # O áudio guardado acabou antes deste quadro chegar: volta a encher até o alvo.
+                self._underruns += 1
+                self._playing = False
+            self._target_ms = min(
+                self.max_latency_ms, max(MIN_TARGET_MS, duration_ms + JITTER_MULTIPLIER * self._jitter_ms)
+            )
+            self._frames.append(_BufferedFrame(now, samples, duration_ms, quiet))
+            self._depth_ms += duration_ms
+            self._frames_in += 1
+            while self._depth_ms > self.max_latency_ms and len(self._frames) > 1:
+                self._depth_ms -= self._frames.popleft().duration_ms
+                self._dropped += 1
+            if self._depth_ms > self._target_ms + duration_ms:
+                self._compress_one()
+
+    def _compress_one(self) -> None:
+        for index, frame in enumerate(self._frames):
+            if frame.quiet and index < len(self._frames) - 1:
+                del self._frames[index]
+                self._depth_ms -= frame.duration_ms
+                self._compressed += 1
+                return
+
+    @staticmethod
+    def _latency_ms(frame: _BufferedFrame, now: float) -> float:
+        return (now - frame.arrived_at) * 1000 + frame.duration_ms
+
+    def pop(self, now: Optional[float] = None) -> Optional[np.ndarray]:
+        """Próximo quadro a tocar, ou `None` enquanto o buffer ainda não alcançou o alvo."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if not self._frames or (not self._playing and self._depth_ms < self._target_ms):
+                return None
+            # Quadros que esperaram além do limite (uma pausa longa na chegada) já não servem para o retorno.
+            while len(self._frames) > 1 and self._latency_ms(self._frames[0], now) > self.max_latency_ms:
+                self._depth_ms -= self._frames.popleft().duration_ms
+                self._dropped += 1
+            self._playing = True
+            frame = self._frames.popleft()
+            self._depth_ms -= frame.duration_ms
+            self._frames_out += 1
+            self._latencies.append(self._latency_ms(frame, now))
+            self._runs_out_at = now + (self._depth_ms + frame.duration_ms) / 1000
+            return frame.samples
+
+    def process(self, samples: np.ndarray, duration_ms: float, now: Optional[float] = None) -> Optional[np.ndarray]:
+        """Um passo do retorno guiado pela chegada: guarda o quadro recebido e devolve o que deve tocar."""
+        self.push(samples, duration_ms, now)
+        return self.pop(now)
+
+    def process_frame(self, frame):
+        """Adapta um `av.AudioFrame` do `streamlit-webrtc`; sem quadro disponível, devolve silêncio."""
+        incoming = frame.to_ndarray()
+        outgoing = self.process(incoming, frame.samples / frame.sample_rate * 1000)
+        if outgoing is None:
+            outgoing = np.zeros_like(incoming)
+        result = type(frame).from_ndarray(outgoing, format=frame.format.name, layout=frame.layout.name)
+        result.sample_rate = frame.sample_rate
+        result.pts = frame.pts
+        result.time_base = frame.time_base
+        return result
+
+    def snapshot(self) -> Optional[JitterStats]:
+        with self._lock:
+            if not self._frames_in:
+                return None
+            latencies = np.asarray(self._latencies) if self._latencies else np.zeros(1)
+            p50, p95 = np.percentile(latencies, [50, 95])
+            return JitterStats(
+                max_latency_ms=self.max_latency_ms,
+                target_ms=self._target_ms,
+                depth_ms=self._depth_ms,
+                jitter_ms=self._jitter_ms,
+                latency_p50_ms=float(p50),
+                latency_p95_ms=float(p95),
+                latency_max_ms=float(latencies.max()),
+                underruns=self._underruns,
+                dropped=self._dropped,
+                compressed=self._compressed,
+                frames_in=self._frames_in,
+                frames_out=self._frames_out,
+            )
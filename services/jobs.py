@@ -0,0 +1,266 @@
+"""Fila local de lotes de análise executados em segundo plano e persistidos em SQLite."""
+
+import functools
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+from services.analysis import (
+    CREW_AVAILABLE,
+    DEFAULT_CHUNK_TOKENS,
+    DEFAULT_MAX_CONCURRENCY,
+    ResumeInput,
+    analyze_concurrently,
+    analyze_resume,
+)
+from services.analysis_cache import AnalysisCache, shared_cache
+from services.config import DATA_DIR
+from services.results import ResumeAnalysis
+
+DEFAULT_JOBS_PATH = DATA_DIR / "jobs.sqlite3"
+DEFAULT_MAX_ACTIVE_JOBS = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    max_concurrency INTEGER NOT NULL,
+    chunk_tokens INTEGER NOT NULL DEFAULT 1500,
+    total INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS job_items (
+    job_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    file_name TEXT NOT NULL,
+    preview TEXT NOT NULL,
+    cache_key TEXT NOT NULL,
+    status TEXT NOT NULL,
+    content TEXT,
+    error TEXT,
+    elapsed_ms REAL,
+    tokens_in INTEGER,
+    tokens_out INTEGER,
+    chunks INTEGER,
+    result_json TEXT,
+    PRIMARY KEY (job_id, position)
+);
+"""
+_ADDED_COLUMNS = (
+    ("jobs", "chunk_tokens", "INTEGER NOT NULL DEFAULT 1500"),
+    ("job_items", "tokens_in", "INTEGER"),
+    ("job_items", "tokens_out", "INTEGER"),
+    ("job_items", "chunks", "INTEGER"),
+    ("job_items", "result_json", "TEXT"),
+    ("jobs", "error", "TEXT"),
+)
+
+
+@dataclass(frozen=True)
+class JobItem:
+    position: int
+    file_name: str
+    status: str
+    content: Optional[str]
+    error: Optional[str]
+    elapsed_ms: Optional[float]
+    tokens_in: Optional[int]
+    tokens_out: Optional[int]
+    chunks: Optional[int]
+    result_json: Optional[str]
+
+    @property
+    def result(self) -> Optional[ResumeAnalysis]:
+        """Resultado tipado gravado pelo worker (`None` enquanto o item está pendente)."""
+        return ResumeAnalysis.from_json(self.result_json) if self.result_json else None
+
+
+@dataclass(frozen=True)
+class JobStatus:
+    id: str
+    status: str
+    total: int
+    done: int
+    failed: int
+    created_at: float
+    updated_at: float
+    items: List[JobItem]
+    error: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed")
+
+
+class JobQueue:
+    """Recebe lotes, processa-os em threads de fundo e grava cada resultado assim que termina."""
+
+    def __init__(
+        self,
+        path: Path = DEFAULT_JOBS_PATH,
+        cache: Optional[AnalysisCache] = None,
+        max_active_jobs: int = DEFAULT_MAX_ACTIVE_JOBS,
+    ) -> None:
+        self.path = Path(path)
+        self.cache = cache
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._connection.executescript(_SCHEMA)
+        self._add_missing_columns()
+        self._connection.commit()
+        self._executor = ThreadPoolExecutor(max_workers=max_active_jobs, thread_name_prefix="analysis-job")
+        self._resume_interrupted()
+
+    def _add_missing_columns(self) -> None:
+        """Atualiza bancos criados por versões anteriores do esquema."""
+        for table, column, definition in _ADDED_COLUMNS:
+            existing = {row[1] for row in self._connection.execute(f"PRAGMA table_info({table})")}
+            if column not in existing:
+                self._connection.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+    def submit(
+        self,
+        resumes: Sequence[ResumeInput],
+        cache_keys: Sequence[str],
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        chunk_tokens: int = DEFAULT_CHUNK_TOKENS,
+    ) -> str:
+        job_id = uuid.uuid4().hex[:12]
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT INTO jobs (id, status, max_concurrency, chunk_tokens, total, created_at, updated_at) "
+                "VALUES (?, 'queued', ?, ?, ?, ?, ?)",
+                (job_id, max_concurrency, chunk_tokens, len(resumes), now, now),
+            )
+            self._connection.executemany(
+                "INSERT INTO job_items (job_id, position, file_name, preview, cache_key, status) "
+                "VALUES (?, ?, ?, ?, ?, 'pending')",
+                [
+                    (job_id, position, resume.file_name, resume.preview, key)
+                    for position, (resume, key) in enumerate(zip(resumes, cache_keys))
+                ],
+            )
+            self._connection.commit()
+        self._executor.submit(self._run, job_id)
+        return job_id
+
+    def status(self, job_id: str) -> Optional[JobStatus]:
+        with self._lock:
+            job = self._connection.execute(
+                "SELECT id, status, total, created_at, updated_at, error FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if job is None:
+                return None
+            rows = self._connection.execute(
+                "SELECT position, file_name, status, content, error, elapsed_ms, tokens_in, tokens_out, chunks, "
+                "result_json "
+                "FROM job_items "
+                "WHERE job_id = ? ORDER BY position",
+                (job_id,),
+            ).fetchall()
+        items = [JobItem(*row) for row in rows]
+        return JobStatus(
+            id=job[0],
+            status=job[1],
+            total=job[2],
+            done=sum(item.status in ("done", "failed") for item in items),
+            failed=sum(item.status == "failed" for item in items),
+            created_at=job[3],
+            updated_at=job[4],
+            items=items,
+            error=job[5],
+        )
+
+    def recent_jobs(self, limit: int = 10) -> List[str]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT id FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def _resume_interrupted(self) -> None:
+        """Retoma lotes que estavam na fila ou em execução quando o processo parou."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT id FROM jobs WHERE status IN ('queued', 'running') ORDER BY created_at"
+            ).fetchall()
+        for (job_id,) in rows:
+            self._executor.submit(self._run, job_id)
+
+    def _set_job_status(self, job_id: str, status: str, error: Optional[str] = None) -> None:
+        with self._lock:
+            self._connection.execute(
+                "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE id = ?",
+                (status, error, time.time(), job_id),
+            )
+            self._connection.commit()
+
+    def _run(self, job_id: str) -> None:
+        """Processa o lote; um erro fora das análises (ex.: gravação no SQLite) encerra o lote como falho."""
+        try:
+            self._process(job_id)
+        except Exception as error:  # noqa: BLE001 - o lote não pode ficar "running" até o próximo restart
+            with self._lock:
+                self._connection.rollback()
+            self._set_job_status(job_id, "failed", f"{type(error).__name__}: {error}")
+
+    def _process(self, job_id: str) -> None:
+        with self._lock:
+            max_concurrency, chunk_tokens = self._connection.execute(
+                "SELECT max_concurrency, chunk_tokens FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            pending = self._connection.execute(
+                "SELECT position, file_name, preview, cache_key FROM job_items "
+                "WHERE job_id = ? AND status = 'pending' ORDER BY position",
+                (job_id,),
+            ).fetchall()
+        self._set_job_status(job_id, "running")
+
+        resumes = [ResumeInput(file_name=row[1], preview=row[2]) for row in pending]
+        any_ok = False
+        analyze = functools.partial(analyze_resume, chunk_tokens=chunk_tokens)
+        for index, analysis in analyze_concurrently(resumes, max_concurrency, analyze):
+            position, _, _, cache_key = pending[index]
+            any_ok = any_ok or analysis.ok
+            result = analysis.to_result()
+            if analysis.ok and self.cache is not None and cache_key:
+                self.cache.put(cache_key, result.to_json())
+            with self._lock:
+                self._connection.execute(
+                    "UPDATE job_items SET status = ?, content = ?, error = ?, elapsed_ms = ?, "
+                    "tokens_in = ?, tokens_out = ?, chunks = ?, result_json = ? WHERE job_id = ? AND position = ?",
+                    (
+                        "done" if analysis.ok else "failed",
+                        analysis.content,
+                        analysis.error,
+                        analysis.elapsed_ms,
+                        analysis.tokens.prompt,
+                        analysis.tokens.completion,
+                        analysis.chunks,
+                        result.to_json(),
+                        job_id,
+                        position,
+                    ),
+                )
+                self._connection.execute("UPDATE jobs SET updated_at = ? WHERE id = ?", (time.time(), job_id))
+                self._connection.commit()
+
+        self._set_job_status(job_id, "done" if any_ok or not pending else "failed")
+
+
+@functools.lru_cache(maxsize=None)
+def job_queue() -> JobQueue:
+    """Fila única por processo, compartilhada por todas as sessões do Streamlit.
+
+    Sem a CrewAI as análises são simuladas e não entram no cache, como na execução direta pela página.
+    """
+    return JobQueue(cache=shared_cache() if CREW_AVAILABLE else None)
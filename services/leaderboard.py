@@ -0,0 +1,98 @@
+"""Tabela de classificação dos candidatos: ordenação, filtro por competência e paginação no servidor."""
+
+import math
+from typing import List, Sequence
+
+import pandas as pd
+
+from services.results import SENIORITY_LEVELS, ResumeAnalysis
+
+DEFAULT_PAGE_SIZE = 25
+PAGE_SIZES = (10, 25, 50, 100)
+SORT_COLUMNS = {
+    "Score": "score",
+    "Senioridade": "seniority_rank",
+    "Aderência lexical": "lexical_score",
+    "Arquivo": "file_name",
+}
+DISPLAY_COLUMNS = ["file_name", "score", "seniority", "competencies", "lexical_score", "status"]
+DISPLAY_LABELS = {
+    "file_name": "Arquivo",
+    "score": "Score",
+    "seniority": "Senioridade",
+    "competencies": "Competências",
+    "lexical_score": "Aderência lexical",
+    "status": "Origem",
+}
+
+
+def _status(result: ResumeAnalysis) -> str:
+    if result.failed:
+        return "Falhou"
+    if result.duplicate_of:
+        return "Quase duplicado"
+    if result.cached:
+        return "Cache"
+    return "Analisado"
+
+
+def results_frame(results: Sequence[ResumeAnalysis]) -> pd.DataFrame:
+    """Monta o DataFrame uma vez por lote; a posição na lista vira o índice para achar o resultado."""
+    return pd.DataFrame(
+        {
+            "file_name": [result.file_name for result in results],
+            "score": pd.array([result.score for result in results], dtype="Int64"),
+            "seniority": [result.seniority or "" for result in results],
+            "seniority_rank": pd.array(
+                [
+                    SENIORITY_LEVELS.index(result.seniority) if result.seniority in SENIORITY_LEVELS else None
+                    for result in results
+                ],
+                dtype="Int64",
+            ),
+            "competencies": [", ".join(result.competencies) for result in results],
+            # Chave normalizada "|python|sql|" para filtrar com uma única operação vetorizada.
+            "competency_key": [
+                "|" + "|".join(item.casefold() for item in result.competencies) + "|" for result in results
+            ],
+            "lexical_score": pd.array(
+                [None if result.lexical_score is None else round(result.lexical_score, 1) for result in results],
+                dtype="Float64",
+            ),
+            "status": [_status(result) for result in results],
+        }
+    )
+
+
+def competency_options(results: Sequence[ResumeAnalysis]) -> List[str]:
+    """Competências distintas do lote, agrupando variações de caixa."""
+    seen = {}
+    for result in results:
+        for item in result.competencies:
+            seen.setdefault(item.casefold(), item)
+    return sorted(seen.values(), key=str.casefold)
+
+
+def filter_and_sort(
+    frame: pd.DataFrame,
+    competencies: Sequence[str] = (),
+    sort_by: str = "Score",
+    descending: bool = True,
+) -> pd.DataFrame:
+    """Mantém só quem tem todas as competências pedidas e ordena; valores ausentes vão para o fim."""
+    mask = pd.Series(True, index=frame.index)
+    for item in competencies:
+        mask &= frame["competency_key"].str.contains(f"|{item.casefold()}|", regex=False)
+    column = SORT_COLUMNS.get(sort_by, "score")
+    return frame[mask].sort_values(column, ascending=not descending, na_position="last", kind="stable")
+
+
+def page_count(rows: int, page_size: int = DEFAULT_PAGE_SIZE) -> int:
+    return max(1, math.ceil(rows / page_size))
+
+
+def page_slice(frame: pd.DataFrame, page: int, page_size: int = DEFAULT_PAGE_SIZE) -> pd.DataFrame:
+    """Linhas da página pedida (a partir de 1); páginas fora do intervalo caem na mais próxima."""
+    page = min(max(page, 1), page_count(len(frame), page_size))
+    start = (page - 1) * page_size
+    return frame.iloc[start : start + page_size]
@@ -0,0 +1,104 @@
+"""Medição de níveis de áudio (RMS, pico e clipping) quadro a quadro, vetorizada com NumPy."""
+
+import collections
+import threading
+import time
+from dataclasses import dataclass
+from typing import Deque, Optional
+
+import numpy as np
+
+CLIP_THRESHOLD = 0.999
+SILENCE_DB = -90.0
+PEAK_HOLD_SECONDS = 1.5
+TIMING_WINDOW = 200
+
+
+def to_float_samples(samples: np.ndarray) -> np.ndarray:
+    """Converte amostras inteiras (ex.: `s16` do WebRTC) para float32 no intervalo [-1, 1]."""
+    if np.issubdtype(samples.dtype, np.integer):
+        return samples.astype(np.float32) / float(np.iinfo(samples.dtype).max)
+    return samples.astype(np.float32, copy=False)
+
+
+def to_dbfs(value: float) -> float:
+    return max(SILENCE_DB, 20.0 * float(np.log10(max(value, 1e-12))))
+
+
+@dataclass(frozen=True)
+class MeterReading:
+    """Fotografia do medidor no momento em que a interface é atualizada."""
+
+    rms_db: float
+    peak_db: float
+    peak_hold_db: float
+    clipped_samples: int
+    frames: int
+    process_ms_avg: float
+    process_ms_max: float
+    frame_budget_ms: float
+
+    @staticmethod
+    def level(db: float) -> float:
+        """Posição de 0 a 1 para uma barra de progresso, de -60 dBFS a 0 dBFS."""
+        return min(1.0, max(0.0, (db + 60.0) / 60.0))
+
+
+class LevelMeter:
+    """Acumula as medições feitas na thread de áudio; a interface só lê `snapshot()` quando redesenha."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._rms = 0.0
+        self._peak = 0.0
+        self._peak_hold = 0.0
+        self._peak_hold_at = 0.0
+        self._clipped = 0
+        self._frames = 0
+        self._frame_budget_ms = 0.0
+        self._timings: Deque[float] = collections.deque(maxlen=TIMING_WINDOW)
+
+    def process(self, samples: np.ndarray, sample_rate: int, channels: int = 1) -> None:
+        """Mede um quadro de amostras intercaladas; chamado pelo callback de áudio a cada quadro."""
+        started = time.perf_counter()
+        values = to_float_samples(np.asarray(samples)).reshape(-1)
+        if values.size:
+            magnitudes = np.abs(values)
+            rms = float(np.sqrt(np.mean(np.square(values, dtype=np.float64))))
+            peak = float(magnitudes.max())
+            clipped = int(np.count_nonzero(magnitudes >= CLIP_THRESHOLD))
+        else:
+            rms = peak = 0.0
+            clipped = 0
+        budget_ms = values.size / max(channels, 1) / sample_rate * 1000 if sample_rate else 0.0
+        now = time.monotonic()
+        with self._lock:
+            self._rms = rms
+            self._peak = peak
+            if peak >= self._peak_hold or now - self._peak_hold_at > PEAK_HOLD_SECONDS:
+                self._peak_hold = peak
+                self._peak_hold_at = now
+            self._clipped += clipped
+            self._frames += 1
+            self._frame_budget_ms = budget_ms
+            self._timings.append((time.perf_counter() - started) * 1000)
+
+    def snapshot(self) -> Optional[MeterReading]:
+        with self._lock:
+            if not self._frames:
+                return None
+            timings = list(self._timings)
+            return MeterReading(
+                rms_db=to_dbfs(self._rms),
+                peak_db=to_dbfs(self._peak),
+                peak_hold_db=to_dbfs(self._peak_hold),
+                clipped_samples=self._clipped,
+                frames=self._frames,
+                process_ms_avg=sum(timings) / len(timings),
+                process_ms_max=max(timings),
+                frame_budget_ms=self._frame_budget_ms,
+            )
+
+    def process_frame(self, frame) -> None:
+        """Adapta um `av.AudioFrame` recebido pelo `streamlit-webrtc`."""
+        self.process(frame.to_ndarray(), frame.sample_rate, len(frame.layout.channels))
@@ -0,0 +1,272 @@
+"""Contadores e histogramas de duração por etapa, exportados no formato de texto do Prometheus.
+
+Registrar uma medida custa um lock, um `bisect` e um append, poucos microssegundos, então a
+instrumentação fica sempre ligada. Cada série guarda os buckets acumulados (o que o Prometheus
+consome) e também as últimas medidas, usadas nos percentis e nos histogramas do painel.
+
+A exposição é gravada periodicamente em `metrics.prom` na pasta de dados (para o textfile collector
+do node_exporter) e, com `RECRUITMENT_AI_METRICS_PORT` definido, servida em `/metrics` nessa porta.
+O endpoint escuta só em 127.0.0.1; para um Prometheus em outra máquina, defina
+`RECRUITMENT_AI_METRICS_HOST` (por exemplo, `0.0.0.0`).
+"""
+
+import bisect
+import collections
+import functools
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+from services.config import DATA_DIR, METRICS_HOST, METRICS_PORT
+
+METRIC_PREFIX = "recruitment_ai"
+BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1_000, 2_500, 5_000, 10_000, 30_000, 60_000, 120_000)
+SAMPLE_WINDOW = 2_048
+EXPORT_INTERVAL_SECONDS = 15
+DEFAULT_METRICS_PATH = DATA_DIR / "metrics.prom"
+
+STAGE = "stage"
+LLM_REQUEST = "llm_request"
+LLM_CALLS = "llm_calls"
+LLM_TOKENS = "llm_tokens"
+
+HELP = {
+    STAGE: "Duração de cada etapa (leitura de arquivo, montagem de tarefas, kickoff, renderização, decodificação).",
+    LLM_REQUEST: "Duração de cada kickoff da CrewAI, por modelo.",
+    LLM_CALLS: "Chamadas ao LLM, por modelo.",
+    LLM_TOKENS: "Tokens enviados (in) e recebidos (out), por modelo.",
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(values: Dict[str, object]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in values.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Labels, extra: Labels = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+class _Histogram:
+    __slots__ = ("buckets", "count", "total_ms", "recent")
+
+    def __init__(self, window: int) -> None:
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.recent: Deque[float] = collections.deque(maxlen=window)
+
+
+@dataclass(frozen=True)
+class SeriesSummary:
+    """Uma série de durações: totais desde o início do processo e percentis da janela recente."""
+
+    name: str
+    labels: Dict[str, str]
+    count: int
+    total_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+    recent: Tuple[float, ...]
+
+
+@dataclass(frozen=True)
+class CounterValue:
+    name: str
+    labels: Dict[str, str]
+    value: float
+
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    """Valor no percentil `fraction` (0 a 1) de uma lista já ordenada e não vazia."""
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def bucket_counts(samples: Tuple[float, ...]) -> List[Tuple[str, int]]:
+    """Distribuição (não acumulada) das amostras pelos buckets de `BUCKETS_MS`, para o painel."""
+    counts = [0] * (len(BUCKETS_MS) + 1)
+    for sample in samples:
+        counts[bisect.bisect_left(BUCKETS_MS, sample)] += 1
+    labels = [f"≤ {bound:g} ms" for bound in BUCKETS_MS] + [f"> {BUCKETS_MS[-1]:g} ms"]
+    return list(zip(labels, counts))
+
+
+class Metrics:
+    """Registro de histogramas e contadores; seguro entre threads."""
+
+    def __init__(self, window: int = SAMPLE_WINDOW) -> None:
+        self.window = window
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, Labels], _Histogram] = {}
+        self._counters: Dict[Tuple[str, Labels], float] = collections.defaultdict(float)
+
+    def observe(self, name: str, elapsed_ms: float, **labels: object) -> None:
+        key = (name, _labels(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram(self.window)
+            histogram.buckets[bisect.bisect_left(BUCKETS_MS, elapsed_ms)] += 1
+            histogram.count += 1
+            histogram.total_ms += elapsed_ms
+            histogram.recent.append(elapsed_ms)
+
+    def increment(self, name: str, amount: float = 1, **labels: object) -> None:
+        with self._lock:
+            self._counters[(name, _labels(labels))] += amount
+
+    @contextmanager
+    def stage(self, stage: str, **labels: object) -> Iterator[None]:
+        """Cronometra o bloco como a etapa `stage`, inclusive quando ele termina com exceção."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(STAGE, (time.perf_counter() - started) * 1000, stage=stage, **labels)
+
+    def record_llm_call(
+        self, model: str, elapsed_ms: float, tokens_in: int, tokens_out: int, calls: int = 1
+    ) -> None:
+        self.observe(LLM_REQUEST, elapsed_ms, model=model)
+        self.increment(LLM_CALLS, calls, model=model)
+        self.increment(LLM_TOKENS, tokens_in, model=model, direction="in")
+        self.increment(LLM_TOKENS, tokens_out, model=model, direction="out")
+
+    def histograms(self, name: Optional[str] = None) -> List[SeriesSummary]:
+        with self._lock:
+            items = [
+                (key, histogram.count, histogram.total_ms, list(histogram.recent))
+                for key, histogram in self._histograms.items()
+                if name in (None, key[0])
+            ]
+        summaries = []
+        for (series, labels), count, total_ms, recent in items:
+            ordered = sorted(recent)
+            summaries.append(
+                SeriesSummary(
+                    name=series,
+                    labels=dict(labels),
+                    count=count,
+                    total_ms=total_ms,
+                    p50_ms=percentile(ordered, 0.5),
+                    p95_ms=percentile(ordered, 0.95),
+                    p99_ms=percentile(ordered, 0.99),
+                    max_ms=ordered[-1],
+                    recent=tuple(recent),
+                )
+            )
+        return sorted(summaries, key=lambda item: (item.name, sorted(item.labels.items())))
+
+    def counters(self, name: Optional[str] = None) -> List[CounterValue]:
+        with self._lock:
+            items = [(key, value) for key, value in self._counters.items() if name in (None, key[0])]
+        return sorted(
+            (CounterValue(series, dict(labels), value) for (series, labels), value in items),
+            key=lambda item: (item.name, sorted(item.labels.items())),
+        )
+
+    def prometheus_text(self) -> str:
+        """Exposição no formato de texto 0.0.4 do Prometheus, com durações em segundos."""
+        with self._lock:
+            histograms = sorted(
+                (key, list(histogram.buckets), histogram.count, histogram.total_ms)
+                for key, histogram in self._histograms.items()
+            )
+            counters = sorted(self._counters.items())
+        lines: List[str] = []
+        declared = set()
+        for (name, labels), buckets, count, total_ms in histograms:
+            metric = f"{METRIC_PREFIX}_{name}_duration_seconds"
+            if metric not in declared:
+                declared.add(metric)
+                lines += [f"# HELP {metric} {HELP.get(name, name)}", f"# TYPE {metric} histogram"]
+            cumulative = 0
+            for bound, bucket in zip(BUCKETS_MS + (float("inf"),), buckets):
+                cumulative += bucket
+                le = "+Inf" if bound == float("inf") else f"{bound / 1000:g}"
+                lines.append(f"{metric}_bucket{_format_labels(labels, (('le', le),))} {cumulative}")
+            lines.append(f"{metric}_sum{_format_labels(labels)} {total_ms / 1000:.6f}")
+            lines.append(f"{metric}_count{_format_labels(labels)} {count}")
+        for (name, labels), value in counters:
+            metric = f"{METRIC_PREFIX}_{name}_total"
+            if metric not in declared:
+                declared.add(metric)
+                lines += [f"# HELP {metric} {HELP.get(name, name)}", f"# TYPE {metric} counter"]
+            lines.append(f"{metric}{_format_labels(labels)} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: Path = DEFAULT_METRICS_PATH) -> Path:
+        """Grava a exposição de forma atômica, para que um coletor nunca leia um arquivo pela metade."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            "w", dir=path.parent, suffix=".part", delete=False, encoding="utf-8"
+        ) as output:
+            output.write(self.prometheus_text())
+        os.replace(output.name, path)
+        return path
+
+
+@functools.lru_cache(maxsize=None)
+def shared_metrics() -> Metrics:
+    return Metrics()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:  # noqa: N802 - nome definido pelo BaseHTTPRequestHandler
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = shared_metrics().prometheus_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:  # noqa: A002
+        pass
+
+
+def _export_forever(path: Path, interval: float) -> None:
+    while True:
+        try:
+            shared_metrics().write_prometheus(path)
+        except OSError:
+            pass  # disco cheio ou pasta removida: tenta de novo no próximo intervalo
+        time.sleep(interval)
+
+
+@functools.lru_cache(maxsize=None)
+def start_metrics_export(
+    path: Path = DEFAULT_METRICS_PATH,
+    interval: float = EXPORT_INTERVAL_SECONDS,
+    port: int = METRICS_PORT,
+    host: str = METRICS_HOST,
+) -> Optional[ThreadingHTTPServer]:
+    """Inicia (uma vez por processo) a gravação periódica do arquivo e, se `port`, o endpoint HTTP em `host`."""
+    threading.Thread(target=_export_forever, args=(Path(path), interval), name="metrics-export", daemon=True).start()
+    if not port:
+        return None
+    try:
+        server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    except OSError:
+        return None  # porta ocupada: o arquivo continua sendo gravado e o painel mostra o endpoint inativo
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
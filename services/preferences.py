@@ -0,0 +1,39 @@
+"""Preferências do Estúdio de Áudio, salvas em um arquivo JSON compartilhado pela equipe."""
+
+import json
+import os
+import tempfile
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+
+from services.config import DATA_DIR
+
+DEFAULT_PREFERENCES_PATH = DATA_DIR / "preferences.json"
+
+
+@dataclass(frozen=True)
+class AudioPreferences:
+    max_latency_ms: int = 120
+
+
+def load_audio_preferences(path: Path = DEFAULT_PREFERENCES_PATH) -> AudioPreferences:
+    """Lê as preferências salvas; arquivo ausente ou inválido resulta nos valores padrão."""
+    try:
+        stored = json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return AudioPreferences()
+    if not isinstance(stored, dict):
+        return AudioPreferences()
+    known = {field.name for field in fields(AudioPreferences)}
+    try:
+        return AudioPreferences(**{key: value for key, value in stored.items() if key in known})
+    except TypeError:
+        return AudioPreferences()
+
+
+def save_audio_preferences(preferences: AudioPreferences, path: Path = DEFAULT_PREFERENCES_PATH) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile("w", dir=path.parent, suffix=".json", delete=False, encoding="utf-8") as output:
+        json.dump(asdict(preferences), output, indent=2)
+    os.replace(output.name, path)
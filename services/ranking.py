@@ -0,0 +1,109 @@
+"""Pré-ranqueamento lexical (BM25) de currículos contra a descrição da vaga, vetorizado com NumPy."""
+
+import re
+import unicodedata
+from dataclasses import dataclass
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+DEFAULT_K1 = 1.5
+DEFAULT_B = 0.75
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+_STOPWORDS = frozenset(
+    """
+    a ao aos as com como da das de do dos e em entre na nas no nos o os ou para pela pelas pelo
+    pelos por que se sem sob sobre um uma umas uns and are at be by for from in is it of on
+    or the to with will you your we our
+    """.split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Normaliza acentos e caixa e separa termos (mantendo `c++`, `c#`, `node.js`)."""
+    normalized = unicodedata.normalize("NFKD", text.lower())
+    ascii_text = normalized.encode("ascii", "ignore").decode("ascii")
+    return [token for token in _TOKEN_PATTERN.findall(ascii_text) if token not in _STOPWORDS]
+
+
+@dataclass(frozen=True)
+class TermMatrix:
+    """Matriz documento x termo esparsa em formato de coordenadas (COO)."""
+
+    doc_ids: np.ndarray
+    term_ids: np.ndarray
+    counts: np.ndarray
+    doc_lengths: np.ndarray
+    vocabulary: Dict[str, int]
+
+    @property
+    def n_docs(self) -> int:
+        return len(self.doc_lengths)
+
+
+def build_term_matrix(texts: Sequence[str]) -> TermMatrix:
+    vocabulary: Dict[str, int] = {}
+    doc_ids: List[int] = []
+    term_ids: List[int] = []
+    for doc_id, text in enumerate(texts):
+        for token in tokenize(text):
+            term_ids.append(vocabulary.setdefault(token, len(vocabulary)))
+            doc_ids.append(doc_id)
+
+    flat_docs = np.asarray(doc_ids, dtype=np.int64)
+    flat_terms = np.asarray(term_ids, dtype=np.int64)
+    width = max(len(vocabulary), 1)
+    pairs, counts = np.unique(flat_docs * width + flat_terms, return_counts=True)
+    return TermMatrix(
+        doc_ids=pairs // width,
+        term_ids=pairs % width,
+        counts=counts.astype(np.float64),
+        doc_lengths=np.bincount(flat_docs, minlength=len(texts)).astype(np.float64),
+        vocabulary=vocabulary,
+    )
+
+
+def bm25_scores(
+    query: str,
+    matrix: TermMatrix,
+    k1: float = DEFAULT_K1,
+    b: float = DEFAULT_B,
+) -> np.ndarray:
+    """Pontua todos os documentos de uma vez: uma máscara sobre as entradas e um `bincount`."""
+    scores = np.zeros(matrix.n_docs)
+    query_terms = np.asarray(
+        sorted({matrix.vocabulary[token] for token in tokenize(query) if token in matrix.vocabulary}),
+        dtype=np.int64,
+    )
+    if matrix.n_docs == 0 or query_terms.size == 0:
+        return scores
+
+    document_frequency = np.bincount(matrix.term_ids, minlength=len(matrix.vocabulary))
+    idf = np.log1p((matrix.n_docs - document_frequency + 0.5) / (document_frequency + 0.5))
+    average_length = max(matrix.doc_lengths.mean(), 1.0)
+
+    mask = np.isin(matrix.term_ids, query_terms)
+    docs = matrix.doc_ids[mask]
+    terms = matrix.term_ids[mask]
+    tf = matrix.counts[mask]
+    norm = k1 * (1 - b + b * matrix.doc_lengths[docs] / average_length)
+    contributions = idf[terms] * tf * (k1 + 1) / (tf + norm)
+    return np.bincount(docs, weights=contributions, minlength=matrix.n_docs)
+
+
+def rank_resumes(job_description: str, texts: Sequence[str]) -> np.ndarray:
+    """Retorna a pontuação BM25 de cada currículo em relação à vaga, na ordem recebida."""
+    return bm25_scores(job_description, build_term_matrix(texts))
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Índices dos `k` maiores scores, do melhor para o pior (`k <= 0` devolve todos)."""
+    order = np.argsort(-scores, kind="stable")
+    return order if k <= 0 else order[:k]
+
+
+def normalize_scores(scores: np.ndarray) -> np.ndarray:
+    """Escala os scores para 0-100 em relação ao melhor currículo do lote."""
+    best = scores.max() if scores.size else 0.0
+    return scores * (100.0 / best) if best > 0 else np.zeros_like(scores)
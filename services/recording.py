@@ -0,0 +1,111 @@
+"""Recepção de gravações do navegador em trechos binários, gravados no disco enquanto chegam.
+
+Cada mensagem enviada pelo componente é um `Uint8Array` com o formato::
+
+    b"REC1" | id da gravação (16 bytes ASCII) | tamanho do MIME (u8) | MIME |
+    quantidade de trechos (u16) | para cada trecho: seq (u32) | final (u8) | tamanho (u32) | bytes
+
+Como o Streamlit pode agrupar valores enviados entre dois reruns, o componente repete os últimos
+trechos em cada mensagem (janela de redundância) e o servidor descarta os números já gravados.
+"""
+
+import struct
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from services.blobs import BlobHandle, BlobStore, BlobWriter
+
+MAGIC = b"REC1"
+RECORDING_ID_BYTES = 16
+TIMESLICE_MS = 1_000
+REDUNDANCY_WINDOW = 4
+
+_CHUNK_HEADER = struct.Struct(">IBI")
+_COUNT = struct.Struct(">H")
+
+
+class IncompleteRecordingError(ValueError):
+    """Trechos se perderam além da janela de redundância; o arquivo resultante estaria corrompido."""
+
+
+@dataclass(frozen=True)
+class RecordingChunk:
+    seq: int
+    final: bool
+    data: bytes
+
+
+@dataclass(frozen=True)
+class RecordingMessage:
+    recording_id: str
+    mime_type: str
+    chunks: Tuple[RecordingChunk, ...]
+
+
+def decode_message(payload: bytes) -> Optional[RecordingMessage]:
+    """Interpreta uma mensagem do componente; retorna `None` para qualquer conteúdo malformado."""
+    view = memoryview(payload)
+    try:
+        if bytes(view[:4]) != MAGIC:
+            return None
+        offset = 4
+        recording_id = bytes(view[offset : offset + RECORDING_ID_BYTES]).decode("ascii")
+        offset += RECORDING_ID_BYTES
+        mime_length = view[offset]
+        offset += 1
+        mime_type = bytes(view[offset : offset + mime_length]).decode("ascii") or "audio/webm"
+        offset += mime_length
+        (count,) = _COUNT.unpack_from(view, offset)
+        offset += _COUNT.size
+        chunks: List[RecordingChunk] = []
+        for _ in range(count):
+            seq, final, length = _CHUNK_HEADER.unpack_from(view, offset)
+            offset += _CHUNK_HEADER.size
+            if offset + length > len(view):
+                return None
+            chunks.append(RecordingChunk(seq=seq, final=bool(final), data=bytes(view[offset : offset + length])))
+            offset += length
+    except (IndexError, struct.error, UnicodeDecodeError):
+        return None
+    return RecordingMessage(recording_id=recording_id, mime_type=mime_type, chunks=tuple(chunks))
+
+
+@dataclass
+class RecordingUpload:
+    """Estado de uma gravação em andamento para uma sessão; guarda só contadores e o arquivo aberto."""
+
+    recording_id: str
+    writer: BlobWriter
+    next_seq: int = 0
+    missing: int = 0
+    handle: Optional[BlobHandle] = None
+
+    @classmethod
+    def start(cls, store: BlobStore, session_id: str, message: RecordingMessage) -> "RecordingUpload":
+        return cls(recording_id=message.recording_id, writer=store.open_writer(session_id, message.mime_type))
+
+    @property
+    def finished(self) -> bool:
+        return self.handle is not None
+
+    def apply(self, message: RecordingMessage) -> Optional[BlobHandle]:
+        """Grava os trechos ainda não vistos, na ordem; devolve o handle quando chega o trecho final.
+
+        Um salto na sequência descarta a gravação (`IncompleteRecordingError`): um WebM com trechos
+        faltando no meio não toca corretamente, e o blob nunca chega a ser registrado.
+        """
+        for chunk in sorted(message.chunks, key=lambda item: item.seq):
+            if self.finished or self.writer.closed or chunk.seq < self.next_seq:
+                continue
+            if chunk.seq > self.next_seq:
+                self.missing = chunk.seq - self.next_seq
+                self.writer.abort()
+                raise IncompleteRecordingError(
+                    f"{self.missing} trecho(s) da gravação se perderam no envio; ela foi descartada para não "
+                    "gerar um arquivo corrompido. Grave novamente."
+                )
+            self.writer.append(chunk.data)
+            self.next_seq = chunk.seq + 1
+            if chunk.final:
+                self.handle = self.writer.finish()
+        return self.handle
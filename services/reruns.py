@@ -0,0 +1,77 @@
+"""Duração de cada execução (página inteira ou fragmento), agregada entre todas as sessões do processo."""
+
+import collections
+import functools
+import threading
+import time
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional, Tuple
+
+from services.metrics import percentile
+
+RERUN_WINDOW = 1_000
+ACTIVE_SESSION_SECONDS = 300
+
+FULL_PAGE = "página inteira"
+
+
+@dataclass(frozen=True)
+class RerunSummary:
+    page: str
+    scope: str
+    count: int
+    p50_ms: float
+    p95_ms: float
+    max_ms: float
+    sessions: int
+
+
+class RerunTimings:
+    """Janela das últimas `window` execuções de cada escopo; `record` só adquire um lock e faz um append."""
+
+    def __init__(self, window: int = RERUN_WINDOW) -> None:
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples: Dict[Tuple[str, str], Deque[Tuple[float, float, str]]] = {}
+        self._counts: Dict[Tuple[str, str], int] = collections.Counter()
+
+    def record(self, page: str, scope: str, elapsed_ms: float, session_id: str, now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        key = (page, scope)
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = collections.deque(maxlen=self.window)
+            samples.append((now, elapsed_ms, session_id))
+            self._counts[key] += 1
+
+    def summary(self, page: Optional[str] = None) -> List[RerunSummary]:
+        with self._lock:
+            items = [(key, list(samples)) for key, samples in self._samples.items() if page in (None, key[0])]
+            counts = dict(self._counts)
+        summaries = []
+        for key, samples in items:
+            ordered = sorted(elapsed for _, elapsed, _ in samples)
+            summaries.append(
+                RerunSummary(
+                    page=key[0],
+                    scope=key[1],
+                    count=counts[key],
+                    p50_ms=percentile(ordered, 0.5),
+                    p95_ms=percentile(ordered, 0.95),
+                    max_ms=ordered[-1],
+                    sessions=len({session for _, _, session in samples}),
+                )
+            )
+        return sorted(summaries, key=lambda item: (item.page, item.scope))
+
+    def active_sessions(self, within_seconds: float = ACTIVE_SESSION_SECONDS, now: Optional[float] = None) -> int:
+        """Sessões com alguma execução recente, em qualquer página."""
+        cutoff = (time.monotonic() if now is None else now) - within_seconds
+        with self._lock:
+            return len({session for samples in self._samples.values() for at, _, session in samples if at >= cutoff})
+
+
+@functools.lru_cache(maxsize=None)
+def shared_rerun_timings() -> RerunTimings:
+    return RerunTimings()
@@ -0,0 +1,183 @@
+"""Resultado tipado da análise de um currículo, extraído uma única vez do texto da CrewAI."""
+
+import json
+import re
+import unicodedata
+from dataclasses import asdict, dataclass, fields, replace
+from typing import Dict, List, Optional, Tuple
+
+RESULT_SCHEMA_VERSION = 1
+
+SENIORITY_LEVELS = ("Estágio", "Júnior", "Pleno", "Sênior", "Especialista", "Liderança")
+_SENIORITY_ALIASES = {
+    "estagio": "Estágio",
+    "estagiario": "Estágio",
+    "intern": "Estágio",
+    "junior": "Júnior",
+    "jr": "Júnior",
+    "pleno": "Pleno",
+    "mid": "Pleno",
+    "senior": "Sênior",
+    "sr": "Sênior",
+    "especialista": "Especialista",
+    "staff": "Especialista",
+    "principal": "Especialista",
+    "lideranca": "Liderança",
+    "lead": "Liderança",
+    "tech lead": "Liderança",
+    "gerente": "Liderança",
+}
+
+_SCORE_PATTERNS = (
+    re.compile(r"(\d{1,3})\s*/\s*100"),
+    re.compile(r"(?:score|pontua[cç][aã]o|ader[eê]ncia|nota)[^\d\n]{0,40}(\d{1,3})", re.IGNORECASE),
+)
+_SECTION_PATTERN = re.compile(
+    r"(?:^|(?<=[.;])[ \t]+)[#*>\- \t]*"
+    r"(?P<label>compet[eê]ncias(?: principais| chave| -chave)?|habilidades|skills|"
+    r"pr[oó]ximos? passos?(?: sugeridos?)?|next steps|senioridade|n[ií]vel de senioridade|seniority)"
+    r"[ \t]*\**[ \t]*[:\-–]?[ \t]*\**[ \t]*(?P<rest>[^\n]*?)[ \t]*(?=\.[ \t]+\S|\.?[ \t]*$)",
+    re.IGNORECASE | re.MULTILINE,
+)
+_BULLET_PATTERN = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+(.*\S)")
+_JSON_BLOCK_PATTERN = re.compile(r"\{.*\}", re.DOTALL)
+
+
+@dataclass(frozen=True)
+class ResumeAnalysis:
+    """Campos estruturados da análise mais metadados de custo e proveniência."""
+
+    file_name: str
+    content: str
+    score: Optional[int] = None
+    seniority: Optional[str] = None
+    competencies: Tuple[str, ...] = ()
+    next_steps: Tuple[str, ...] = ()
+    elapsed_ms: float = 0.0
+    tokens_in: int = 0
+    tokens_out: int = 0
+    chunks: int = 1
+    cached: bool = False
+    failed: bool = False
+    lexical_score: Optional[float] = None
+    duplicate_of: Optional[str] = None
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ResumeAnalysis":
+        known = {item.name for item in fields(cls)}
+        values = {key: value for key, value in data.items() if key in known}
+        for key in ("competencies", "next_steps"):
+            values[key] = tuple(values.get(key) or ())
+        return cls(**values)
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False, separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, payload: str) -> "ResumeAnalysis":
+        return cls.from_dict(json.loads(payload))
+
+
+def _fold(text: str) -> str:
+    return unicodedata.normalize("NFKD", text.lower()).encode("ascii", "ignore").decode("ascii")
+
+
+def _normalize_seniority(text: str) -> Optional[str]:
+    folded = _fold(text)
+    for alias in sorted(_SENIORITY_ALIASES, key=len, reverse=True):
+        if re.search(rf"\b{re.escape(alias)}\b", folded):
+            return _SENIORITY_ALIASES[alias]
+    return None
+
+
+def _split_items(text: str) -> List[str]:
+    items = [item.strip(" .;*") for item in re.split(r"[,;]|\s+e\s+", text)]
+    return [item for item in items if item]
+
+
+def _section_items(text: str, match: "re.Match", split_inline: bool) -> List[str]:
+    """Itens de uma seção: o texto na mesma linha do rótulo ou os marcadores logo abaixo dele."""
+    inline = match.group("rest").strip(" *")
+    if inline:
+        return _split_items(inline) if split_inline else [inline.strip(" .")]
+    items: List[str] = []
+    for line in text[match.end() :].splitlines()[1:]:
+        bullet = _BULLET_PATTERN.match(line)
+        if bullet:
+            items.append(bullet.group(1).strip(" *"))
+        elif line.strip():
+            break
+    return items
+
+
+def _parse_json(text: str) -> Optional[Dict]:
+    block = _JSON_BLOCK_PATTERN.search(text)
+    if not block:
+        return None
+    try:
+        data = json.loads(block.group(0))
+    except json.JSONDecodeError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _parse_score(text: str) -> Optional[int]:
+    for pattern in _SCORE_PATTERNS:
+        for match in pattern.finditer(text):
+            value = int(match.group(1))
+            if 0 <= value <= 100:
+                return value
+    return None
+
+
+def parse_analysis(file_name: str, content: str, **metadata) -> ResumeAnalysis:
+    """Extrai score, senioridade, competências e próximos passos de uma resposta da CrewAI.
+
+    Aceita tanto um objeto JSON (`score`, `seniority`, `competencies`, `next_steps`) quanto o texto
+    livre com rótulos em português ou inglês; campos não encontrados ficam vazios.
+    """
+    data = _parse_json(content) or {}
+    score = data.get("score")
+    seniority = data.get("seniority") or data.get("senioridade")
+    competencies = data.get("competencies") or data.get("competencias") or []
+    next_steps = data.get("next_steps") or data.get("proximos_passos") or []
+
+    for match in _SECTION_PATTERN.finditer(content):
+        label = _fold(match.group("label"))
+        if "senior" in label and not seniority:
+            seniority = match.group("rest") or None
+        elif ("compet" in label or "skill" in label or "habilidade" in label) and not competencies:
+            competencies = _section_items(content, match, split_inline=True)
+        elif ("passo" in label or "next" in label) and not next_steps:
+            next_steps = _section_items(content, match, split_inline=False)
+
+    if isinstance(score, str) and score.strip().isdigit():
+        score = int(score.strip())
+    if not isinstance(score, int) or not 0 <= score <= 100:
+        score = _parse_score(content)
+    if isinstance(competencies, str):
+        competencies = _split_items(competencies)
+    if isinstance(next_steps, str):
+        next_steps = [next_steps]
+
+    return ResumeAnalysis(
+        file_name=file_name,
+        content=content,
+        score=score,
+        seniority=_normalize_seniority(seniority) if isinstance(seniority, str) else None,
+        competencies=tuple(str(item) for item in competencies),
+        next_steps=tuple(str(item) for item in next_steps),
+        **metadata,
+    )
+
+
+def restore_analysis(file_name: str, stored: str, **metadata) -> ResumeAnalysis:
+    """Reconstrói um resultado salvo no cache ou no índice; textos anteriores ao esquema são reanalisados."""
+    try:
+        result = ResumeAnalysis.from_json(stored)
+    except (json.JSONDecodeError, TypeError, AttributeError):
+        return parse_analysis(file_name, stored, **metadata)
+    return replace(result, file_name=file_name, **metadata)
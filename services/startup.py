@@ -0,0 +1,48 @@
+"""Tempo entre o início da execução de cada página e a sua primeira renderização.
+
+A primeira execução de uma página no processo é a "fria": inclui a importação dos módulos pesados.
+As seguintes reaproveitam os módulos já carregados e medem só o custo do próprio script.
+"""
+
+import functools
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+
+@dataclass(frozen=True)
+class PaintTiming:
+    page: str
+    cold_ms: float
+    last_ms: float
+    runs: int
+
+
+class PaintTimings:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._timings: Dict[str, PaintTiming] = {}
+
+    def record(self, page: str, started: float, now: Optional[float] = None) -> PaintTiming:
+        """Registra a renderização de `page` iniciada em `started` (`time.perf_counter()`)."""
+        elapsed_ms = ((time.perf_counter() if now is None else now) - started) * 1000
+        with self._lock:
+            previous = self._timings.get(page)
+            timing = PaintTiming(
+                page=page,
+                cold_ms=previous.cold_ms if previous else elapsed_ms,
+                last_ms=elapsed_ms,
+                runs=previous.runs + 1 if previous else 1,
+            )
+            self._timings[page] = timing
+        return timing
+
+    def all(self) -> List[PaintTiming]:
+        with self._lock:
+            return list(self._timings.values())
+
+
+@functools.lru_cache(maxsize=None)
+def shared_paint_timings() -> PaintTimings:
+    return PaintTimings()
@@ -0,0 +1,12 @@
+"""Folhas de estilo das páginas, guardadas em `styles/` e lidas do disco uma vez por processo."""
+
+import functools
+from pathlib import Path
+
+STYLES_DIR = Path(__file__).resolve().parent.parent / "styles"
+
+
+@functools.lru_cache(maxsize=None)
+def page_style(name: str) -> str:
+    """Bloco `<style>` pronto para `st.markdown`, montado na primeira chamada e reaproveitado depois."""
+    return f"<style>\n{(STYLES_DIR / f'{name}.css').read_text(encoding='utf-8')}</style>"
@@ -0,0 +1,240 @@
+"""Transcrição offline de entrevistas em blocos sobrepostos, processados em paralelo.
+
+O reconhecimento em si fica atrás de `TranscriptionBackend`. `StubBackend` é determinístico e não
+depende de modelos, servindo para testes e demonstrações. O backend é indicado por um caminho
+importável (`"modulo:fabrica"`), resolvido dentro de cada worker: o pool usa `spawn`, então nada
+registrado em tempo de execução no processo principal existiria nos workers.
+"""
+
+import abc
+import functools
+import importlib
+import importlib.util
+import itertools
+import multiprocessing
+import time
+import zlib
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from services.analysis_cache import AnalysisCache, analysis_key
+from services.audio import TARGET_SAMPLE_RATE
+from services.config import DATA_DIR
+
+FASTER_WHISPER_AVAILABLE = importlib.util.find_spec("faster_whisper") is not None
+
+DEFAULT_BACKEND = (
+    "services.transcription:FasterWhisperBackend" if FASTER_WHISPER_AVAILABLE else "services.transcription:StubBackend"
+)
+DEFAULT_CHUNK_SECONDS = 30.0
+DEFAULT_OVERLAP_SECONDS = 2.0
+DEFAULT_WORKERS = 2
+DEFAULT_MAX_PENDING = 2 * DEFAULT_WORKERS
+DEFAULT_TRANSCRIPTS_PATH = DATA_DIR / "transcripts.sqlite3"
+MAX_OVERLAP_WORDS = 12
+
+
+class TranscriptionBackend(abc.ABC):
+    """Interface de um reconhecedor local: recebe PCM mono float32 e devolve o texto."""
+
+    name = "base"
+
+    @abc.abstractmethod
+    def transcribe(self, samples: np.ndarray, sample_rate: int) -> str:
+        """Texto reconhecido em `samples`."""
+
+
+class StubBackend(TranscriptionBackend):
+    """Gera palavras a partir do conteúdo do áudio: o mesmo trecho sempre vira o mesmo texto."""
+
+    name = "stub"
+    _VOCABULARY = (
+        "experiência", "projeto", "equipe", "python", "dados", "cliente", "entrega", "resultado",
+        "liderança", "arquitetura", "produto", "prazo", "qualidade", "testes", "negócio", "aprendizado",
+    )
+    WORDS_PER_SECOND = 2.5
+
+    def transcribe(self, samples: np.ndarray, sample_rate: int) -> str:
+        words = []
+        step = max(1, int(sample_rate / self.WORDS_PER_SECOND))
+        # Palavras ancoradas em posições absolutas do sinal, para que a sobreposição entre blocos
+        # produza as mesmas palavras nos dois lados e possa ser removida na junção.
+        quantized = np.round(np.clip(samples, -1.0, 1.0) * 1000).astype(np.int16)
+        for start in range(0, quantized.size - step + 1, step):
+            window = quantized[start : start + step]
+            if np.abs(window).max(initial=0) < 10:
+                continue
+            words.append(self._VOCABULARY[zlib.crc32(window.tobytes()) % len(self._VOCABULARY)])
+        return " ".join(words)
+
+
+class FasterWhisperBackend(TranscriptionBackend):
+    name = "whisper"
+
+    def __init__(self, model_size: str = "small") -> None:
+        from faster_whisper import WhisperModel  # type: ignore
+
+        self._model = WhisperModel(model_size, device="cpu", compute_type="int8")
+
+    def transcribe(self, samples: np.ndarray, sample_rate: int) -> str:
+        segments, _ = self._model.transcribe(samples, language="pt", vad_filter=False)
+        return " ".join(segment.text.strip() for segment in segments)
+
+
+def backend_factory(path: str) -> Callable[[], TranscriptionBackend]:
+    """Importa a fábrica indicada por `"modulo:fabrica"` (uma classe ou função sem argumentos)."""
+    module_name, separator, attribute = path.partition(":")
+    if not separator or not module_name or not attribute:
+        raise ValueError(f"Backend de transcrição inválido: {path!r}; use o formato 'modulo:fabrica'.")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+@functools.lru_cache(maxsize=None)
+def _backend(path: str) -> TranscriptionBackend:
+    """Instância única por processo: modelos pesados são carregados uma vez por worker."""
+    return backend_factory(path)()
+
+
+@dataclass(frozen=True)
+class AudioChunk:
+    index: int
+    start: int
+    end: int
+
+
+def plan_chunks(
+    total_samples: int,
+    sample_rate: int = TARGET_SAMPLE_RATE,
+    chunk_seconds: float = DEFAULT_CHUNK_SECONDS,
+    overlap_seconds: float = DEFAULT_OVERLAP_SECONDS,
+) -> List[AudioChunk]:
+    """Blocos de `chunk_seconds` que começam a cada `chunk_seconds - overlap_seconds`."""
+    size = max(1, int(chunk_seconds * sample_rate))
+    hop = max(1, size - int(overlap_seconds * sample_rate))
+    chunks: List[AudioChunk] = []
+    start = 0
+    while True:
+        end = min(start + size, total_samples)
+        chunks.append(AudioChunk(index=len(chunks), start=start, end=end))
+        if end >= total_samples:
+            return chunks
+        start += hop
+
+
+def merge_texts(previous: str, following: str, max_overlap: int = MAX_OVERLAP_WORDS) -> str:
+    """Junta dois textos vizinhos removendo as palavras repetidas pela sobreposição dos blocos."""
+    left, right = previous.split(), following.split()
+    for size in range(min(max_overlap, len(left), len(right)), 0, -1):
+        if left[-size:] == right[:size]:
+            right = right[size:]
+            break
+    return " ".join(left + right)
+
+
+def _transcribe_chunk(backend_path: str, samples: np.ndarray, sample_rate: int) -> str:
+    return _backend(backend_path).transcribe(samples, sample_rate)
+
+
+@dataclass(frozen=True)
+class PartialTranscript:
+    """Andamento da transcrição: o texto cobre os blocos concluídos em sequência desde o início."""
+
+    text: str
+    chunks_done: int
+    chunks_total: int
+    audio_seconds: float
+    elapsed_seconds: float
+    cached: bool = False
+
+    @property
+    def finished(self) -> bool:
+        return self.chunks_done == self.chunks_total
+
+    @property
+    def real_time_factor(self) -> float:
+        """Tempo de processamento dividido pela duração do áudio (abaixo de 1 = mais rápido que o real)."""
+        return self.elapsed_seconds / self.audio_seconds if self.audio_seconds else 0.0
+
+
+def transcript_key(audio_sha256: str, backend: str, chunk_seconds: float, overlap_seconds: float) -> str:
+    return analysis_key(audio_sha256, backend=backend, chunk_seconds=chunk_seconds, overlap_seconds=overlap_seconds)
+
+
+@functools.lru_cache(maxsize=None)
+def transcription_pool(max_workers: int = DEFAULT_WORKERS) -> ProcessPoolExecutor:
+    """Pool de processos compartilhado; `spawn` evita herdar as threads do servidor do Streamlit."""
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+@functools.lru_cache(maxsize=None)
+def shared_transcript_cache() -> AnalysisCache:
+    return AnalysisCache(DEFAULT_TRANSCRIPTS_PATH)
+
+
+def transcribe(
+    samples: np.ndarray,
+    audio_sha256: str,
+    backend: str = DEFAULT_BACKEND,
+    sample_rate: int = TARGET_SAMPLE_RATE,
+    chunk_seconds: float = DEFAULT_CHUNK_SECONDS,
+    overlap_seconds: float = DEFAULT_OVERLAP_SECONDS,
+    pool: Optional[Executor] = None,
+    cache: Optional[AnalysisCache] = None,
+    max_pending: int = DEFAULT_MAX_PENDING,
+) -> Iterator[PartialTranscript]:
+    """Transcreve em paralelo e gera parciais à medida que os blocos terminam.
+
+    `backend` é o caminho `"modulo:fabrica"` do reconhecedor, importado em cada worker. O resultado
+    final fica no cache indexado pelo hash do áudio, pelo backend e pelos parâmetros de divisão;
+    uma segunda chamada com o mesmo áudio devolve o texto sem processar nada.
+
+    No máximo `max_pending` blocos são copiados do PCM (em geral um memmap) e enviados ao pool por
+    vez; cada bloco concluído libera a vaga para o próximo, então a memória não cresce com o áudio.
+    """
+    backend_factory(backend)  # caminho inválido falha aqui, e não em cada worker
+    started = time.perf_counter()
+    audio_seconds = samples.size / sample_rate
+    key = transcript_key(audio_sha256, backend, chunk_seconds, overlap_seconds)
+    cached = cache.get(key) if cache is not None else None
+    if cached is not None:
+        yield PartialTranscript(cached, 1, 1, audio_seconds, time.perf_counter() - started, cached=True)
+        return
+
+    chunks = plan_chunks(samples.size, sample_rate, chunk_seconds, overlap_seconds)
+    pool = pool or transcription_pool()
+    waiting = iter(chunks)
+    in_flight: Dict[Future, AudioChunk] = {}
+
+    def submit(chunk: AudioChunk) -> None:
+        block = np.ascontiguousarray(samples[chunk.start : chunk.end])
+        in_flight[pool.submit(_transcribe_chunk, backend, block, sample_rate)] = chunk
+
+    texts: List[Optional[str]] = [None] * len(chunks)
+    merged = ""
+    merged_upto = 0
+    done = 0
+    try:
+        for chunk in itertools.islice(waiting, max(1, max_pending)):
+            submit(chunk)
+        while in_flight:
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                texts[in_flight.pop(future).index] = future.result()
+                following = next(waiting, None)
+                if following is not None:
+                    submit(following)
+                done += 1
+                while merged_upto < len(chunks) and texts[merged_upto] is not None:
+                    merged = merge_texts(merged, texts[merged_upto])
+                    merged_upto += 1
+                yield PartialTranscript(merged, done, len(chunks), audio_seconds, time.perf_counter() - started)
+    finally:
+        for future in in_flight:
+            future.cancel()
+
+    if cache is not None:
+        cache.put(key, merged)
+
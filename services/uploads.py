@@ -0,0 +1,88 @@
+"""Ingestão de uploads com pouca memória: cópia em disco (com o hash calculado no caminho) e extração dela."""
+
+import hashlib
+import shutil
+import sys
+import tempfile
+from dataclasses import dataclass, fields, is_dataclass
+from pathlib import Path
+from typing import Any, BinaryIO, Optional, Set
+
+from services.config import DATA_DIR
+from services.extraction import DEFAULT_MAX_CHARS, DEFAULT_MAX_PAGES, ExtractionResult, extract_text
+from services.metrics import shared_metrics
+
+SPOOL_DIR = DATA_DIR / "uploads"
+SPOOL_BLOCK_SIZE = 1 << 20
+
+
+@dataclass(frozen=True)
+class StoredUpload:
+    """O que sobra de um upload depois da ingestão: metadados, hash e o texto extraído."""
+
+    name: str
+    size: int
+    sha256: str
+    extraction: ExtractionResult
+
+    @property
+    def text(self) -> str:
+        return self.extraction.text
+
+
+class _HashingWriter:
+    """Grava no arquivo temporário e atualiza o SHA-256 com os mesmos blocos."""
+
+    def __init__(self, target: BinaryIO) -> None:
+        self._target = target
+        self.digest = hashlib.sha256()
+
+    def write(self, block: bytes) -> int:
+        self.digest.update(block)
+        return self._target.write(block)
+
+
+def spool_upload(
+    file: BinaryIO,
+    name: Optional[str] = None,
+    max_chars: int = DEFAULT_MAX_CHARS,
+    max_pages: int = DEFAULT_MAX_PAGES,
+    directory: Path = SPOOL_DIR,
+) -> StoredUpload:
+    """Copia o upload em blocos para um arquivo temporário em disco, calculando o hash no caminho,
+    e depois extrai o texto relendo essa cópia. São duas leituras: PDF e DOCX precisam de acesso
+    aleatório ao arquivo inteiro, então a extração não acompanha a cópia. O arquivo temporário é
+    apagado ao final.
+
+    O diretório padrão fica na pasta de dados, e não em `/tmp`, que em muitos contêineres é `tmpfs`
+    e, portanto, também ocuparia memória.
+    """
+    name = name or getattr(file, "name", "arquivo")
+    directory.mkdir(parents=True, exist_ok=True)
+    file.seek(0)
+    with tempfile.TemporaryFile(dir=directory, suffix=Path(name).suffix) as spooled:
+        writer = _HashingWriter(spooled)
+        with shared_metrics().stage("file_read"):
+            shutil.copyfileobj(file, writer, SPOOL_BLOCK_SIZE)
+        size = spooled.tell()
+        spooled.seek(0)
+        extraction = extract_text(name, spooled, max_chars=max_chars, max_pages=max_pages)
+    return StoredUpload(name=name, size=size, sha256=writer.digest.hexdigest(), extraction=extraction)
+
+
+def deep_sizeof(value: Any, _seen: Optional[Set[int]] = None) -> int:
+    """Tamanho aproximado em bytes de um objeto e de tudo que ele referencia (contêineres e dataclasses)."""
+    seen = _seen if _seen is not None else set()
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, (str, bytes, bytearray, int, float, bool)) or value is None:
+        return size
+    if isinstance(value, dict):
+        return size + sum(deep_sizeof(key, seen) + deep_sizeof(item, seen) for key, item in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return size + sum(deep_sizeof(item, seen) for item in value)
+    if is_dataclass(value) and not isinstance(value, type):
+        return size + sum(deep_sizeof(getattr(value, item.name), seen) for item in fields(value))
+    return size
@@ -0,0 +1,129 @@
+"""Detecção de fala por energia e taxa de cruzamentos por zero, calculada quadro a quadro com NumPy.
+
+As medidas são tiradas de blocos de quadros inteiros (uma matriz por bloco), sem laços por amostra,
+e as decisões de suavização (pausas curtas, trechos muito breves, margens) operam sobre os inícios
+e fins dos trechos, também vetorizadas.
+"""
+
+from dataclasses import dataclass
+from typing import Iterator, Tuple
+
+import numpy as np
+
+from services.audio import TARGET_SAMPLE_RATE
+
+FRAME_MS = 30
+FEATURE_BLOCK_FRAMES = 2_000
+NOISE_PERCENTILE = 10
+LOUD_PERCENTILE = 95
+NOISE_MARGIN_DB = 12.0
+DYNAMIC_RANGE_DB = 25.0
+MIN_THRESHOLD_DB = -60.0
+UNVOICED_MARGIN_DB = 8.0
+UNVOICED_ZCR = 0.3
+MIN_SPEECH_MS = 120
+MIN_SILENCE_MS = 400
+PADDING_MS = 150
+
+
+@dataclass(frozen=True)
+class SpeechSegment:
+    """Trecho de fala em amostras (`end` exclusivo)."""
+
+    start: int
+    end: int
+
+
+@dataclass(frozen=True)
+class VadResult:
+    segments: Tuple[SpeechSegment, ...]
+    total_samples: int
+    sample_rate: int = TARGET_SAMPLE_RATE
+
+    @property
+    def speech_samples(self) -> int:
+        return sum(segment.end - segment.start for segment in self.segments)
+
+    @property
+    def speech_seconds(self) -> float:
+        return self.speech_samples / self.sample_rate
+
+    @property
+    def total_seconds(self) -> float:
+        return self.total_samples / self.sample_rate
+
+    @property
+    def removed_ratio(self) -> float:
+        """Fração do áudio descartada como silêncio."""
+        return 1 - self.speech_samples / self.total_samples if self.total_samples else 0.0
+
+
+def frame_features(samples: np.ndarray, frame_length: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Energia (dBFS) e taxa de cruzamentos por zero de cada quadro completo.
+
+    Os quadros são lidos em blocos de `FEATURE_BLOCK_FRAMES`, de modo que um `np.memmap` de horas
+    de áudio nunca é copiado inteiro para a memória.
+    """
+    total_frames = samples.size // frame_length
+    energy = np.empty(total_frames, dtype=np.float32)
+    crossings = np.empty(total_frames, dtype=np.float32)
+    for first in range(0, total_frames, FEATURE_BLOCK_FRAMES):
+        last = min(total_frames, first + FEATURE_BLOCK_FRAMES)
+        frames = np.asarray(samples[first * frame_length : last * frame_length], dtype=np.float32)
+        frames = frames.reshape(-1, frame_length)
+        energy[first:last] = 10.0 * np.log10(np.mean(np.square(frames, dtype=np.float64), axis=1) + 1e-12)
+        signs = np.signbit(frames)
+        crossings[first:last] = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (frame_length - 1)
+    return energy, crossings
+
+
+def speech_threshold(energy: np.ndarray) -> float:
+    """Limiar adaptativo: acima do ruído de fundo, mas nunca tão alto que corte a fala mais baixa."""
+    if not energy.size:
+        return MIN_THRESHOLD_DB
+    noise_floor, loud = np.percentile(energy, [NOISE_PERCENTILE, LOUD_PERCENTILE])
+    return max(MIN_THRESHOLD_DB, min(noise_floor + NOISE_MARGIN_DB, loud - DYNAMIC_RANGE_DB))
+
+
+def _runs(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Inícios e fins (exclusivos) das sequências de `True`."""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def _merge_gaps(starts: np.ndarray, ends: np.ndarray, min_gap: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Une trechos separados por menos de `min_gap` (inclusive os que se sobrepõem)."""
+    if starts.size < 2:
+        return starts, ends
+    keep = starts[1:] - ends[:-1] >= min_gap
+    return starts[np.concatenate(([True], keep))], ends[np.concatenate((keep, [True]))]
+
+
+def detect_speech(samples: np.ndarray, sample_rate: int = TARGET_SAMPLE_RATE) -> VadResult:
+    """Localiza os trechos de fala de um sinal mono float32."""
+    frame_length = max(2, sample_rate * FRAME_MS // 1000)
+    energy, crossings = frame_features(samples, frame_length)
+    threshold = speech_threshold(energy)
+    # Consoantes surdas (s, f, x) têm pouca energia e muitos cruzamentos por zero.
+    speech = (energy > threshold) | ((energy > threshold - UNVOICED_MARGIN_DB) & (crossings > UNVOICED_ZCR))
+
+    starts, ends = _runs(speech)
+    long_enough = ends - starts >= max(1, MIN_SPEECH_MS // FRAME_MS)
+    starts, ends = starts[long_enough], ends[long_enough]
+    padding = PADDING_MS // FRAME_MS
+    starts = np.maximum(starts - padding, 0)
+    ends = np.minimum(ends + padding, energy.size)
+    starts, ends = _merge_gaps(starts, ends, MIN_SILENCE_MS // FRAME_MS)
+
+    # O último quadro incompleto acompanha o trecho que termina no fim do sinal.
+    sample_ends = np.where(ends == energy.size, samples.size, ends * frame_length)
+    segments = tuple(
+        SpeechSegment(int(start), int(end)) for start, end in zip(starts * frame_length, sample_ends)
+    )
+    return VadResult(segments=segments, total_samples=int(samples.size), sample_rate=sample_rate)
+
+
+def speech_blocks(samples: np.ndarray, result: VadResult) -> Iterator[np.ndarray]:
+    """Só os trechos de fala, na ordem, como fatias do sinal original (sem copiar o restante)."""
+    for segment in result.segments:
+        yield samples[segment.start : segment.end]
@@ -0,0 +1,142 @@
+"""Pirâmide de picos (mínimo/máximo) em vários níveis de zoom, para desenhar formas de onda longas.
+
+O nível 0 resume cada `BASE_BIN` amostras; cada nível seguinte junta `LEVEL_FACTOR` colunas do
+anterior. Todos os níveis saem da mesma passada sobre o PCM, lido em blocos, e ficam gravados em
+`<sha256>.npz` como `int8`: uma hora de áudio ocupa poucos megabytes e é desenhada sem reler o áudio.
+"""
+
+import functools
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+
+from services.audio import TARGET_SAMPLE_RATE
+from services.config import DATA_DIR
+
+DEFAULT_PEAKS_DIR = DATA_DIR / "peaks"
+BASE_BIN = 256
+LEVEL_FACTOR = 4
+MIN_TOP_BINS = 512
+BLOCK_BINS = 4_096
+
+
+def _quantize(values: np.ndarray) -> np.ndarray:
+    return np.round(np.clip(values, -1.0, 1.0) * 127).astype(np.int8)
+
+
+def _pad_to(values: np.ndarray, multiple: int) -> np.ndarray:
+    """Completa repetindo o último valor, o que não altera mínimos nem máximos."""
+    missing = -values.shape[0] % multiple
+    return np.pad(values, [(0, missing)] + [(0, 0)] * (values.ndim - 1), mode="edge") if missing else values
+
+
+@dataclass(frozen=True)
+class PeakPyramid:
+    """Níveis da pirâmide; cada um é uma matriz `(colunas, 2)` com mínimo e máximo em `int8`."""
+
+    levels: Tuple[np.ndarray, ...]
+    total_samples: int
+    sample_rate: int = TARGET_SAMPLE_RATE
+
+    @property
+    def duration_seconds(self) -> float:
+        return self.total_samples / self.sample_rate
+
+    def samples_per_bin(self, level: int) -> int:
+        return BASE_BIN * LEVEL_FACTOR**level
+
+    def view(self, start_seconds: float, end_seconds: float, width: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Tempos (s) e picos `(n, 2)` em [-1, 1] do intervalo, com no máximo ~`LEVEL_FACTOR * width` colunas.
+
+        Usa o nível mais grosso que ainda tem pelo menos `width` colunas no intervalo.
+        """
+        span = max(end_seconds - start_seconds, 1.0 / self.sample_rate) * self.sample_rate
+        level = 0
+        while level + 1 < len(self.levels) and span / self.samples_per_bin(level + 1) >= width:
+            level += 1
+        per_bin = self.samples_per_bin(level)
+        first = max(0, int(start_seconds * self.sample_rate // per_bin))
+        last = min(self.levels[level].shape[0], int(np.ceil(end_seconds * self.sample_rate / per_bin)))
+        peaks = self.levels[level][first:last].astype(np.float32) / 127.0
+        times = (np.arange(first, first + peaks.shape[0]) + 0.5) * per_bin / self.sample_rate
+        return times, peaks
+
+
+def compute_peaks(samples: np.ndarray, sample_rate: int = TARGET_SAMPLE_RATE) -> PeakPyramid:
+    """Calcula todos os níveis numa única passada, bloco a bloco (serve para `np.memmap` maior que a RAM)."""
+    depth = 1
+    while samples.size / (BASE_BIN * LEVEL_FACTOR**depth) >= MIN_TOP_BINS:
+        depth += 1
+    top_factor = LEVEL_FACTOR ** (depth - 1)
+    # Blocos alinhados à coluna do nível mais alto: só o último bloco precisa de preenchimento.
+    block_samples = BASE_BIN * top_factor * max(1, BLOCK_BINS // top_factor)
+    parts: List[List[np.ndarray]] = [[] for _ in range(depth)]
+    for start in range(0, samples.size, block_samples):
+        block = _pad_to(np.asarray(samples[start : start + block_samples], dtype=np.float32), BASE_BIN)
+        frames = block.reshape(-1, BASE_BIN)
+        level = np.stack([frames.min(axis=1), frames.max(axis=1)], axis=1)
+        parts[0].append(_quantize(level))
+        for index in range(1, depth):
+            grouped = _pad_to(level, LEVEL_FACTOR).reshape(-1, LEVEL_FACTOR, 2)
+            level = np.stack([grouped[:, :, 0].min(axis=1), grouped[:, :, 1].max(axis=1)], axis=1)
+            parts[index].append(_quantize(level))
+    levels = tuple(
+        np.concatenate(chunks) if chunks else np.zeros((0, 2), dtype=np.int8) for chunks in parts
+    )
+    return PeakPyramid(levels=levels, total_samples=int(samples.size), sample_rate=sample_rate)
+
+
+class PeakCache:
+    """Pirâmides gravadas em `<sha256>.npz`, calculadas uma única vez por áudio."""
+
+    def __init__(self, directory: Path = DEFAULT_PEAKS_DIR) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def path(self, audio_sha256: str) -> Path:
+        return self.directory / f"{audio_sha256}.npz"
+
+    def load(self, audio_sha256: str, samples: np.ndarray, sample_rate: int = TARGET_SAMPLE_RATE) -> PeakPyramid:
+        path = self.path(audio_sha256)
+        if path.exists():
+            with np.load(path) as stored:
+                levels = tuple(stored[f"level{index}"] for index in range(int(stored["depth"])))
+                return PeakPyramid(levels, int(stored["total_samples"]), int(stored["sample_rate"]))
+        pyramid = compute_peaks(samples, sample_rate)
+        with tempfile.NamedTemporaryFile(dir=self.directory, suffix=".npz", delete=False) as output:
+            np.savez(
+                output,
+                depth=len(pyramid.levels),
+                total_samples=pyramid.total_samples,
+                sample_rate=pyramid.sample_rate,
+                **{f"level{index}": level for index, level in enumerate(pyramid.levels)},
+            )
+        os.replace(output.name, path)
+        return pyramid
+
+
+@functools.lru_cache(maxsize=None)
+def shared_peak_cache() -> PeakCache:
+    return PeakCache()
+
+
+def waveform_svg(times: np.ndarray, peaks: np.ndarray, start: float, end: float, width: int = 900, height: int = 120) -> str:
+    """Desenha os picos como um único polígono SVG (contorno superior e, de volta, o inferior)."""
+    if not times.size:
+        return f'<svg width="100%" height="{height}" viewBox="0 0 {width} {height}"></svg>'
+    x = (times - start) / max(end - start, 1e-9) * width
+    middle = height / 2
+    top = middle - peaks[:, 1] * middle
+    bottom = middle - peaks[:, 0] * middle
+    xs = np.concatenate([x, x[::-1]])
+    ys = np.concatenate([top, bottom[::-1]])
+    points = " ".join(f"{a:.1f},{b:.1f}" for a, b in zip(xs, ys))
+    return (
+        f'<svg width="100%" height="{height}" viewBox="0 0 {width} {height}" preserveAspectRatio="none">'
+        f'<line x1="0" y1="{middle}" x2="{width}" y2="{middle}" stroke="rgba(148,163,184,0.5)" stroke-width="1"/>'
+        f'<polygon points="{points}" fill="#f63366" fill-opacity="0.75"/></svg>'
+    )
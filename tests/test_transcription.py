@@ -0,0 +1,98 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from services.analysis_cache import AnalysisCache
+from services.transcription import StubBackend, merge_texts, plan_chunks, transcribe
+
+STUB = "services.transcription:StubBackend"
+SAMPLE_RATE = 16_000
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    """Pool de threads que registra quantos blocos ficaram pendentes ao mesmo tempo."""
+
+    def __init__(self) -> None:
+        super().__init__(max_workers=2)
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.peak = 0
+
+    def submit(self, fn, *args, **kwargs):
+        with self._lock:
+            self.pending += 1
+            self.peak = max(self.peak, self.pending)
+        future = super().submit(fn, *args, **kwargs)
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, _future) -> None:
+        with self._lock:
+            self.pending -= 1
+
+
+@pytest.fixture
+def speech() -> np.ndarray:
+    return np.random.default_rng(7).uniform(-0.5, 0.5, 20 * SAMPLE_RATE).astype(np.float32)
+
+
+def test_plan_chunks_covers_the_audio_with_overlap():
+    chunks = plan_chunks(10 * SAMPLE_RATE, SAMPLE_RATE, chunk_seconds=4.0, overlap_seconds=1.0)
+
+    assert [(chunk.start, chunk.end) for chunk in chunks] == [
+        (0, 64_000),
+        (48_000, 112_000),
+        (96_000, 160_000),
+    ]
+    assert [chunk.index for chunk in chunks] == [0, 1, 2]
+
+
+def test_plan_chunks_short_audio_is_a_single_chunk():
+    chunks = plan_chunks(SAMPLE_RATE, SAMPLE_RATE, chunk_seconds=30.0, overlap_seconds=2.0)
+
+    assert [(chunk.start, chunk.end) for chunk in chunks] == [(0, SAMPLE_RATE)]
+
+
+def test_merge_texts_drops_the_repeated_overlap():
+    assert merge_texts("a b c d", "c d e f") == "a b c d e f"
+    assert merge_texts("a b", "c d") == "a b c d"
+    assert merge_texts("", "c d") == "c d"
+
+
+def test_merge_texts_limits_the_overlap_it_looks_for():
+    assert merge_texts("a b c", "a b c d", max_overlap=2) == "a b c a b c d"
+
+
+def test_transcribe_matches_a_single_pass(speech):
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        partials = list(transcribe(speech, "sha", STUB, SAMPLE_RATE, 4.0, 0.8, pool=pool))
+
+    assert [partial.chunks_done for partial in partials] == list(range(1, 7))
+    assert partials[-1].finished
+    assert partials[-1].text == StubBackend().transcribe(speech, SAMPLE_RATE)
+
+
+def test_transcribe_keeps_a_bounded_number_of_chunks_in_flight(speech):
+    pool = CountingExecutor()
+    with pool:
+        partials = list(transcribe(speech, "sha", STUB, SAMPLE_RATE, 2.0, 0.4, pool=pool, max_pending=3))
+
+    assert partials[-1].chunks_total > 3
+    assert pool.peak <= 3
+
+
+def test_transcribe_reuses_the_cached_transcript(speech, tmp_path):
+    cache = AnalysisCache(tmp_path / "transcripts.sqlite3")
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        first = list(transcribe(speech, "sha", STUB, SAMPLE_RATE, 4.0, 0.8, pool=pool, cache=cache))[-1]
+        second = list(transcribe(speech, "sha", STUB, SAMPLE_RATE, 4.0, 0.8, pool=pool, cache=cache))
+
+    assert len(second) == 1 and second[0].cached
+    assert second[0].text == first.text
+
+
+def test_transcribe_rejects_an_invalid_backend_path(speech):
+    with pytest.raises(ValueError):
+        next(transcribe(speech, "sha", "StubBackend"))